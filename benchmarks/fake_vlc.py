@@ -0,0 +1,302 @@
+import json
+import random
+import socketserver
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+
+class FakePlayer:
+    """Simulated VLC playback state driven by a controllable virtual clock
+
+    The position advances at `rate` media seconds per wall-clock second
+    while playing. Every seek is recorded together with the position at
+    which it arrived, so callers can measure how far past a trigger the
+    player got before the skip happened.
+    """
+
+    def __init__(self, length=3600, rate=1.0, input_name="file:///videos/movie.mp4"):
+        self.lock = threading.Lock()
+        self.length = length
+        self.rate = rate
+        self.input = input_name
+        self.playlist = [input_name]
+        self.state = "playing"
+        self.anchor_position = 0.0
+        self.anchor_time = time.monotonic()
+
+        self.seek_delay = 0.0
+        self.seeks = []
+        self.listeners = []
+
+    def position(self, now=None):
+        """Returns the current media position in (fractional) seconds"""
+        if now is None:
+            now = time.monotonic()
+        with self.lock:
+            if self.state != "playing":
+                return self.anchor_position
+            position = self.anchor_position + (now - self.anchor_time) * self.rate
+            if position >= self.length:
+                return float(self.length)
+            return position
+
+    def set_position(self, seconds):
+        """Moves the virtual clock without recording a seek"""
+        with self.lock:
+            self.anchor_position = float(seconds)
+            self.anchor_time = time.monotonic()
+
+    def seek(self, seconds):
+        """Applies a seek requested by a client and records it"""
+        arrived_at = self.position()
+        if self.seek_delay:
+            time.sleep(self.seek_delay)
+        self.set_position(min(max(float(seconds), 0.0), self.length))
+        self.seeks.append((time.monotonic(), arrived_at, float(seconds)))
+        self.notify(f"( time: {int(seconds)}s )")
+
+    def set_state(self, state):
+        """Switches between playing, paused and stopped"""
+        position = self.position()
+        with self.lock:
+            self.anchor_position = position
+            self.anchor_time = time.monotonic()
+            self.state = state
+        codes = {"playing": (2, "play"), "paused": (3, "pause"), "stopped": (4, "stop")}
+        code, word = codes[state]
+        self.notify(f"( {word} state: {code} ): {word.capitalize()}")
+
+    def set_input(self, input_name, length=None):
+        """Starts a new input from the beginning"""
+        with self.lock:
+            self.input = input_name
+            if input_name not in self.playlist:
+                self.playlist.append(input_name)
+            if length is not None:
+                self.length = length
+            self.anchor_position = 0.0
+            self.anchor_time = time.monotonic()
+            self.state = "playing"
+        self.notify(f"( new input: {input_name} )")
+
+    def notify(self, body):
+        """Pushes a status change line to every connected RC client"""
+        for listener in list(self.listeners):
+            listener(f"status change: {body}")
+
+
+class FakeRCHandler(socketserver.StreamRequestHandler):
+    """One RC client connection"""
+
+    def setup(self):
+        super().setup()
+        self.write_lock = threading.Lock()
+
+    def handle(self):
+        server = self.server
+        server.connections_opened += 1
+        server.live.add(self)
+        player = server.player
+        try:
+            if server.password:
+                self.send_raw("Password: ")
+                if self.rfile.readline().decode().strip() != server.password:
+                    self.send_raw("Wrong password\r\n")
+                    return
+                self.send_raw("\r\nWelcome, Master\r\n> ")
+            else:
+                self.send_raw("VLC media player 3.0.18 Vetinari (fake)\r\n"
+                              "Command Line Interface initialized. Type `help' for help.\r\n> ")
+
+            player.listeners.append(self.push)
+            for line in self.rfile:
+                command = line.decode(errors='replace').strip()
+                server.commands += 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if server.drop_rate and random.random() < server.drop_rate:
+                    return
+                if command in ("logout", "quit"):
+                    return
+                reply = self.execute(command)
+                self.send_raw((reply + "\r\n> ") if reply else "> ")
+        except OSError:
+            pass
+        finally:
+            if self.push in player.listeners:
+                player.listeners.remove(self.push)
+            server.live.discard(self)
+
+    def execute(self, command):
+        """Runs one RC command against the fake player and returns its output"""
+        player = self.server.player
+        name, _, argument = command.partition(" ")
+        if name == "get_time":
+            return str(int(player.position()))
+        if name == "get_length":
+            return str(int(player.length))
+        if name == "is_playing":
+            return "1" if player.state == "playing" else "0"
+        if name == "status":
+            state = {"playing": "playing", "paused": "paused", "stopped": "stopped"}[player.state]
+            return f"( new input: {player.input} )\r\n( audio volume: 256 )\r\n( state {state} )"
+        if name == "seek" and argument.strip().isdigit():
+            player.seek(int(argument))
+            return ""
+        if name == "pause":
+            player.set_state("paused" if player.state == "playing" else "playing")
+            return ""
+        if name == "play":
+            player.set_state("playing")
+            return ""
+        if name == "stop":
+            player.set_state("stopped")
+            return ""
+        if name == "playlist":
+            lines = ["+----[ Playlist - playlist ]", "| 1 - Playlist"]
+            for i, item in enumerate(player.playlist):
+                marker = "*" if item == player.input else ""
+                lines.append(f"|   {marker}{i + 3} - {item.rsplit('/', 1)[-1]} (00:02:00)")
+            lines += ["| 2 - Media Library", "+----[ End of playlist ]"]
+            return "\r\n".join(lines)
+        if name == "clear":
+            player.playlist = []
+            return ""
+        if name == "add" and argument:
+            player.set_input(argument.strip())
+            return ""
+        if name == "help":
+            return "+----[ Remote control commands ]\r\n+----[ end of help ]"
+        return f"Unknown command `{name}'. Type `help' for help."
+
+    def push(self, line):
+        """Writes an unsolicited status change line"""
+        try:
+            self.send_raw(line + "\r\n")
+        except OSError:
+            pass
+
+    def send_raw(self, text):
+        with self.write_lock:
+            self.wfile.write(text.encode())
+            self.wfile.flush()
+
+
+class FakeRCServer(socketserver.ThreadingTCPServer):
+    """Stand-in for VLC's RC interface"""
+
+    allow_reuse_address = True
+    daemon_threads = True
+
+    def __init__(self, player, host="127.0.0.1", port=0, password="", latency=0.0, drop_rate=0.0):
+        super().__init__((host, port), FakeRCHandler)
+        self.player = player
+        self.password = password
+        self.latency = latency
+        self.drop_rate = drop_rate
+        self.connections_opened = 0
+        self.commands = 0
+        self.live = set()
+
+    def drop_connections(self):
+        """Closes every open client connection, as a restarting VLC would"""
+        for handler in list(self.live):
+            try:
+                handler.connection.shutdown(2)
+            except OSError:
+                pass
+
+
+class FakeHTTPHandler(BaseHTTPRequestHandler):
+    """One request to the fake VLC web interface"""
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        self.server.connections_opened += 1
+
+    def do_GET(self):
+        server = self.server
+        server.commands += 1
+        if server.latency:
+            time.sleep(server.latency)
+        if server.drop_rate and random.random() < server.drop_rate:
+            self.close_connection = True
+            return
+
+        url = urlparse(self.path)
+        player = server.player
+        if url.path == "/requests/playlist.json":
+            self.send_json({"name": "", "children": [
+                {"name": "Playlist", "id": "1", "children": [
+                    {"type": "leaf", "name": item.rsplit("/", 1)[-1], "uri": item, "id": str(i + 3),
+                     **({"current": "current"} if item == player.input else {})}
+                    for i, item in enumerate(player.playlist)
+                ]},
+                {"name": "Media Library", "id": "2", "children": []},
+            ]})
+            return
+        if url.path != "/requests/status.json":
+            self.send_error(404)
+            return
+
+        query = parse_qs(url.query)
+        command = query.get("command", [None])[0]
+        value = query.get("val", [""])[0]
+        if command == "seek":
+            player.seek(float(value.rstrip("s")))
+        elif command == "pl_pause":
+            player.set_state("paused" if player.state == "playing" else "playing")
+        elif command == "pl_play":
+            player.set_state("playing")
+        elif command == "pl_stop":
+            player.set_state("stopped")
+        elif command == "pl_empty":
+            player.playlist = []
+        elif command == "in_play" and query.get("input"):
+            player.set_input(query["input"][0])
+
+        position = player.position()
+        self.send_json({
+            "time": int(position),
+            "length": int(player.length),
+            "position": position / player.length if player.length else 0.0,
+            "state": player.state,
+            "rate": player.rate,
+            "information": {"category": {"meta": {"filename": player.input.rsplit("/", 1)[-1]}}},
+        })
+
+    def send_json(self, document):
+        """Writes a JSON document as the response"""
+        body = json.dumps(document).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class FakeHTTPServer(ThreadingHTTPServer):
+    """Stand-in for VLC's HTTP interface"""
+
+    daemon_threads = True
+
+    def __init__(self, player, host="127.0.0.1", port=0, latency=0.0, drop_rate=0.0):
+        super().__init__((host, port), FakeHTTPHandler)
+        self.player = player
+        self.latency = latency
+        self.drop_rate = drop_rate
+        self.connections_opened = 0
+        self.commands = 0
+
+
+def serve_in_background(server):
+    """Starts a server on a daemon thread and returns it"""
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,177 @@
+"""End-to-end skip benchmark against a simulated VLC
+
+Runs VLCSkipController against the fake RC/HTTP servers for several
+polling and transport configurations and reports, per configuration:
+trigger-to-seek latency, overshoot past trigger_time, connections opened,
+round trips per minute and controller CPU time.
+
+    python -m benchmarks.skip_latency [--rate 4] [--only rc-adaptive]
+"""
+import argparse
+import json
+import os
+import statistics
+import tempfile
+import threading
+import time
+from pathlib import Path
+from benchmarks.fake_vlc import FakeHTTPServer, FakePlayer, FakeRCServer, serve_in_background
+from src.vlc.controller import VLCSkipController
+
+# (trigger, jump_to) pairs in media seconds
+SEGMENTS = [(10, 20), (40, 50), (80, 90)]
+LENGTH = 120
+# Skips may fire up to early_trigger_guard seconds of playback before the trigger
+EARLY_GUARD = 0.5
+
+CONFIGURATIONS = {
+    "rc-fixed-100ms": {"backend": "rc", "poll_max_interval": 0.1, "event_driven": False},
+    "rc-adaptive": {"backend": "rc", "event_driven": False},
+    "rc-adaptive-events": {"backend": "rc", "event_driven": True},
+    "http-adaptive": {"backend": "http", "event_driven": False},
+    "rc-latency-50ms": {"backend": "rc", "event_driven": True, "latency": 0.05},
+    "rc-latency-50ms-no-lead": {"backend": "rc", "event_driven": True, "latency": 0.05, "early_trigger_guard": 0},
+    "rc-dropped-connections": {"backend": "rc", "event_driven": True, "drop_rate": 0.02},
+}
+
+
+def format_time(seconds):
+    """Formats whole seconds as HH:MM:SS"""
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}"
+
+
+def write_segments_file(directory):
+    """Writes the benchmark segments as a sidecar JSON file"""
+    path = os.path.join(directory, "bench.json")
+    data = {
+        "version": "1.0",
+        "video_info": {"filename": "bench.mp4", "duration": format_time(LENGTH)},
+        "time_segments": [
+            {
+                "id": i + 1,
+                "name": f"Segment {i + 1}",
+                "trigger_time": format_time(start),
+                "jump_to_time": format_time(end),
+                "enabled": True,
+            }
+            for i, (start, end) in enumerate(SEGMENTS)
+        ],
+        "settings": {"loop_segments": False, "show_notifications": False},
+    }
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f)
+    return path
+
+
+def run_configuration(name, options, json_path, rate):
+    """Plays the benchmark video once under one configuration and returns its measurements"""
+    video_path = os.path.join(os.path.dirname(json_path), "bench.mp4")
+    player = FakePlayer(length=LENGTH, rate=rate, input_name=Path(video_path).as_uri())
+    latency = options.get("latency", 0.0)
+    drop_rate = options.get("drop_rate", 0.0)
+    if options["backend"] == "http":
+        server = serve_in_background(FakeHTTPServer(player, latency=latency, drop_rate=drop_rate))
+    else:
+        server = serve_in_background(FakeRCServer(player, latency=latency, drop_rate=drop_rate))
+    host, port = server.server_address
+
+    config_data = {
+        "backend": options["backend"],
+        "rc_host": host,
+        "rc_port": port,
+        "http_host": host,
+        "http_port": port,
+        "check_interval": 0.1,
+        "timeout_seconds": 5,
+        "poll_min_interval": 0.1,
+        "poll_max_interval": options.get("poll_max_interval", 5.0),
+        "trigger_window": 2.0,
+        "event_driven": options["event_driven"],
+        "early_trigger_guard": options.get("early_trigger_guard", EARLY_GUARD),
+    }
+    controller = VLCSkipController(json_path, config_data)
+
+    def stop_when_finished():
+        while True:
+            if player.position() >= LENGTH - 1:
+                controller.stop_monitoring()
+                return
+            time.sleep(0.05)
+
+    watcher = threading.Thread(target=stop_when_finished, daemon=True)
+    started = time.monotonic()
+    cpu_started = time.thread_time()
+    watcher.start()
+    controller.start_monitoring()
+    cpu_used = time.thread_time() - cpu_started
+    elapsed = time.monotonic() - started
+    server.shutdown()
+    server.server_close()
+
+    overshoots = []
+    for _, arrived_at, target in player.seeks:
+        for start, end in SEGMENTS:
+            if start - EARLY_GUARD <= arrived_at < end and target == end:
+                overshoots.append(arrived_at - start)
+                break
+
+    return {
+        "configuration": name,
+        "skips": f"{len(overshoots)}/{len(SEGMENTS)}",
+        "latency_mean_ms": statistics.mean(overshoots) / rate * 1000 if overshoots else None,
+        "latency_max_ms": max(overshoots) / rate * 1000 if overshoots else None,
+        "overshoot_mean_s": statistics.mean(overshoots) if overshoots else None,
+        "overshoot_max_s": max(overshoots) if overshoots else None,
+        "connections": server.connections_opened,
+        "round_trips_per_min": server.commands / elapsed * 60,
+        "cpu_ms": cpu_used * 1000,
+        "wall_s": elapsed,
+    }
+
+
+def print_report(results):
+    """Prints the measurements as a table"""
+    columns = [
+        ("configuration", "{}", 24),
+        ("skips", "{}", 6),
+        ("latency_mean_ms", "{:.0f}", 10),
+        ("latency_max_ms", "{:.0f}", 10),
+        ("overshoot_max_s", "{:.2f}", 10),
+        ("connections", "{}", 6),
+        ("round_trips_per_min", "{:.0f}", 10),
+        ("cpu_ms", "{:.0f}", 8),
+    ]
+    headers = ["config", "skips", "lat avg ms", "lat max ms", "over max s", "conns", "rt/min", "cpu ms"]
+    print("  ".join(h.ljust(width) for h, (_, _, width) in zip(headers, columns)))
+    for result in results:
+        cells = []
+        for key, fmt, width in columns:
+            value = result[key]
+            cells.append(("-" if value is None else fmt.format(value)).ljust(width))
+        print("  ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Skip latency benchmark against a simulated VLC")
+    parser.add_argument("--rate", type=float, default=4.0, help="Playback rate of the simulated player")
+    parser.add_argument("--only", action="append", choices=sorted(CONFIGURATIONS), help="Run only these configurations")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON Lines instead of a table")
+    args = parser.parse_args()
+
+    names = args.only or list(CONFIGURATIONS)
+    results = []
+    with tempfile.TemporaryDirectory() as directory:
+        json_path = write_segments_file(directory)
+        for name in names:
+            print(f"Running {name}...")
+            results.append(run_configuration(name, CONFIGURATIONS[name], json_path, args.rate))
+
+    if args.json:
+        for result in results:
+            print(json.dumps(result))
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
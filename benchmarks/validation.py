@@ -0,0 +1,73 @@
+"""Validation speed on large generated sidecar files
+
+Generates segment files with thousands of entries and times the
+fail-fast check, the full report, the complete load_plan pipeline and a
+load_plan served from the binary cache.
+
+    python -m benchmarks.validation [--segments 1000 10000 50000]
+"""
+import argparse
+import json
+import os
+import tempfile
+import timeit
+from src.utils.json_validator import VideoConfigValidator
+from src.utils.segment_plan import load_plan
+
+
+def format_time(ms):
+    """Formats milliseconds as HH:MM:SS.mmm"""
+    seconds = ms // 1000
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}.{ms % 1000:03d}"
+
+
+def generate_document(count):
+    """Returns a valid sidecar document with count non-overlapping segments"""
+    # Millisecond times keep even 50,000 segments within 24 hours
+    step = max(2, 23 * 3600 * 1000 // count)
+    return {
+        "version": "1.0",
+        "video_info": {"filename": "generated.mp4", "duration": "23:59:59"},
+        "time_segments": [
+            {
+                "id": i + 1,
+                "name": f"Segment {i + 1}",
+                "trigger_time": format_time(i * step),
+                "jump_to_time": format_time(i * step + step // 2),
+                "enabled": True,
+            }
+            for i in range(count)
+        ],
+        "settings": {"loop_segments": False, "show_notifications": False},
+    }
+
+
+def best_ms(function, repeat=5):
+    """Returns the best of several runs in milliseconds"""
+    return min(timeit.repeat(function, number=1, repeat=repeat)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validation speed on generated sidecar files")
+    parser.add_argument("--segments", type=int, nargs="+", default=[1000, 10000, 50000], help="Segment counts to generate")
+    args = parser.parse_args()
+
+    validator = VideoConfigValidator()
+    print(f"{'segments':<10}{'is_valid ms':<14}{'validate ms':<14}{'load_plan ms':<14}{'compiled ms':<14}")
+    with tempfile.TemporaryDirectory() as directory:
+        for count in args.segments:
+            document = generate_document(count)
+            path = os.path.join(directory, f"generated_{count}.json")
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(document, f)
+
+            fail_fast = best_ms(lambda: validator.is_valid(document))
+            full = best_ms(lambda: validator.validate(document))
+            pipeline = best_ms(lambda: load_plan(path, validator, use_compiled=False))
+            load_plan(path, validator)
+            compiled = best_ms(lambda: load_plan(path, validator))
+            print(f"{count:<10}{fail_fast:<14.1f}{full:<14.1f}{pipeline:<14.1f}{compiled:<14.3f}")
+
+
+if __name__ == "__main__":
+    main()
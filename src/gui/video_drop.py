@@ -3,14 +3,26 @@ from tkinter import messagebox
 import tkinterdnd2 as tkdnd
 import os
 import threading
-from src.utils.json_finder import check_video_file
-from src.vlc.launcher import main as vlc_main
+from src.utils.json_finder import check_video_file, set_fingerprint_index, set_segment_store, set_sidecar_patterns
+from src.vlc.launcher import load_config, main as vlc_main
+from src.vlc.player_pool import create_pool
 
 class VideoDropWindow:
     def __init__(self):
         # Create main window with DnD support
         self.root = tkdnd.TkinterDnD.Tk()
         self.current_video_path = None  # Store path to current video file
+        self.current_plan = None  # Segments loaded from the video's JSON file
+        self.pool = None  # Running VLC instances waiting for the next video
+        config = load_config()
+        if config is not None:
+            set_sidecar_patterns(config['sidecar_patterns'])
+            set_segment_store(config['segment_store'])
+            set_fingerprint_index(config['fingerprint_index'])
+            # Start the players now, so they are up by the time a video is dropped
+            self.pool = create_pool(config)
+            if self.pool is not None:
+                self.pool.start()
         self.setup_window()
         self.setup_drop_area()
         
@@ -164,7 +176,8 @@ Checking JSON file..."""
         self.root.update()  # Update interface to show message
 
         # Check for JSON file
-        json_check_result = check_video_file(self.current_video_path)
+        self.current_plan = check_video_file(self.current_video_path)
+        json_check_result = self.current_plan is not None
         
         if json_check_result:
             # JSON file found and valid
@@ -240,14 +253,27 @@ Size: {size_mb:.2f} MB
                 # Launch VLC in a separate thread or process
                 import threading
     
+                video_path = self.current_video_path
+                plan = self.current_plan
+
                 def run_vlc():
                     # Call main function from launcher
-                    vlc_main(self.current_video_path)
+                    vlc_main(video_path, plan, self.pool)
     
                 # Launch in a separate thread
                 self.vlc_thread = threading.Thread(target=run_vlc)
                 self.vlc_thread.daemon = False  # Thread will continue after main application closes
                 self.vlc_thread.start()
+
+                if self.pool is not None:
+                    # Keep accepting drops: each further video goes to the next ready player
+                    self.info_label.config(
+                        text=f"Playing {os.path.basename(video_path)} in VLC.\n\nDrop another video to open it in a ready player.",
+                        fg="darkgreen"
+                    )
+                    self.current_video_path = None
+                    self.current_plan = None
+                    return
     
                 # Close main window
                 self.root.destroy()
@@ -339,5 +365,9 @@ Size: {size_mb:.2f} MB
             
     def run(self):
         """Run the application"""
-        self.root.mainloop()
+        try:
+            self.root.mainloop()
+        finally:
+            if self.pool is not None:
+                self.pool.close()
 
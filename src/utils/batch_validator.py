@@ -0,0 +1,277 @@
+import argparse
+import json
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from src.utils.json_validator import VideoConfigValidator
+from src.utils.segment_plan import check_video, load_plan
+from src.utils.sidecar_resolver import DEFAULT_PATTERNS, SidecarResolver, parse_patterns
+
+CACHE_FILENAME = ".segment_validation_cache.json"
+CACHE_VERSION = 3
+
+# Validator of the current worker process, created on first use
+worker_validator = None
+
+
+def scan_library(root, resolver=None):
+    """Walks a directory tree and yields (video_path, json_path, size, mtime_ns) for every video
+
+    Each directory is listed once by the sidecar resolver, which pairs all
+    its videos with their JSON files from that listing instead of probing
+    the disk per video. json_path, size and mtime_ns are None for videos
+    without a sidecar.
+    """
+    if resolver is None:
+        resolver = SidecarResolver()
+    pending = [os.path.abspath(root)]
+    while pending:
+        directory = pending.pop()
+        listing = resolver.list_directory(directory)
+        pending.extend(os.path.join(directory, name) for name in listing.subdirs if not name.startswith('.'))
+
+        # A series-level file is shared by many videos; stat it once
+        stats = {}
+        for video_path, json_path in resolver.resolve_folder(directory):
+            if json_path is not None and json_path not in stats:
+                try:
+                    stats[json_path] = os.stat(json_path)
+                except OSError:
+                    stats[json_path] = None
+            st = stats.get(json_path)
+            if st is None:
+                yield video_path, None, None, None
+            else:
+                yield video_path, json_path, st.st_size, st.st_mtime_ns
+
+
+def video_stamp(video_path, json_path, size, mtime_ns, shared):
+    """Returns what a video's cached record must match: its sidecar's and its own size and mtime"""
+    try:
+        st = os.stat(video_path)
+        video_size, video_mtime_ns = st.st_size, st.st_mtime_ns
+    except OSError:
+        video_size = video_mtime_ns = None
+    return {
+        "sidecar": json_path,
+        "size": size,
+        "mtime_ns": mtime_ns,
+        "video_size": video_size,
+        "video_mtime_ns": video_mtime_ns,
+        "shared": shared,
+    }
+
+
+def validate_sidecar(job):
+    """Validates one sidecar file for the videos that use it; runs in a worker process
+
+    job is (json_path, [video stamp, ...]). The file is validated once;
+    each video that is the only one using it is then checked against its
+    own duration, while a series-level file shared by several videos is
+    not, since its video_info cannot match every episode. Returns one
+    JSON Lines record per video.
+    """
+    global worker_validator
+    if worker_validator is None:
+        worker_validator = VideoConfigValidator()
+    json_path, stamps = job
+
+    started = time.perf_counter()
+    plan, result = load_plan(json_path, worker_validator)
+    records = []
+    for video_path, stamp in stamps:
+        warnings = list(result["warnings"])
+        if plan is not None and not stamp["shared"]:
+            video_result = {"warnings": []}
+            check_video(plan, video_result, worker_validator, video_path)
+            warnings.extend(video_result["warnings"])
+        records.append({
+            "video": video_path,
+            **stamp,
+            "valid": result["valid"],
+            "errors": result["errors"],
+            "warnings": warnings,
+            "segments": len(plan.segments) if plan is not None else 0,
+        })
+    seconds = round(time.perf_counter() - started, 6)
+    for record in records:
+        record["seconds"] = seconds
+    return records
+
+
+class ValidationCache:
+    """Validation results stored on disk, one per video
+
+    A cached record is only reused while the video's sidecar and the video
+    file itself keep their size and mtime, so a re-run validates just the
+    files edited since, and a replaced video is checked against its new
+    duration.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.records = {}
+        self.dirty = False
+
+    def load(self):
+        """Reads the cache file; a missing, unreadable or outdated cache starts empty"""
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return self
+        if isinstance(data, dict) and data.get("version") == CACHE_VERSION:
+            self.records = data.get("records", {})
+        return self
+
+    def get(self, video_path, stamp):
+        """Returns the cached record of a video if nothing in its stamp changed, or None"""
+        record = self.records.get(video_path)
+        if record is None or any(record.get(key) != value for key, value in stamp.items()):
+            return None
+        return record
+
+    def put(self, record):
+        self.records[record["video"]] = record
+        self.dirty = True
+
+    def prune(self, root, seen):
+        """Drops the records of videos under root that no longer exist or lost their sidecar"""
+        prefix = os.path.join(root, "")
+        stale = [path for path in self.records if path.startswith(prefix) and path not in seen]
+        for path in stale:
+            del self.records[path]
+        self.dirty = self.dirty or bool(stale)
+
+    def save(self):
+        """Writes the cache atomically, so an interrupted run cannot leave it truncated"""
+        if not self.dirty:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, temp_path = tempfile.mkstemp(prefix=".validation-", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"version": CACHE_VERSION, "records": self.records}, f, ensure_ascii=False)
+            os.replace(temp_path, self.path)
+        except OSError:
+            os.unlink(temp_path)
+            raise
+        self.dirty = False
+
+
+def validate_library(root, cache=None, workers=None, chunksize=16, resolver=None):
+    """Validates every sidecar under root and yields one record per video as results arrive
+
+    Videos whose sidecar and file are unchanged are served from the cache
+    first; the rest are spread across a pool of worker processes and
+    yielded in completion order. A JSON file shared by several videos is
+    validated once.
+    """
+    root = os.path.abspath(root)
+    found = list(scan_library(root, resolver))
+    users = {}
+    for _, json_path, _, _ in found:
+        if json_path is not None:
+            users[json_path] = users.get(json_path, 0) + 1
+
+    jobs = {}
+    seen = set()
+    for video_path, json_path, size, mtime_ns in found:
+        if json_path is None:
+            yield {"video": video_path, "sidecar": None, "valid": False,
+                   "errors": ["No JSON sidecar found"], "warnings": [], "segments": 0, "cached": False}
+            continue
+        seen.add(video_path)
+        stamp = video_stamp(video_path, json_path, size, mtime_ns, users[json_path] > 1)
+        record = cache.get(video_path, stamp) if cache is not None else None
+        if record is not None:
+            yield {**record, "cached": True}
+            continue
+        jobs.setdefault(json_path, []).append((video_path, stamp))
+
+    if cache is not None:
+        cache.prune(root, seen)
+
+    if workers is None:
+        workers = min(os.cpu_count() or 1, max(1, len(jobs) // chunksize))
+
+    tasks = list(jobs.items())
+    if workers <= 1:
+        results = map(validate_sidecar, tasks)
+        pool = None
+    else:
+        pool = multiprocessing.Pool(workers)
+        results = pool.imap_unordered(validate_sidecar, tasks, chunksize)
+    try:
+        for records in results:
+            for record in records:
+                if cache is not None:
+                    cache.put(record)
+                yield {**record, "cached": False}
+    finally:
+        if pool is not None:
+            pool.terminate()
+
+
+def print_summary(records, elapsed, slowest=10, stream=sys.stderr):
+    """Prints counts and the slowest validated files"""
+    missing = [r for r in records if r["sidecar"] is None]
+    checked = [r for r in records if r["sidecar"] is not None]
+    invalid = [r for r in checked if not r["valid"]]
+    print(f"Videos: {len(records)} in {elapsed:.2f} s", file=stream)
+    print(f"  Sidecars checked: {len(checked)} ({sum(1 for r in checked if r['cached'])} from cache)", file=stream)
+    print(f"  Valid: {len(checked) - len(invalid)}", file=stream)
+    print(f"  Invalid: {len(invalid)}", file=stream)
+    print(f"  With warnings: {sum(1 for r in checked if r['warnings'])}", file=stream)
+    print(f"  Without sidecar: {len(missing)}", file=stream)
+
+    # Videos sharing a sidecar carry the same timing; list each file once
+    validated = {r["sidecar"]: r for r in checked if not r["cached"]}
+    timed = sorted(validated.values(), key=lambda r: r["seconds"], reverse=True)[:slowest]
+    if timed:
+        print("Slowest files:", file=stream)
+        for record in timed:
+            print(f"  {record['seconds'] * 1000:8.1f} ms  {record['sidecar']}", file=stream)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate the segment files of a whole media library")
+    parser.add_argument("root", help="Directory to scan recursively for videos and their JSON files")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes (default: one per CPU)")
+    parser.add_argument("--output", default=None, help="Write JSON Lines results to this file instead of stdout")
+    parser.add_argument("--cache", default=None, help=f"Cache file (default: {CACHE_FILENAME} in the root directory)")
+    parser.add_argument("--no-cache", action="store_true", help="Validate every file and do not update the cache")
+    parser.add_argument("--patterns", default=", ".join(DEFAULT_PATTERNS), help="Comma-separated JSON file naming patterns, in priority order")
+    parser.add_argument("--slowest", type=int, default=10, help="Number of slowest files to list in the summary")
+    args = parser.parse_args()
+
+    if not os.path.isdir(args.root):
+        print(f"Not a directory: {args.root}", file=sys.stderr)
+        return False
+
+    cache = None
+    if not args.no_cache:
+        cache = ValidationCache(args.cache or os.path.join(args.root, CACHE_FILENAME)).load()
+
+    output = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    started = time.perf_counter()
+    records = []
+    try:
+        resolver = SidecarResolver(parse_patterns(args.patterns))
+        for record in validate_library(args.root, cache, args.workers, resolver=resolver):
+            records.append(record)
+            output.write(json.dumps(record, ensure_ascii=False) + "\n")
+    finally:
+        if cache is not None:
+            cache.save()
+        if output is not sys.stdout:
+            output.close()
+
+    print_summary(records, time.perf_counter() - started, args.slowest)
+    return all(record["valid"] for record in records)
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
@@ -0,0 +1,232 @@
+import glob
+import hashlib
+import json
+import mmap
+import os
+import re
+import struct
+import sys
+import tempfile
+from array import array
+from collections.abc import Sequence
+from typing import Any, Dict, NamedTuple
+from src.utils.segment_index import SegmentIndex
+
+MAGIC = b"SEGC"
+# Bump whenever the layout changes, so older caches are rebuilt
+FORMAT_VERSION = 2
+BYTE_ORDER = b"L" if sys.byteorder == "little" else b"B"
+
+# magic, version, byte order, source size, source mtime_ns, source digest,
+# segment count, range count, index name count, name bytes, index name bytes, metadata bytes
+HEADER = struct.Struct("=4sHcxqq16sIIIIII")
+MTIME_OFFSET = 16
+ITEM = array('q').itemsize
+# What follows ".<sidecar name>." in the name of one of its caches; the bare form is from format 1
+CACHE_SUFFIX = re.compile(r"(?:[0-9a-f]{16}\.)?segc")
+
+
+def compiled_path(json_path, digest, rules):
+    """Returns the path of the binary cache for one content and rule version of a sidecar file
+
+    The name is derived from the content digest, the validation rules and
+    the format version. A changed sidecar therefore gets a new file rather
+    than replacing one that a loaded plan may still have mapped, which
+    Windows refuses.
+    """
+    directory, name = os.path.split(json_path)
+    key = hashlib.blake2b(digest + rules.encode('utf-8') + FORMAT_VERSION.to_bytes(2, 'little'), digest_size=8)
+    return os.path.join(directory, f".{name}.{key.hexdigest()}.segc")
+
+
+def remove_stale_compiled(json_path, keep):
+    """Deletes the caches a sidecar's earlier contents left behind, except keep
+
+    A cache that is still mapped cannot be deleted on Windows; it is
+    retried the next time the sidecar is compiled.
+    """
+    directory, name = os.path.split(json_path)
+    prefix = f".{name}."
+    for path in glob.glob(os.path.join(glob.escape(directory), glob.escape(prefix) + "*segc")):
+        if path != keep and CACHE_SUFFIX.fullmatch(os.path.basename(path)[len(prefix):]):
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
+
+
+def content_digest(raw):
+    """Returns the hash of a sidecar's bytes stored in the cache header"""
+    return hashlib.blake2b(raw, digest_size=16).digest()
+
+
+class PackedStrings(Sequence):
+    """UTF-8 strings stored back to back in a buffer, decoded on access"""
+
+    def __init__(self, offsets, blob):
+        self.offsets = offsets
+        self.blob = blob
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("string index out of range")
+        return str(self.blob[self.offsets[i]:self.offsets[i + 1]], 'utf-8')
+
+
+class GroupedStrings(Sequence):
+    """Consecutive runs of a PackedStrings, one tuple per group"""
+
+    def __init__(self, bounds, strings):
+        self.bounds = bounds
+        self.strings = strings
+
+    def __len__(self):
+        return len(self.bounds) - 1
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+        if i < 0:
+            i += len(self)
+        if not 0 <= i < len(self):
+            raise IndexError("group index out of range")
+        return tuple(self.strings[j] for j in range(self.bounds[i], self.bounds[i + 1]))
+
+
+class CompiledPlan(NamedTuple):
+    """The contents of a binary cache; the arrays are views into the mapped file"""
+    ids: Sequence
+    starts: Sequence
+    ends: Sequence
+    names: PackedStrings
+    index: SegmentIndex
+    meta: Dict[str, Any]
+    # False when the cache was matched by content digest and its stored mtime is outdated
+    mtime_matches: bool
+
+
+def pack_strings(strings):
+    """Returns (offsets, blob) for a list of strings"""
+    offsets = array('q', [0])
+    encoded = []
+    for string in strings:
+        data = string.encode('utf-8')
+        encoded.append(data)
+        offsets.append(offsets[-1] + len(data))
+    return offsets, b"".join(encoded)
+
+
+def write_compiled(json_path, size, mtime_ns, digest, rules, segments, index, meta):
+    """Writes the binary cache for a sidecar validated under rules; raises OSError if it cannot be written
+
+    segments are (id, name, start_ms, end_ms) tuples and index the
+    SegmentIndex built from them. The file appears atomically, and caches
+    of the sidecar's earlier contents are removed.
+    """
+    names_offsets, names_blob = pack_strings(segment[1] for segment in segments)
+    index_names = []
+    bounds = array('q', [0])
+    for i in range(len(index)):
+        index_names.extend(index.names(i))
+        bounds.append(len(index_names))
+    index_names_offsets, index_names_blob = pack_strings(index_names)
+    meta_blob = json.dumps(meta, ensure_ascii=False).encode('utf-8')
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, BYTE_ORDER, size, mtime_ns, digest,
+        len(segments), len(index), len(index_names), len(names_blob), len(index_names_blob), len(meta_blob),
+    )
+    arrays = (
+        array('q', (segment[0] for segment in segments)),
+        array('q', (segment[2] for segment in segments)),
+        array('q', (segment[3] for segment in segments)),
+        names_offsets,
+        array('q', (index.start(i) for i in range(len(index)))),
+        array('q', (index.end(i) for i in range(len(index)))),
+        bounds,
+        index_names_offsets,
+    )
+
+    path = compiled_path(json_path, digest, rules)
+    fd, temp_path = tempfile.mkstemp(prefix=".segc-", suffix=".tmp", dir=os.path.dirname(os.path.abspath(path)))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(header)
+            for values in arrays:
+                f.write(values.tobytes())
+            f.write(names_blob)
+            f.write(index_names_blob)
+            f.write(meta_blob)
+        os.replace(temp_path, path)
+    except OSError:
+        try:
+            os.unlink(temp_path)
+        except OSError:
+            pass
+        raise
+    remove_stale_compiled(json_path, path)
+
+
+def read_compiled(json_path, size, mtime_ns, digest, rules):
+    """Maps the binary cache of a sidecar if it matches the source file, or returns None
+
+    The cache matches when it was built under the same rules from a
+    sidecar of the same size and content digest; a different mtime only
+    clears mtime_matches. Nothing is copied out of the mapping: the arrays
+    are memoryviews and names are decoded on access.
+    """
+    try:
+        with open(compiled_path(json_path, digest, rules), 'rb') as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+
+    try:
+        (magic, version, byte_order, source_size, source_mtime_ns, source_digest,
+         count, range_count, index_name_count, names_size, index_names_size, meta_size) = HEADER.unpack_from(mapped)
+    except struct.error:
+        return None
+    if magic != MAGIC or version != FORMAT_VERSION or byte_order != BYTE_ORDER or source_size != size or source_digest != digest:
+        return None
+    mtime_matches = source_mtime_ns == mtime_ns
+
+    lengths = (count, count, count, count + 1, range_count, range_count, range_count + 1, index_name_count + 1)
+    arrays_end = HEADER.size + sum(lengths) * ITEM
+    if len(mapped) != arrays_end + names_size + index_names_size + meta_size:
+        return None
+
+    view = memoryview(mapped)
+    arrays = []
+    offset = HEADER.size
+    for length in lengths:
+        arrays.append(view[offset:offset + length * ITEM].cast('q'))
+        offset += length * ITEM
+    ids, starts, ends, names_offsets, range_starts, range_ends, bounds, index_names_offsets = arrays
+    names = PackedStrings(names_offsets, view[offset:offset + names_size])
+    offset += names_size
+    index_names = PackedStrings(index_names_offsets, view[offset:offset + index_names_size])
+    offset += index_names_size
+    try:
+        meta = json.loads(str(view[offset:], 'utf-8'))
+    except ValueError:
+        return None
+
+    index = SegmentIndex(range_starts, range_ends, GroupedStrings(bounds, index_names))
+    return CompiledPlan(ids, starts, ends, names, index, meta, mtime_matches)
+
+
+def refresh_compiled(json_path, digest, rules, mtime_ns):
+    """Stores a sidecar's new mtime in its cache after its content was found unchanged"""
+    try:
+        with open(compiled_path(json_path, digest, rules), 'r+b') as f:
+            f.seek(MTIME_OFFSET)
+            f.write(struct.pack("=q", mtime_ns))
+    except OSError:
+        pass
@@ -0,0 +1,191 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from src.utils.json_validator import VideoConfigValidator
+from src.utils.segment_plan import load_plan
+from src.utils.metrics import registry
+
+# inotify event flags (linux/inotify.h)
+IN_MODIFY = 0x002
+IN_CLOSE_WRITE = 0x008
+IN_MOVED_FROM = 0x040
+IN_MOVED_TO = 0x080
+IN_CREATE = 0x100
+IN_DELETE = 0x200
+WATCH_MASK = IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def stat_signature(path):
+    """Returns (mtime_ns, size) of a file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class StatWatcher:
+    """Detects changes to one file by comparing its mtime and size every interval"""
+
+    name = "stat"
+
+    def __init__(self, path):
+        self.path = path
+        self.signature = stat_signature(path)
+
+    def wait(self, timeout):
+        """Sleeps for timeout seconds; returns True if the file changed meanwhile"""
+        time.sleep(timeout)
+        signature = stat_signature(self.path)
+        if signature == self.signature:
+            return False
+        self.signature = signature
+        return True
+
+    def close(self):
+        pass
+
+
+class InotifyWatcher:
+    """Blocks on inotify events for one file
+
+    The watch is on the containing directory: editors commonly save by
+    writing a temporary file and renaming it over the original, which
+    would silently end a watch on the file itself.
+    """
+
+    name = "inotify"
+
+    def __init__(self, path):
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.directory = os.path.dirname(os.path.abspath(path))
+        self.filename = os.fsencode(os.path.basename(path))
+        if libc.inotify_add_watch(self.fd, os.fsencode(self.directory), WATCH_MASK) < 0:
+            errno = ctypes.get_errno()
+            os.close(self.fd)
+            raise OSError(errno, f"inotify_add_watch failed for {self.directory}")
+
+    def wait(self, timeout):
+        """Waits up to timeout seconds; returns True if an event concerned the file"""
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return False
+        changed = False
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return False
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            _, _, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+            if name == self.filename:
+                changed = True
+        return changed
+
+    def close(self):
+        os.close(self.fd)
+
+
+def create_watcher(path):
+    """Returns an inotify watcher on Linux, or the stat-polling fallback"""
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(path)
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}), watching {path} by polling")
+    return StatWatcher(path)
+
+
+class SegmentFileReloader:
+    """Watches a sidecar JSON file and rebuilds its segment index in the background
+
+    Every change is parsed and validated on the watcher thread. A valid
+    file becomes the pending plan, which the monitor loop picks up between
+    ticks with take(); an invalid one is reported and ignored, so the last
+    good plan stays in effect. While nothing changed, take() is a single
+    attribute check. Passing the signature of the plan already in use makes
+    an edit made since it was loaded count as a change. Given the video
+    being played, reloaded plans are checked against its duration like the
+    first load.
+    """
+
+    def __init__(self, path, interval=1.0, debounce=0.2, signature=None, video_path=None):
+        self.path = path
+        self.video_path = video_path
+        self.interval = interval
+        self.debounce = debounce
+        self.validator = VideoConfigValidator()
+        self.signature = signature if signature is not None else stat_signature(path)
+        self.pending = None
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+        self.watcher = None
+
+    def start(self):
+        """Starts watching on a daemon thread"""
+        self.watcher = create_watcher(self.path)
+        # Catch an edit made before the watch was in place
+        self.reload()
+        self.thread = threading.Thread(target=self.run, name="segment-reloader", daemon=True)
+        self.thread.start()
+        print(f"Watching {self.path} for changes ({self.watcher.name})")
+
+    def stop(self):
+        """Stops watching; the thread exits within one interval"""
+        self.stop_event.set()
+
+    def run(self):
+        try:
+            while not self.stop_event.is_set():
+                if not self.watcher.wait(self.interval):
+                    continue
+                # Let the editor finish writing before reading the file
+                if self.stop_event.wait(self.debounce):
+                    break
+                self.reload()
+        finally:
+            self.watcher.close()
+
+    def reload(self):
+        """Validates the file and stores a rebuilt plan if it changed and is valid"""
+        signature = stat_signature(self.path)
+        if signature is None or signature == self.signature:
+            return False
+        self.signature = signature
+
+        plan, result = load_plan(self.path, self.validator, video_path=self.video_path)
+        if plan is None:
+            return self.reject(result["errors"])
+        with self.lock:
+            self.pending = plan
+        return True
+
+    def reject(self, errors):
+        """Reports an invalid edit; the current plan stays in effect"""
+        registry.counter("segment_reloads_total", "Sidecar file reloads", {"result": "rejected"}).inc()
+        print(f"Ignoring invalid edit to {self.path}, keeping the previous segments:")
+        for error in errors:
+            print(f"  • {error}")
+        return False
+
+    def take(self):
+        """Returns the SegmentPlan built since the last call, or None"""
+        if self.pending is None:
+            return None
+        with self.lock:
+            plan, self.pending = self.pending, None
+        return plan
@@ -0,0 +1,196 @@
+import atexit
+import hashlib
+import json
+import os
+import queue
+import tempfile
+import threading
+
+CHUNK_SIZE = 64 * 1024
+# Blocks hashed between the head and the tail, spread evenly over the file
+MIDDLE_SAMPLES = 3
+INDEX_VERSION = 1
+# Most fingerprints kept per file identity; the least recently used go first
+MAX_FINGERPRINTS = 10000
+# Seconds without new registrations before the index is written to disk
+SAVE_DELAY = 1.0
+
+
+def read_at(f, size, offset):
+    """Reads size bytes at offset without moving the file position where os.pread exists"""
+    if hasattr(os, "pread"):
+        return os.pread(f.fileno(), size, offset)
+    f.seek(offset)
+    return f.read(size)
+
+
+def fingerprint_file(path):
+    """Identifies a video by its size and a few fixed-size chunks of its content
+
+    Hashes the first and last CHUNK_SIZE bytes and MIDDLE_SAMPLES blocks in
+    between, so a multi-gigabyte file costs a handful of small reads. Small
+    files are hashed whole. Renaming or moving a file keeps its fingerprint;
+    any change to its content is likely to change it.
+    """
+    with open(path, 'rb') as f:
+        size = os.fstat(f.fileno()).st_size
+        digest = hashlib.blake2b(size.to_bytes(8, 'little'), digest_size=16)
+        if size <= CHUNK_SIZE * (MIDDLE_SAMPLES + 2):
+            digest.update(f.read())
+        else:
+            last = size - CHUNK_SIZE
+            offsets = [0] + [last * k // (MIDDLE_SAMPLES + 1) for k in range(1, MIDDLE_SAMPLES + 1)] + [last]
+            for offset in offsets:
+                digest.update(read_at(f, CHUNK_SIZE, offset))
+    return digest.hexdigest()
+
+
+class FingerprintIndex:
+    """Remembers which JSON file belongs to which video content
+
+    Every video whose JSON file is found by name is registered under its
+    fingerprint; a video that later turns up under another name or in
+    another folder is matched back to that JSON file. Fingerprints are
+    cached by (device, inode, size, mtime), which a rename or a move within
+    the same file system keeps, so a known file is never read twice. With
+    a path the index is kept on disk between runs, otherwise only in memory.
+    Registering only queues the video: a background thread fingerprints it
+    and writes the index once registrations stop coming in, so the thread
+    that found the JSON file (often the playback monitor) does no reads.
+    Only fingerprints that lead to a JSON file are written to disk, JSON
+    files that no longer exist are forgotten when the index is loaded, and
+    at most MAX_FINGERPRINTS file identities and as many JSON file matches
+    are remembered.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.fingerprints = {}
+        self.plans = {}
+        self.lock = threading.Lock()
+        self.queue = queue.Queue()
+        self.worker = None
+        self.dirty = False
+        if path:
+            self.load()
+            # Registrations still waiting for the debounced save are not lost on exit
+            atexit.register(self.flush)
+
+    def load(self):
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if isinstance(data, dict) and data.get("version") == INDEX_VERSION:
+            self.plans = {value: json_path for value, json_path in data.get("plans", {}).items() if os.path.exists(json_path)}
+            self.fingerprints = {key: value for key, value in data.get("fingerprints", {}).items() if value in self.plans}
+
+    def save(self):
+        """Writes the index atomically; a read-only location keeps it in memory only"""
+        with self.lock:
+            self.dirty = False
+            if not self.path:
+                return
+            # Fingerprints of videos without a JSON file only save reads within this run
+            plans = dict(self.plans)
+            fingerprints = {key: value for key, value in self.fingerprints.items() if value in plans}
+        directory = os.path.dirname(os.path.abspath(self.path))
+        try:
+            os.makedirs(directory, exist_ok=True)
+            fd, temp_path = tempfile.mkstemp(prefix=".fingerprints-", suffix=".tmp", dir=directory)
+        except OSError:
+            return
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump({"version": INDEX_VERSION, "fingerprints": fingerprints, "plans": plans}, f)
+            os.replace(temp_path, self.path)
+        except OSError:
+            try:
+                os.unlink(temp_path)
+            except OSError:
+                pass
+
+    def fingerprint(self, video_path):
+        """Returns the fingerprint of a video file, or None if it cannot be read"""
+        try:
+            st = os.stat(video_path)
+        except OSError:
+            return None
+        key = f"{st.st_dev}:{st.st_ino}:{st.st_size}:{st.st_mtime_ns}"
+        with self.lock:
+            cached = self.fingerprints.pop(key, None)
+            if cached is not None:
+                # Re-inserted so the dict stays in least recently used order
+                self.fingerprints[key] = cached
+                return cached
+        try:
+            value = fingerprint_file(video_path)
+        except OSError:
+            return None
+        with self.lock:
+            self.fingerprints[key] = value
+            while len(self.fingerprints) > MAX_FINGERPRINTS:
+                del self.fingerprints[next(iter(self.fingerprints))]
+        return value
+
+    def register(self, video_path, json_path):
+        """Queues the JSON file found by name for a video to be recorded in the background"""
+        self.queue.put((video_path, os.path.abspath(json_path)))
+        with self.lock:
+            if self.worker is None:
+                self.worker = threading.Thread(target=self.run, name="fingerprint-index", daemon=True)
+                self.worker.start()
+
+    def record(self, video_path, json_path):
+        """Fingerprints a video and remembers its JSON file"""
+        value = self.fingerprint(video_path)
+        if value is None:
+            return
+        with self.lock:
+            if self.plans.get(value) == json_path:
+                return
+            self.plans.pop(value, None)
+            self.plans[value] = json_path
+            while len(self.plans) > MAX_FINGERPRINTS:
+                del self.plans[next(iter(self.plans))]
+            self.dirty = True
+
+    def run(self):
+        """Records queued registrations, saving once none arrived for SAVE_DELAY seconds"""
+        while True:
+            try:
+                item = self.queue.get(timeout=SAVE_DELAY)
+            except queue.Empty:
+                with self.lock:
+                    if not self.queue.empty():
+                        continue
+                    # A registration arriving from now on starts a new worker
+                    self.worker = None
+                    dirty = self.dirty
+                if dirty:
+                    self.save()
+                return
+            try:
+                self.record(*item)
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        """Waits until queued registrations are recorded and writes the index if it changed"""
+        self.queue.join()
+        with self.lock:
+            dirty = self.dirty
+        if dirty:
+            self.save()
+
+    def find(self, video_path):
+        """Returns the JSON file registered for a video's content, or None"""
+        value = self.fingerprint(video_path)
+        if value is None:
+            return None
+        with self.lock:
+            json_path = self.plans.get(value)
+        if json_path is None or not os.path.exists(json_path):
+            return None
+        return json_path
@@ -1,32 +1,121 @@
 import os
-from src.utils.json_validator import main as validate_main
+import sqlite3
+from src.utils.fingerprint import FingerprintIndex
+from src.utils.json_validator import print_report
+from src.utils.segment_plan import load_plan
+from src.utils.segment_store import SegmentStore
+from src.utils.sidecar_resolver import SidecarResolver
+
+# Shared by the GUI, the launcher and the controller; see set_sidecar_patterns
+resolver = SidecarResolver()
+# Optional SQLite segment library consulted before JSON files; see set_segment_store
+store = None
+# Content fingerprint -> JSON file, for videos that were renamed or moved; see set_fingerprint_index
+fingerprints = FingerprintIndex()
+
+def set_sidecar_patterns(patterns):
+    """
+    Replaces the naming patterns used to find JSON files (from config.ini)
+    """
+    global resolver
+    resolver = SidecarResolver(patterns)
+
+def set_fingerprint_index(path):
+    """
+    Keeps the fingerprint index in the file named in config.ini (in memory only for an empty path)
+    """
+    global fingerprints
+    if fingerprints.path != (path or None):
+        fingerprints = FingerprintIndex(path or None)
+
+def set_segment_store(path):
+    """
+    Opens the segment database named in config.ini, or disables it for an empty path
+    """
+    global store
+    if store is not None and store.path == path:
+        return
+    store = None
+    if not path:
+        return
+    try:
+        store = SegmentStore(path)
+    except sqlite3.Error as e:
+        print(f"Cannot open segment database {path}: {e}")
+
+def find_stored_plan(video_path):
+    """
+    Returns the plan stored for a video in the segment database, or None
+    """
+    if store is None or not video_path:
+        return None
+    try:
+        return store.lookup(video_path)
+    except sqlite3.Error as e:
+        print(f"Segment database lookup failed: {e}")
+        return None
+
+def locate_plan(video_path):
+    """
+    Returns (json_path, stored_plan) for a video: the plan from the segment
+    database and its source if there is one, otherwise the video's JSON file
+    path and None; json_path is None for inputs that are not local files
+    """
+    stored = find_stored_plan(video_path)
+    if stored is not None:
+        return os.path.abspath(stored.json_path), stored
+    if not video_path:
+        return None, None
+    return os.path.abspath(sidecar_path(video_path)), None
+
+def sidecar_path(video_path):
+    """
+    Returns the path of the JSON file that belongs to a video file,
+    or the <stem>.json path it would have if there is none
+    """
+    return find_json_file(video_path) or os.path.splitext(video_path)[0] + ".json"
 
 def find_json_file(video_path):
     """
-    Searches for a JSON file with the same name as the video file
+    Searches for the JSON file of a video file according to the naming patterns,
+    then by the video's content fingerprint
     """
-    directory = os.path.dirname(video_path)
-    filename_without_ext = os.path.splitext(os.path.basename(video_path))[0]
-    json_path = os.path.join(directory, f"{filename_without_ext}.json")
+    json_path = resolver.resolve(video_path)
+    if json_path is not None:
+        fingerprints.register(video_path, json_path)
+        return json_path
     
-    return json_path if os.path.exists(json_path) else None
+    # The video may have been renamed or moved away from its JSON file
+    json_path = fingerprints.find(video_path)
+    if json_path is not None:
+        print(f"JSON file matched by content: {json_path}")
+    return json_path
 
 def check_video_file(video_path):
     """
     Checks for the existence of a JSON file for the specified video file
+    and loads it; returns the SegmentPlan, or None if it is missing or invalid
     """
     # Check if the video file exists
     if not os.path.exists(video_path):
         print(f"Video file not found: {video_path}")
-        return
+        return None
+    
+    # The segment database, when configured, takes precedence over JSON files
+    plan = find_stored_plan(video_path)
+    if plan is not None:
+        print(f"Segments found in {store.path}: {len(plan.segments)} active")
+        return plan
     
     # Search for the JSON file
     json_path = find_json_file(video_path)
     
     if json_path:
         print(f"JSON file found: {json_path}")
-        # Pass the JSON file path to the validation function and return the result
-        return validate_main(json_path)
+        # Parse and validate the JSON file once; the plan is handed on to the launcher
+        plan, result = load_plan(json_path, video_path=video_path)
+        print_report(json_path, result)
+        return plan
     else:
         print("File with json extension not found")
-        return False
\ No newline at end of file
+        return None
\ No newline at end of file
@@ -1,120 +1,413 @@
 import json
 import re
-from typing import Dict, Any, List
+from bisect import bisect_right
+from collections.abc import Hashable
+from operator import itemgetter
+from typing import Dict, Any, Iterable, List, NamedTuple, Optional, Tuple
 
-class VideoConfigValidator:
-    def __init__(self):
-        self.required_structure = {
-            "version": str,
-            "video_info": {
-                "filename": str,
-                "duration": str
-            },
-            "time_segments": [
-                {
-                    "id": int,
-                    "name": str,
-                    "trigger_time": str,
-                    "jump_to_time": str,
-                    "enabled": bool
-                }
-            ],
-            "settings": {
-                "loop_segments": bool,
-                "show_notifications": bool
-            }
+# HH:MM:SS with optional milliseconds (HH:MM:SS.mmm)
+TIME_PATTERN = re.compile(r'^([0-1]?[0-9]|2[0-3]):([0-5][0-9]):([0-5][0-9])(?:\.([0-9]{1,3}))?$')
+
+VALID_EXTENSIONS = (".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv", ".webm")
+
+# Difference between video_info.duration and the video file's own duration still taken as a match
+DURATION_TOLERANCE_MS = 2000
+
+REQUIRED_STRUCTURE = {
+    "version": str,
+    "video_info": {
+        "filename": str,
+        "duration": str
+    },
+    "time_segments": [
+        {
+            "id": int,
+            "name": str,
+            "trigger_time": str,
+            "jump_to_time": str,
+            "enabled": bool
         }
+    ],
+    "settings": {
+        "loop_segments": bool,
+        "show_notifications": bool
+    }
+}
+
+
+class ValidationError(NamedTuple):
+    """One problem found in a document, with the JSON pointer (RFC 6901) of the offending value"""
+    pointer: str
+    message: str
     
-    def validate_time_format(self, time_str: str) -> bool:
-        """Checks the time format HH:MM:SS"""        
-        pattern = r'^([0-1]?[0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9]$'
-        return bool(re.match(pattern, time_str))
+    def __str__(self):
+        return self.message
+
+
+class StopValidation(Exception):
+    """Raised by a fail-fast error list as soon as the first problem is reported"""
+
+
+class FailFastErrors(list):
+    """Error list that aborts validation at the first error"""
     
-    def validate_structure(self, data: Dict[Any, Any], structure: Dict[Any, Any], path: str = "") -> List[str]:
-        """Recursively validates data structure"""
-        errors = []
+    def append(self, error):
+        raise StopValidation(error)
+
+
+def parse_time_ms(time_str: str) -> Optional[int]:
+    """Checks the format and converts HH:MM:SS(.mmm) to milliseconds in one match, or returns None"""
+    match = TIME_PATTERN.match(time_str)
+    if match is None:
+        return None
+    hours, minutes, seconds, fraction = match.groups()
+    ms = (int(hours) * 3600 + int(minutes) * 60 + int(seconds)) * 1000
+    if fraction:
+        ms += int(fraction.ljust(3, '0'))
+    return ms
+
+
+def format_ms(ms: int) -> str:
+    """Formats milliseconds as HH:MM:SS.mmm"""
+    seconds, ms = divmod(ms, 1000)
+    return f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}.{ms:03d}"
+
+
+def escape_pointer(key) -> str:
+    """Escapes one JSON pointer reference token"""
+    return str(key).replace("~", "~0").replace("/", "~1")
+
+
+def type_name(expected_type) -> str:
+    """Returns the JSON name used in messages for a Python type"""
+    if expected_type is dict:
+        return "object"
+    if expected_type is list:
+        return "array"
+    return expected_type.__name__
+
+
+def compile_schema(structure: Dict[str, Any]):
+    """Compiles a structure description into a check(data, pointer, errors) function
+
+    Key lookups, expected types and the checkers of nested objects and
+    arrays are resolved once here; at validation time the returned closure
+    only does dictionary lookups and isinstance tests, and formats a
+    pointer when it has an error to report.
+    """
+    fields = []
+    for key, expected in structure.items():
+        suffix = "/" + escape_pointer(key)
+        if isinstance(expected, dict):
+            fields.append((key, suffix, dict, compile_schema(expected)))
+        elif isinstance(expected, list) and len(expected) == 1:
+            fields.append((key, suffix, list, compile_array(expected[0])))
+        else:
+            fields.append((key, suffix, expected, None))
+    fields = tuple(fields)
+    known_keys = frozenset(structure)
+    
+    # Fast path for the common case of a well-formed object: all keys present, exact types
+    string_keys = tuple(key for key, _, expected_type, _ in fields if expected_type is str)
+    if len(string_keys) == 1:
+        get_strings = lambda data, key=string_keys[0]: (data[key],)
+    else:
+        get_strings = itemgetter(*string_keys) if string_keys else lambda data: ()
+    other_fields = tuple(field for field in fields if field[2] is not str)
+    
+    def is_well_formed(data):
+        if data.keys() != known_keys:
+            return False
+        for value in get_strings(data):
+            if value.__class__ is not str or not value.strip():
+                return False
+        for key, _, expected_type, _ in other_fields:
+            value = data[key]
+            if value.__class__ is not expected_type and not isinstance(value, expected_type):
+                return False
+        return True
+    
+    def check_object(data, pointer, errors):
+        if is_well_formed(data):
+            for key, suffix, _, check_child in other_fields:
+                if check_child is not None:
+                    check_child(data[key], pointer + suffix, errors)
+            return
         
-        # Check that all required keys are present
-        for key, expected_type in structure.items():
-            current_path = f"{path}.{key}" if path else key
-            
+        present = 0
+        for key, suffix, expected_type, check_child in fields:
             if key not in data:
-                errors.append(f"Missing required key: {current_path}")
+                errors.append(ValidationError(pointer + suffix, f"Missing required key: {pointer}{suffix}"))
                 continue
-            
+            present += 1
             value = data[key]
             
             # Check that the value is not empty
-            if value is None or (isinstance(value, str) and value.strip() == ""):
-                errors.append(f"Empty value for key: {current_path}")
+            if value is None or (isinstance(value, str) and not value.strip()):
+                errors.append(ValidationError(pointer + suffix, f"Empty value for key: {pointer}{suffix}"))
                 continue
             
             # Check data type
-            if isinstance(expected_type, dict):
-                if not isinstance(value, dict):
-                    errors.append(f"Invalid type for {current_path}. Expected object, got {type(value).__name__}")
-                else:
-                    errors.extend(self.validate_structure(value, expected_type, current_path))
-            
-            elif isinstance(expected_type, list) and len(expected_type) == 1:
-                if not isinstance(value, list):
-                    errors.append(f"Invalid type for {current_path}. Expected array, got {type(value).__name__}")
-                elif len(value) == 0:
-                    errors.append(f"Empty array for {current_path}")
-                else:
-                    for i, item in enumerate(value):
-                        item_path = f"{current_path}[{i}]"
-                        if not isinstance(item, dict):
-                            errors.append(f"Invalid array element type {item_path}. Expected object")
-                        else:
-                            errors.extend(self.validate_structure(item, expected_type[0], item_path))
+            if not isinstance(value, expected_type):
+                errors.append(ValidationError(
+                    pointer + suffix,
+                    f"Invalid type for {pointer}{suffix}. Expected {type_name(expected_type)}, got {type(value).__name__}"
+                ))
+                continue
             
-            else:
-                if not isinstance(value, expected_type):
-                    errors.append(f"Invalid type for {current_path}. Expected {expected_type.__name__}, got {type(value).__name__}")
+            if check_child is not None:
+                check_child(value, pointer + suffix, errors)
         
         # Check that there are no extra keys
-        for key in data:
-            if key not in structure:
-                current_path = f"{path}.{key}" if path else key
-                errors.append(f"Unexpected key: {current_path}")
-        
-        return errors
+        if len(data) > present:
+            for key in data:
+                if key not in known_keys:
+                    errors.append(ValidationError(
+                        f"{pointer}/{escape_pointer(key)}",
+                        f"Unexpected key: {pointer}/{escape_pointer(key)}"
+                    ))
     
-    def validate_business_rules(self, data: Dict[Any, Any]) -> List[str]:
-        """Validates business logic"""
+    # Arrays of flat objects skip even formatting the pointer of well-formed items
+    check_object.is_flat_and_well_formed = None if any(field[3] for field in fields) else is_well_formed
+    return check_object
+
+
+def compile_array(item_structure: Dict[str, Any]):
+    """Compiles the description of an array of objects into a check(items, pointer, errors) function"""
+    check_item = compile_schema(item_structure)
+    is_flat_and_well_formed = check_item.is_flat_and_well_formed or (lambda item: False)
+    
+    def check_array(items, pointer, errors):
+        if not items:
+            errors.append(ValidationError(pointer, f"Empty array for {pointer}"))
+            return
+        for i, item in enumerate(items):
+            if item.__class__ is dict and is_flat_and_well_formed(item):
+                continue
+            if not isinstance(item, dict):
+                errors.append(ValidationError(f"{pointer}/{i}", f"Invalid array element type {pointer}/{i}. Expected object"))
+            else:
+                check_item(item, f"{pointer}/{i}", errors)
+    
+    return check_array
+
+
+# Structures compiled so far, keyed by identity; the required structure is compiled at import
+compiled_schemas = {}
+
+
+def compiled_schema(structure: Dict[str, Any]):
+    """Returns the compiled checker of a structure, compiling it on first use"""
+    entry = compiled_schemas.get(id(structure))
+    if entry is None or entry[0] is not structure:
+        entry = (structure, compile_schema(structure))
+        compiled_schemas[id(structure)] = entry
+    return entry[1]
+
+
+compiled_schema(REQUIRED_STRUCTURE)
+
+
+def has_rule_fields(data: Any) -> bool:
+    """Returns whether data holds every field check_business_rules reads, with a usable type"""
+    if not isinstance(data, dict):
+        return False
+    video_info = data.get("video_info")
+    segments = data.get("time_segments")
+    if not isinstance(video_info, dict) or not isinstance(segments, list):
+        return False
+    if not isinstance(video_info.get("duration"), str) or not isinstance(video_info.get("filename"), str):
+        return False
+    return all(
+        isinstance(segment, dict) and isinstance(segment.get("id"), Hashable) and "enabled" in segment
+        and isinstance(segment.get("trigger_time"), str) and isinstance(segment.get("jump_to_time"), str)
+        for segment in segments
+    )
+
+
+class VideoConfigValidator:
+    # Bump whenever a rule changes what is reported, so compiled plans checked with older rules are rebuilt
+    RULES_VERSION = 1
+    
+    def __init__(self):
+        self.required_structure = REQUIRED_STRUCTURE
+        self.check_structure = compiled_schema(REQUIRED_STRUCTURE)
+    
+    def validate_time_format(self, time_str: str) -> bool:
+        """Checks the time format HH:MM:SS with optional milliseconds (HH:MM:SS.mmm)"""        
+        return TIME_PATTERN.match(time_str) is not None
+    
+    def validate_structure(self, data: Dict[Any, Any], structure: Dict[Any, Any], path: str = "") -> List[str]:
+        """Validates data structure; path is the JSON pointer of data"""
         errors = []
+        compiled_schema(structure)(data, path, errors)
+        return [error.message for error in errors]
+    
+    def check_business_rules(self, data: Dict[Any, Any], errors: List[ValidationError], warnings: Optional[List[ValidationError]] = None) -> None:
+        """Appends the business logic problems of a structurally valid document to errors and warnings
+
+        The segment analysis sorts the segments once, so it runs in
+        O(n log n) however many segments a generated file holds.
+        """
+        if warnings is None:
+            warnings = []
         
         # Check time format in video_info
-        if "video_info" in data and "duration" in data["video_info"]:
-            if not self.validate_time_format(data["video_info"]["duration"]):
-                errors.append("Invalid time format for video_info.duration (expected HH:MM:SS)")
+        duration = data["video_info"]["duration"]
+        duration_ms = parse_time_ms(duration)
+        if duration_ms is None:
+            errors.append(ValidationError(
+                "/video_info/duration",
+                "Invalid time format for /video_info/duration (expected HH:MM:SS or HH:MM:SS.mmm)"
+            ))
         
-        # Check time format in segments
-        if "time_segments" in data:
-            for i, segment in enumerate(data["time_segments"]):
-                if "trigger_time" in segment:
-                    if not self.validate_time_format(segment["trigger_time"]):
-                        errors.append(f"Invalid time format for time_segments[{i}].trigger_time")
-                
-                if "jump_to_time" in segment:
-                    if not self.validate_time_format(segment["jump_to_time"]):
-                        errors.append(f"Invalid time format for time_segments[{i}].jump_to_time")
-                
-                # Check ID uniqueness
-                if "id" in segment:
-                    segment_ids = [s.get("id") for s in data["time_segments"] if "id" in s]
-                    if segment_ids.count(segment["id"]) > 1:
-                        errors.append(f"Duplicate segment ID: {segment['id']}")
+        segments = data["time_segments"]
+        id_counts = {}
+        for segment in segments:
+            id_counts[segment["id"]] = id_counts.get(segment["id"], 0) + 1
+        
+        # Enabled (start, end, position) ranges for the overlap analysis
+        ranges = []
+        for i, segment in enumerate(segments):
+            pointer = f"/time_segments/{i}"
+            
+            # Check ID uniqueness
+            if id_counts[segment["id"]] > 1:
+                errors.append(ValidationError(f"{pointer}/id", f"Duplicate segment ID: {segment['id']}"))
+            
+            # Check time format in segments
+            start = parse_time_ms(segment["trigger_time"])
+            if start is None:
+                errors.append(ValidationError(f"{pointer}/trigger_time", f"Invalid time format for {pointer}/trigger_time"))
+            end = parse_time_ms(segment["jump_to_time"])
+            if end is None:
+                errors.append(ValidationError(f"{pointer}/jump_to_time", f"Invalid time format for {pointer}/jump_to_time"))
+            if start is None or end is None:
+                continue
+            
+            if end <= start:
+                problem = "jumps to its own trigger_time" if end == start else "jumps backwards"
+                warnings.append(ValidationError(f"{pointer}/jump_to_time", f"Segment {segment['id']} ({pointer}) {problem} and is ignored"))
+            
+            # Check that the segment lies within the video
+            if duration_ms is not None and end > duration_ms:
+                if start >= duration_ms:
+                    warnings.append(ValidationError(f"{pointer}/trigger_time", f"Segment {segment['id']} ({pointer}) starts after the end of the video ({duration})"))
+                else:
+                    warnings.append(ValidationError(f"{pointer}/jump_to_time", f"Segment {segment['id']} ({pointer}) jumps past the end of the video ({duration})"))
+            
+            if segment["enabled"]:
+                ranges.append((start, end, i))
+        
+        self.check_overlaps(segments, ranges, warnings)
         
         # Check file extension
-        if "video_info" in data and "filename" in data["video_info"]:
-            filename = data["video_info"]["filename"]
-            valid_extensions = [".mp4", ".avi", ".mkv", ".mov", ".wmv", ".flv", ".webm"]
-            if not any(filename.lower().endswith(ext) for ext in valid_extensions):
-                errors.append(f"Unsupported file extension: {filename}")
+        filename = data["video_info"]["filename"]
+        if not filename.lower().endswith(VALID_EXTENSIONS):
+            errors.append(ValidationError("/video_info/filename", f"Unsupported file extension: {filename}"))
+    
+    def check_overlaps(self, segments: List[Dict[str, Any]], ranges: List[Tuple[int, int, int]], warnings: List[ValidationError]) -> None:
+        """Warns about overlapping enabled segments and backward jumps into other segments
+
+        One sweep over the forward ranges sorted by start tracks the range
+        reaching furthest so far; a range starting before that reach
+        overlaps it. The same sweep leaves a prefix maximum of ends that
+        lets every backward jump find, by bisection, a segment containing
+        its target.
+        """
+        forward = sorted(item for item in ranges if item[1] > item[0])
+        starts = []
+        reach = []  # (furthest end so far, position of the segment reaching it)
+        reach_end, reach_i = -1, -1
+        for start, end, i in forward:
+            if start < reach_end:
+                other = segments[reach_i]
+                label = f"Segment {segments[i]['id']} (/time_segments/{i})"
+                if end <= reach_end:
+                    message = f"{label} lies inside segment {other['id']} and never triggers"
+                else:
+                    message = f"{label} overlaps segment {other['id']}; both are skipped in one seek"
+                warnings.append(ValidationError(f"/time_segments/{i}/trigger_time", message))
+            if end > reach_end:
+                reach_end, reach_i = end, i
+            starts.append(start)
+            reach.append((reach_end, reach_i))
         
-        return errors
+        # Seek chains back into an earlier segment
+        for start, end, i in ranges:
+            if end >= start:
+                continue
+            k = bisect_right(starts, end) - 1
+            if k >= 0 and reach[k][0] > end:
+                other = segments[reach[k][1]]
+                warnings.append(ValidationError(
+                    f"/time_segments/{i}/jump_to_time",
+                    f"Segment {segments[i]['id']} (/time_segments/{i}) would jump back into segment {other['id']}"
+                ))
+    
+    def check_video_duration(self, video_info: Dict[str, Any], segments: Iterable[Any], actual_ms: int) -> List[ValidationError]:
+        """Compares a loaded plan with the duration probed from its video file
+
+        segments are the plan's Segment tuples. Returns warnings: a declared
+        duration that differs from the file's usually means the segments
+        were written for another cut of the video.
+        """
+        warnings = []
+        actual = format_ms(actual_ms)
+        declared_ms = parse_time_ms(video_info["duration"])
+        if declared_ms is not None and abs(declared_ms - actual_ms) > DURATION_TOLERANCE_MS:
+            warnings.append(ValidationError(
+                "/video_info/duration",
+                f"Duration {video_info['duration']} does not match the video file ({actual}); the segments may be for a different cut"
+            ))
+        for segment in segments:
+            if segment.start_ms >= actual_ms:
+                warnings.append(ValidationError("/time_segments", f"Segment {segment.id} starts after the end of the video file ({actual})"))
+            elif segment.end_ms > actual_ms + DURATION_TOLERANCE_MS:
+                warnings.append(ValidationError("/time_segments", f"Segment {segment.id} jumps past the end of the video file ({actual})"))
+        return warnings
+    
+    def validate_business_rules(self, data: Dict[Any, Any]) -> List[str]:
+        """Validates business logic; returns no errors for a document missing the fields the rules read
+
+        Runs the same check_business_rules as validate, once the keys and
+        types it relies on are confirmed to be there.
+        """
+        errors = []
+        if has_rule_fields(data):
+            self.check_business_rules(data, errors)
+        return [error.message for error in errors]
+    
+    def validate(self, data: Any, fail_fast: bool = False, warnings: Optional[List[ValidationError]] = None) -> List[ValidationError]:
+        """Validates parsed JSON data and returns structured errors
+
+        With fail_fast, validation stops at the first error and at most one
+        is returned. Warnings about documents that are valid but probably
+        not what was meant are appended to warnings when a list is given.
+        """
+        errors = FailFastErrors() if fail_fast else []
+        try:
+            if not isinstance(data, dict):
+                errors.append(ValidationError("", f"Invalid type for document. Expected object, got {type(data).__name__}"))
+                return errors
+            
+            # Validate structure
+            self.check_structure(data, "", errors)
+            
+            # Validate business rules (only if structure is correct)
+            if not errors:
+                self.check_business_rules(data, errors, warnings)
+        except StopValidation as stop:
+            return [stop.args[0]]
+        return list(errors)
+    
+    def is_valid(self, data: Any) -> bool:
+        """Returns whether parsed JSON data is valid, stopping at the first error"""
+        return not self.validate(data, fail_fast=True)
+    
+    def validate_data(self, data: Dict[Any, Any]) -> List[str]:
+        """Validates already parsed JSON data; returns the list of error messages"""
+        return [error.message for error in self.validate(data)]
     
     def validate_json_file(self, file_path: str) -> Dict[str, Any]:
         """Main JSON file validation function"""
@@ -141,25 +434,17 @@ class VideoConfigValidator:
             result["errors"].append(f"File reading error: {e}")
             return result
         
-        # Validate structure
-        structure_errors = self.validate_structure(data, self.required_structure)
-        result["errors"].extend(structure_errors)
-        
-        # Validate business rules (only if structure is correct)
-        if not structure_errors:
-            business_errors = self.validate_business_rules(data)
-            result["errors"].extend(business_errors)
+        warnings = []
+        result["errors"].extend(error.message for error in self.validate(data, warnings=warnings))
+        result["warnings"].extend(warning.message for warning in warnings)
         
         # Determine validity
         result["valid"] = len(result["errors"]) == 0
         
         return result
 
-def main(file_path):
-    validator = VideoConfigValidator()
-    
-    result = validator.validate_json_file(file_path)
-    
+def print_report(file_path, result):
+    """Prints a validation report to the console"""
     print(f"File validation: {file_path}")
     print(f"Result: {'✅ VALID' if result['valid'] else '❌ NOT VALID'}")
     
@@ -176,4 +461,10 @@ def main(file_path):
     if result["valid"]:
         print("\n✅ JSON file is correct and ready to use!")
 
+def main(file_path):
+    validator = VideoConfigValidator()
+    
+    result = validator.validate_json_file(file_path)
+    print_report(file_path, result)
+
     return result["valid"]  # Return boolean value
\ No newline at end of file
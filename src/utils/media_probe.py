@@ -0,0 +1,206 @@
+import os
+import struct
+
+# Neither format needs more than a handful of top-level boxes or elements
+# before the one holding the duration; give up on anything stranger
+MAX_ELEMENTS = 64
+# Largest mvhd box or Matroska Info element read into memory
+MAX_HEADER_SIZE = 64 * 1024
+
+MP4_TOP_LEVEL = {b"ftyp", b"moov", b"mdat", b"free", b"skip", b"wide", b"pnot", b"uuid", b"styp", b"sidx", b"moof"}
+
+EBML_HEADER = 0x1A45DFA3
+MKV_SEGMENT = 0x18538067
+MKV_SEEK_HEAD = 0x114D9B74
+MKV_SEEK = 0x4DBB
+MKV_SEEK_ID = 0x53AB
+MKV_SEEK_POSITION = 0x53AC
+MKV_INFO = 0x1549A966
+MKV_TIMECODE_SCALE = 0x2AD7B1
+MKV_DURATION = 0x4489
+MKV_CLUSTER = 0x1F43B675
+
+
+def read_at(f, offset, size):
+    f.seek(offset)
+    return f.read(size)
+
+
+def probe_duration_ms(video_path):
+    """Returns the duration a video file declares in its container header, in milliseconds
+
+    Supports MP4/MOV (moov/mvhd) and Matroska/WebM (Segment/Info/Duration).
+    Only box and element headers are read, with a bounded number of seeks
+    past the media data, so the cost does not depend on the file size.
+    Returns None for other formats and for files whose header carries no
+    duration.
+    """
+    try:
+        with open(video_path, 'rb') as f:
+            file_size = os.fstat(f.fileno()).st_size
+            head = f.read(12)
+            if head[:4] == EBML_HEADER.to_bytes(4, 'big'):
+                return probe_matroska(f, file_size)
+            if head[4:8] in MP4_TOP_LEVEL:
+                return probe_mp4(f, file_size)
+    except (OSError, struct.error, ValueError, IndexError):
+        pass
+    return None
+
+
+def mp4_boxes(f, start, end):
+    """Yields (type, payload offset, payload size) for the boxes between start and end"""
+    position = start
+    for _ in range(MAX_ELEMENTS):
+        if position + 8 > end:
+            return
+        size, box_type = struct.unpack(">I4s", read_at(f, position, 8))
+        header = 8
+        if size == 1:
+            size = struct.unpack(">Q", f.read(8))[0]
+            header = 16
+        elif size == 0:
+            size = end - position
+        if size < header:
+            return
+        yield box_type, position + header, size - header
+        position += size
+
+
+def probe_mp4(f, file_size):
+    for box_type, offset, size in mp4_boxes(f, 0, file_size):
+        if box_type != b"moov":
+            continue
+        timescale = duration = None
+        for child, child_offset, child_size in mp4_boxes(f, offset, offset + size):
+            if child == b"mvhd" and child_size <= MAX_HEADER_SIZE:
+                payload = read_at(f, child_offset, child_size)
+                if payload[0] == 1:
+                    timescale, duration = struct.unpack_from(">IQ", payload, 20)
+                else:
+                    timescale, duration = struct.unpack_from(">II", payload, 12)
+                    if duration == 0xFFFFFFFF:
+                        duration = 0
+            elif child == b"mvex" and timescale and not duration:
+                # Fragmented files may only know their length from the movie extends header
+                for grandchild, grandchild_offset, grandchild_size in mp4_boxes(f, child_offset, child_offset + child_size):
+                    if grandchild == b"mehd":
+                        payload = read_at(f, grandchild_offset, min(grandchild_size, 12))
+                        duration = struct.unpack_from(">Q" if payload[0] == 1 else ">I", payload, 4)[0]
+        if timescale and duration:
+            return duration * 1000 // timescale
+        return None
+    return None
+
+
+def read_vint(data, offset, keep_marker=False):
+    """Decodes an EBML variable-length integer; returns (value, length), value None for unknown sizes"""
+    first = data[offset]
+    length = 1
+    mask = 0x80
+    while length <= 8 and not first & mask:
+        mask >>= 1
+        length += 1
+    if length > 8 or len(data) < offset + length:
+        raise ValueError("invalid or truncated EBML variable-length integer")
+    value = first if keep_marker else first & (mask - 1)
+    for byte in data[offset + 1:offset + length]:
+        value = (value << 8) | byte
+    if not keep_marker and value == (1 << (7 * length)) - 1:
+        value = None
+    return value, length
+
+
+def ebml_element(data, offset):
+    """Returns (id, size, header length) of the element at offset in data"""
+    element_id, id_length = read_vint(data, offset, keep_marker=True)
+    size, size_length = read_vint(data, offset + id_length)
+    return element_id, size, id_length + size_length
+
+
+def ebml_children(data):
+    """Yields (id, payload) for the elements of an in-memory master element"""
+    offset = 0
+    while offset < len(data):
+        element_id, size, header = ebml_element(data, offset)
+        if size is None:
+            return
+        if offset + header + size > len(data):
+            raise ValueError("truncated EBML element")
+        yield element_id, data[offset + header:offset + header + size]
+        offset += header + size
+
+
+def read_uint(payload):
+    return int.from_bytes(payload, 'big')
+
+
+def probe_matroska(f, file_size):
+    # EBML header, then the Segment that holds everything else
+    position = 0
+    segment_start = None
+    for _ in range(MAX_ELEMENTS):
+        if position >= file_size:
+            return None
+        element_id, size, header = ebml_element(read_at(f, position, 12), 0)
+        if element_id == MKV_SEGMENT:
+            segment_start = position + header
+            segment_end = file_size if size is None else min(file_size, segment_start + size)
+            break
+        if size is None:
+            return None
+        position += header + size
+    if segment_start is None:
+        return None
+
+    # Info normally comes right after the SeekHead; otherwise the SeekHead says where it is
+    info_position = None
+    position = segment_start
+    for _ in range(MAX_ELEMENTS):
+        if position >= segment_end:
+            break
+        element_id, size, header = ebml_element(read_at(f, position, 12), 0)
+        if element_id == MKV_INFO:
+            return matroska_info_duration(f, position + header, size)
+        if element_id == MKV_CLUSTER or size is None:
+            break
+        if element_id == MKV_SEEK_HEAD and size <= MAX_HEADER_SIZE:
+            info_position = matroska_seek_position(read_at(f, position + header, size), MKV_INFO, segment_start) or info_position
+        position += header + size
+
+    if info_position is not None and info_position < segment_end:
+        element_id, size, header = ebml_element(read_at(f, info_position, 12), 0)
+        if element_id == MKV_INFO:
+            return matroska_info_duration(f, info_position + header, size)
+    return None
+
+
+def matroska_seek_position(seek_head, element, segment_start):
+    """Returns the file offset the SeekHead gives for an element, or None"""
+    try:
+        for seek_id, seek in ebml_children(seek_head):
+            if seek_id != MKV_SEEK:
+                continue
+            fields = dict(ebml_children(seek))
+            if read_uint(fields.get(MKV_SEEK_ID, b"")) == element and MKV_SEEK_POSITION in fields:
+                return segment_start + read_uint(fields[MKV_SEEK_POSITION])
+    except (ValueError, IndexError):
+        # A damaged SeekHead only costs the shortcut
+        pass
+    return None
+
+
+def matroska_info_duration(f, offset, size):
+    if size is None or size > MAX_HEADER_SIZE:
+        return None
+    timecode_scale = 1000000
+    duration = None
+    for element_id, payload in ebml_children(read_at(f, offset, size)):
+        if element_id == MKV_TIMECODE_SCALE:
+            timecode_scale = read_uint(payload)
+        elif element_id == MKV_DURATION and len(payload) in (4, 8):
+            duration = struct.unpack(">f" if len(payload) == 4 else ">d", payload)[0]
+    if not duration or duration < 0:
+        return None
+    # Duration is in timecode units of timecode_scale nanoseconds
+    return int(duration * timecode_scale / 1000000)
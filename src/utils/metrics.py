@@ -0,0 +1,213 @@
+import json
+import threading
+import time
+from bisect import bisect_left
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Latency buckets in seconds, from sub-millisecond RC replies to multi-second seeks
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def escape_label(value):
+    """Escapes a label value for the Prometheus text format"""
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def format_labels(labels, extra=None):
+    """Renders a label tuple as a Prometheus label set"""
+    items = list(labels)
+    if extra is not None:
+        items.append(extra)
+    if not items:
+        return ""
+    return "{" + ",".join(f'{key}="{escape_label(value)}"' for key, value in items) + "}"
+
+
+class Counter:
+    """Monotonically increasing count"""
+
+    kind = "counter"
+
+    def __init__(self):
+        self.value = 0
+
+    def inc(self, amount=1):
+        self.value += amount
+
+    def samples(self, name, labels):
+        yield name, format_labels(labels), self.value
+
+    def snapshot(self):
+        return self.value
+
+
+class Gauge:
+    """Value that can go up and down"""
+
+    kind = "gauge"
+
+    def __init__(self):
+        self.value = 0.0
+
+    def set(self, value):
+        self.value = value
+
+    def samples(self, name, labels):
+        yield name, format_labels(labels), self.value
+
+    def snapshot(self):
+        return self.value
+
+
+class Histogram:
+    """Distribution of observed values in fixed buckets"""
+
+    kind = "histogram"
+
+    def __init__(self, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f"{name}_bucket", format_labels(labels, ("le", bound)), cumulative
+        yield f"{name}_bucket", format_labels(labels, ("le", "+Inf")), self.count
+        yield f"{name}_sum", format_labels(labels), self.sum
+        yield f"{name}_count", format_labels(labels), self.count
+
+    def snapshot(self):
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "mean": self.sum / self.count if self.count else None,
+            "buckets": {str(bound): count for bound, count in zip(self.buckets + ("+Inf",), self.counts)},
+        }
+
+
+class MetricsRegistry:
+    """Named metrics with Prometheus-text and JSON snapshots
+
+    Updates are plain attribute arithmetic with no locking, so recording
+    from the monitor loop costs well under a microsecond; snapshots may be
+    off by an in-flight update, which is fine for monitoring.
+    """
+
+    def __init__(self):
+        self.metrics = {}
+        self.help = {}
+        self.lock = threading.Lock()
+        self.started = time.time()
+        self.server = None
+
+    def _get(self, cls, name, help_text, labels, **kwargs):
+        key = (name, tuple(sorted((labels or {}).items())))
+        metric = self.metrics.get(key)
+        if metric is None:
+            with self.lock:
+                metric = self.metrics.get(key)
+                if metric is None:
+                    metric = cls(**kwargs)
+                    self.metrics[key] = metric
+                    self.help.setdefault(name, (cls.kind, help_text))
+        return metric
+
+    def counter(self, name, help_text="", labels=None):
+        """Returns the counter with this name and labels, creating it if needed"""
+        return self._get(Counter, name, help_text, labels)
+
+    def gauge(self, name, help_text="", labels=None):
+        """Returns the gauge with this name and labels, creating it if needed"""
+        return self._get(Gauge, name, help_text, labels)
+
+    def histogram(self, name, help_text="", labels=None, buckets=DEFAULT_BUCKETS):
+        """Returns the histogram with this name and labels, creating it if needed"""
+        return self._get(Histogram, name, help_text, labels, buckets=buckets)
+
+    def _sorted_metrics(self):
+        """Returns a stable copy of the registered metrics, safe against concurrent registration"""
+        with self.lock:
+            items = list(self.metrics.items())
+        return sorted(items, key=lambda item: item[0])
+
+    def render_prometheus(self):
+        """Returns all metrics in the Prometheus text exposition format"""
+        lines = []
+        described = set()
+        for (name, labels), metric in self._sorted_metrics():
+            if name not in described:
+                kind, help_text = self.help[name]
+                if help_text:
+                    lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                described.add(name)
+            for sample_name, label_text, value in metric.samples(name, labels):
+                lines.append(f"{sample_name}{label_text} {value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """Returns all metrics as a JSON-serializable dict"""
+        metrics = {}
+        for (name, labels), metric in self._sorted_metrics():
+            if labels:
+                metrics.setdefault(name, []).append({"labels": dict(labels), "value": metric.snapshot()})
+            else:
+                metrics[name] = metric.snapshot()
+        return {"uptime_seconds": time.time() - self.started, "metrics": metrics}
+
+    def dump(self, path):
+        """Writes the JSON snapshot to a file"""
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(self.snapshot(), f, indent=2)
+            print(f"Metrics written to {path}")
+        except OSError as e:
+            print(f"Error writing metrics to {path}: {e}")
+
+    def start_server(self, host, port):
+        """Serves /metrics (Prometheus text) and /metrics.json on a background thread"""
+        if self.server is not None:
+            return self.server
+        registry = self
+
+        class MetricsHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path == "/metrics":
+                    body = registry.render_prometheus().encode()
+                    content_type = "text/plain; version=0.0.4"
+                elif self.path == "/metrics.json":
+                    body = json.dumps(registry.snapshot()).encode()
+                    content_type = "application/json"
+                else:
+                    self.send_error(404)
+                    return
+                self.send_response(200)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        try:
+            self.server = ThreadingHTTPServer((host, port), MetricsHandler)
+        except OSError as e:
+            print(f"Error starting metrics endpoint on {host}:{port}: {e}")
+            return None
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"Metrics available at http://{host}:{self.server.server_address[1]}/metrics")
+        return self.server
+
+
+# Process-wide registry used by the controller, launcher and transports
+registry = MetricsRegistry()
@@ -0,0 +1,58 @@
+import threading
+from collections import OrderedDict
+from src.utils.json_validator import VideoConfigValidator
+from src.utils.segment_plan import load_plan
+from src.utils.metrics import registry
+
+PLAN_CACHE_HITS = registry.counter("plan_cache_hits_total", "Segment plans served from the in-memory cache")
+PLAN_CACHE_MISSES = registry.counter("plan_cache_misses_total", "Segment plans that had to be read from disk")
+
+# Returned by PlanCache.get when a path has never been loaded
+MISSING = object()
+
+
+class PlanCache:
+    """LRU cache of loaded and validated segment plans, keyed by sidecar path
+
+    Files that are missing or invalid are cached as None, so switching back to an input without a usable
+    sidecar does not hit the disk again either. Loads may run on prefetch
+    threads while the monitor loop reads the cache.
+    """
+
+    def __init__(self, capacity=8):
+        self.capacity = capacity
+        self.plans = OrderedDict()
+        self.lock = threading.Lock()
+        self.validator = VideoConfigValidator()
+
+    def get(self, json_path):
+        """Returns the cached plan (or None for an unusable file), or MISSING"""
+        with self.lock:
+            plan = self.plans.get(json_path, MISSING)
+            if plan is not MISSING:
+                self.plans.move_to_end(json_path)
+        return plan
+
+    def put(self, json_path, plan):
+        """Stores a plan, evicting the least recently used one when full"""
+        with self.lock:
+            self.plans[json_path] = plan
+            self.plans.move_to_end(json_path)
+            while len(self.plans) > self.capacity:
+                self.plans.popitem(last=False)
+
+    def load(self, json_path):
+        """Returns the plan for a sidecar path, reading and validating it on a cache miss"""
+        plan = self.get(json_path)
+        if plan is not MISSING:
+            PLAN_CACHE_HITS.inc()
+            return plan
+        PLAN_CACHE_MISSES.inc()
+
+        plan, result = load_plan(json_path, self.validator)
+        if plan is None:
+            print(f"No usable segment file {json_path}:")
+            for error in result["errors"]:
+                print(f"  • {error}")
+        self.put(json_path, plan)
+        return plan
@@ -0,0 +1,94 @@
+from array import array
+from bisect import bisect_right
+
+
+def time_to_ms(time_str):
+    """Converts time in HH:MM:SS or HH:MM:SS.mmm format to milliseconds"""
+    clock, _, fraction = time_str.partition('.')
+    parts = clock.split(':')
+    ms = (int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])) * 1000
+    if fraction:
+        # ".5" means 500 ms, not 5 ms
+        ms += int(fraction[:3].ljust(3, '0'))
+    return ms
+
+
+def time_to_seconds(time_str):
+    """Converts time in HH:MM:SS or HH:MM:SS.mmm format to (fractional) seconds"""
+    return time_to_ms(time_str) / 1000
+
+
+class SegmentIndex:
+    """Immutable, sorted index of skip ranges answering lookups by bisection
+
+    Each entry is a half-open range [start, end) in integer milliseconds
+    that is skipped by seeking to end. Overlapping or chained segments (one
+    segment's jump target lands inside the next) are merged, so a chain
+    costs a single seek to its final target.
+    """
+
+    __slots__ = ("_starts", "_ends", "_names")
+
+    def __init__(self, starts, ends, names):
+        self._starts = starts
+        self._ends = ends
+        self._names = names
+
+    @classmethod
+    def from_segments(cls, segments):
+        """Builds the index from enabled segment dicts with HH:MM:SS(.mmm) times"""
+        return cls.from_ranges(
+            (time_to_ms(segment['trigger_time']), time_to_ms(segment['jump_to_time']), segment['name'])
+            for segment in segments
+        )
+
+    @classmethod
+    def from_ranges(cls, ranges):
+        """Builds the index from (start_ms, end_ms, name) triples"""
+        # Backward or zero-length jumps can never match "start <= t < end"
+        ranges = sorted((start, end, name) for start, end, name in ranges if end > start)
+
+        starts = array('q')
+        ends = array('q')
+        names = []
+        for start, end, name in ranges:
+            # A range starting inside (or exactly at the end of) the previous one extends it
+            if ends and start <= ends[-1]:
+                if end > ends[-1]:
+                    ends[-1] = end
+                names[-1] = names[-1] + (name,)
+                continue
+            starts.append(start)
+            ends.append(end)
+            names.append((name,))
+
+        return cls(starts, ends, tuple(names))
+
+    def __len__(self):
+        return len(self._starts)
+
+    def find(self, position):
+        """Returns the index of the range containing position (ms), or -1"""
+        i = bisect_right(self._starts, position) - 1
+        if i >= 0 and position < self._ends[i]:
+            return i
+        return -1
+
+    def next_start(self, position):
+        """Returns the first trigger time (ms) after position (ms), or None if there is none"""
+        i = bisect_right(self._starts, position)
+        if i < len(self._starts):
+            return self._starts[i]
+        return None
+
+    def start(self, i):
+        """Returns the trigger time of range i in milliseconds"""
+        return self._starts[i]
+
+    def end(self, i):
+        """Returns the seek target of range i in milliseconds"""
+        return self._ends[i]
+
+    def names(self, i):
+        """Returns the names of the segments merged into range i"""
+        return self._names[i]
@@ -0,0 +1,181 @@
+import json
+import os
+from collections.abc import Sequence
+from typing import Any, Dict, NamedTuple, Optional, Tuple
+from src.utils.compiled_plan import content_digest, read_compiled, refresh_compiled, write_compiled
+from src.utils.json_validator import VideoConfigValidator
+from src.utils.media_probe import probe_duration_ms
+from src.utils.segment_index import SegmentIndex, time_to_ms
+
+
+# Folders a segment cache could not be written to, reported once each
+unwritable_directories = set()
+
+
+class Segment(NamedTuple):
+    """One enabled segment with its times normalised to milliseconds"""
+    id: int
+    name: str
+    start_ms: int
+    end_ms: int
+
+
+class SegmentPlan(NamedTuple):
+    """Everything the controller needs from one sidecar file, loaded once
+
+    Built by load_plan after the file has been parsed and validated; the
+    GUI, the launcher and the controller all share the same instance.
+    """
+    json_path: str
+    video_info: Dict[str, Any]
+    segments: Sequence  # of Segment
+    index: SegmentIndex
+    settings: Dict[str, Any]
+    warnings: Tuple[str, ...]
+    # (mtime_ns, size) of the file when it was read, so a watcher can tell later edits apart
+    signature: Optional[Tuple[int, int]]
+
+
+def build_plan(json_path, data, warnings=(), signature=None):
+    """Normalises validated sidecar data into a SegmentPlan"""
+    segments = tuple(
+        Segment(seg['id'], seg['name'], time_to_ms(seg['trigger_time']), time_to_ms(seg['jump_to_time']))
+        for seg in data['time_segments'] if seg['enabled']
+    )
+    index = SegmentIndex.from_ranges((seg.start_ms, seg.end_ms, seg.name) for seg in segments)
+    return SegmentPlan(json_path, data['video_info'], segments, index, data['settings'], tuple(warnings), signature)
+
+
+class PackedSegments(Sequence):
+    """The segments of a compiled plan, read from the mapped cache file on access"""
+
+    def __init__(self, ids, starts, ends, names):
+        self.ids = ids
+        self.starts = starts
+        self.ends = ends
+        self.names = names
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, i):
+        if isinstance(i, slice):
+            return tuple(self[j] for j in range(*i.indices(len(self))))
+        return Segment(self.ids[i], self.names[i], self.starts[i], self.ends[i])
+
+
+def rules_key(validator):
+    """Names the validator class and rule version a compiled plan was checked with"""
+    cls = type(validator)
+    return f"{cls.__module__}.{cls.__qualname__}:{getattr(validator, 'RULES_VERSION', 0)}"
+
+
+def load_compiled(json_path, signature_stat, digest, rules):
+    """Returns the plan stored in the sidecar's binary cache if it is still fresh, or None
+
+    A cache checked with other rules than the given ones counts as stale.
+    """
+    compiled = read_compiled(json_path, signature_stat.st_size, signature_stat.st_mtime_ns, digest, rules)
+    if compiled is None or compiled.meta.get('rules') != rules:
+        return None
+    if not compiled.mtime_matches:
+        refresh_compiled(json_path, digest, rules, signature_stat.st_mtime_ns)
+    meta = compiled.meta
+    return SegmentPlan(
+        json_path,
+        meta['video_info'],
+        PackedSegments(compiled.ids, compiled.starts, compiled.ends, compiled.names),
+        compiled.index,
+        meta['settings'],
+        tuple(meta['warnings']),
+        (signature_stat.st_mtime_ns, signature_stat.st_size),
+    )
+
+
+def save_compiled(plan, signature_stat, digest, rules):
+    """Writes the binary cache for a freshly validated plan, reporting once per folder where it cannot"""
+    meta = {"video_info": plan.video_info, "settings": plan.settings, "warnings": list(plan.warnings), "rules": rules}
+    try:
+        write_compiled(plan.json_path, signature_stat.st_size, signature_stat.st_mtime_ns, digest, rules, plan.segments, plan.index, meta)
+    except OSError as e:
+        # E.g. a read-only library: every load validates the JSON instead
+        directory = os.path.dirname(os.path.abspath(plan.json_path))
+        if directory not in unwritable_directories:
+            unwritable_directories.add(directory)
+            print(f"Cannot write the segment cache for {plan.json_path}: {e}")
+
+
+def check_video(plan, result, validator, video_path):
+    """Adds warnings for a plan that does not fit the duration of its video file"""
+    actual_ms = probe_duration_ms(video_path)
+    if actual_ms is None:
+        return plan
+    warnings = [warning.message for warning in validator.check_video_duration(plan.video_info, plan.segments, actual_ms)]
+    if not warnings:
+        return plan
+    result["warnings"].extend(warnings)
+    return plan._replace(warnings=plan.warnings + tuple(warnings))
+
+
+def load_plan(json_path, validator=None, use_compiled=True, video_path=None):
+    """Reads, validates and normalises a sidecar file in one pass
+
+    Returns (plan, result): result is the validator's report
+    ({"valid", "errors", "warnings"}) and plan is None unless the file is
+    valid. A valid file leaves a binary cache next to it (see
+    compiled_plan), which later loads map instead of parsing and
+    validating the JSON again, for as long as the file's size and content
+    digest are unchanged and the validator is of the same class and
+    RULES_VERSION as the one that checked it; otherwise the cache is
+    rebuilt. Only hashing the file is left on a cache hit. Given
+    the video file, the plan is also checked against the duration in the
+    video's container header; that check is never cached, since the video
+    can change independently of the JSON file.
+    """
+    if validator is None:
+        validator = VideoConfigValidator()
+    rules = rules_key(validator)
+    result = {"valid": False, "errors": [], "warnings": []}
+
+    try:
+        with open(json_path, 'rb') as f:
+            signature_stat = os.fstat(f.fileno())
+            raw = f.read()
+            digest = content_digest(raw)
+            plan = load_compiled(json_path, signature_stat, digest, rules) if use_compiled else None
+            if plan is not None:
+                result["valid"] = True
+                result["warnings"].extend(plan.warnings)
+                if video_path is not None:
+                    plan = check_video(plan, result, validator, video_path)
+                return plan, result
+            data = json.loads(raw.decode('utf-8'))
+    except FileNotFoundError:
+        result["errors"].append(f"File not found: {json_path}")
+        return None, result
+    except ValueError as e:
+        result["errors"].append(f"JSON parsing error: {e}")
+        return None, result
+    except OSError as e:
+        result["errors"].append(f"File reading error: {e}")
+        return None, result
+
+    warnings = []
+    result["errors"].extend(error.message for error in validator.validate(data, warnings=warnings))
+    result["warnings"].extend(warning.message for warning in warnings)
+    result["valid"] = not result["errors"]
+    if not result["valid"]:
+        return None, result
+
+    signature = (signature_stat.st_mtime_ns, signature_stat.st_size)
+    plan = build_plan(json_path, data, result["warnings"], signature)
+    if use_compiled:
+        save_compiled(plan, signature_stat, digest, rules)
+    if video_path is not None:
+        plan = check_video(plan, result, validator, video_path)
+    return plan, result
+
+
+def empty_plan(json_path=None):
+    """Returns a plan without segments, for inputs that have no usable sidecar"""
+    return SegmentPlan(json_path, {}, (), SegmentIndex.from_ranges(()), {}, (), None)
@@ -0,0 +1,354 @@
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from src.utils.batch_validator import scan_library
+from src.utils.json_validator import VideoConfigValidator
+from src.utils.metrics import registry
+from src.utils.segment_index import time_to_ms
+from src.utils.segment_plan import build_plan
+from src.utils.sidecar_resolver import DEFAULT_PATTERNS, SidecarResolver, parse_patterns
+
+STORE_CACHE_HITS = registry.counter("segment_store_cache_hits_total", "Segment store lookups answered from the in-process cache")
+STORE_QUERIES = registry.counter("segment_store_queries_total", "Segment store lookups that queried the database")
+STORE_STALE = registry.counter("segment_store_stale_total", "Segment store lookups skipped because the source JSON file changed after the import")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS videos (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    source TEXT,
+    version TEXT NOT NULL,
+    filename TEXT NOT NULL,
+    duration TEXT NOT NULL,
+    imported_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS segments (
+    video_id INTEGER NOT NULL REFERENCES videos (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    segment_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    trigger_time TEXT NOT NULL,
+    jump_to_time TEXT NOT NULL,
+    start_ms INTEGER NOT NULL,
+    end_ms INTEGER NOT NULL,
+    enabled INTEGER NOT NULL,
+    PRIMARY KEY (video_id, position)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS settings (
+    video_id INTEGER NOT NULL REFERENCES videos (id) ON DELETE CASCADE,
+    key TEXT NOT NULL,
+    value TEXT NOT NULL,
+    PRIMARY KEY (video_id, key)
+) WITHOUT ROWID;
+"""
+
+# Segments and settings of one video in a single statement; both halves are
+# primary-key range scans after the unique index lookup on videos.path
+LOOKUP_QUERY = """
+SELECT v.version, v.filename, v.duration, v.source,
+       s.segment_id, s.name, s.trigger_time, s.jump_to_time, s.enabled, NULL, NULL, s.position, v.imported_ns
+FROM videos v LEFT JOIN segments s ON s.video_id = v.id
+WHERE v.path = :path
+UNION ALL
+SELECT v.version, v.filename, v.duration, v.source,
+       NULL, NULL, NULL, NULL, NULL, t.key, t.value, NULL, v.imported_ns
+FROM videos v JOIN settings t ON t.video_id = v.id
+WHERE v.path = :path
+ORDER BY 12
+"""
+
+
+def video_key(video_path):
+    """Returns the form of a video path stored in the videos table"""
+    return os.path.normcase(os.path.abspath(video_path))
+
+
+class SegmentStore:
+    """Segment plans of a whole library in one SQLite database, keyed by video path
+
+    An alternative to one JSON file per video: documents in the
+    docs/json_format.json schema are validated on import and stored in
+    indexed videos, segments and settings tables. lookup() answers with one
+    indexed query and keeps the plans it built in an LRU cache, so asking
+    again for the same video does not touch the database. A video whose
+    source JSON file was modified after the import is not answered from
+    the store, so the edited file is used instead. The connection is
+    shared between threads behind a lock.
+    """
+
+    def __init__(self, path, cache_size=64):
+        self.path = path
+        self.cache_size = cache_size
+        self.plans = OrderedDict()
+        self.lock = threading.Lock()
+        self.validator = VideoConfigValidator()
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        self.connection.execute("PRAGMA foreign_keys = ON")
+        self.connection.execute("PRAGMA journal_mode = WAL")
+        self.connection.executescript(SCHEMA)
+
+    def close(self):
+        with self.lock:
+            self.connection.close()
+
+    def lookup(self, video_path):
+        """Returns the SegmentPlan stored for a video, or None if there is none or it is outdated
+
+        Videos that are not stored are not cached, so one imported while
+        the utility runs is found on the next lookup.
+        """
+        key = video_key(video_path)
+        with self.lock:
+            cached = self.plans.get(key)
+            if cached is not None:
+                self.plans.move_to_end(key)
+                STORE_CACHE_HITS.inc()
+            else:
+                STORE_QUERIES.inc()
+                rows = self.connection.execute(LOOKUP_QUERY, {"path": key}).fetchall()
+                if not rows:
+                    return None
+                cached = (self.build(video_path, rows), rows[0][3], rows[0][12])
+                self.plans[key] = cached
+                while len(self.plans) > self.cache_size:
+                    self.plans.popitem(last=False)
+        plan, source, imported_ns = cached
+        if not self.fresh(source, imported_ns):
+            STORE_STALE.inc()
+            return None
+        return plan
+
+    @staticmethod
+    def fresh(source, imported_ns):
+        """Returns False if the JSON file a video was imported from changed after the import"""
+        if not source:
+            return True
+        try:
+            return os.stat(source).st_mtime_ns <= imported_ns
+        except OSError:
+            # The file is gone and the store holds the only copy
+            return True
+
+    @staticmethod
+    def document(rows):
+        """Reassembles a docs/json_format.json document from the lookup query rows"""
+        version, filename, duration = rows[0][:3]
+        segments = []
+        settings = {}
+        for row in rows:
+            if row[4] is not None:
+                segment_id, name, trigger_time, jump_to_time, enabled = row[4:9]
+                segments.append({
+                    "id": segment_id,
+                    "name": name,
+                    "trigger_time": trigger_time,
+                    "jump_to_time": jump_to_time,
+                    "enabled": bool(enabled),
+                })
+            elif row[9] is not None:
+                settings[row[9]] = json.loads(row[10])
+        return {
+            "version": version,
+            "video_info": {"filename": filename, "duration": duration},
+            "time_segments": segments,
+            "settings": settings,
+        }
+
+    def build(self, video_path, rows):
+        # The JSON file it was imported from, or where one would go, so hot-reload and playlist switching have a path
+        source = rows[0][3] or os.path.splitext(video_path)[0] + ".json"
+        return build_plan(source, self.document(rows))
+
+    def import_documents(self, documents):
+        """Validates and stores (video_path, document, source) triples in one transaction
+
+        Returns {video_path: errors} for the documents that were rejected;
+        a video that is already stored is replaced.
+        """
+        rejected = {}
+        videos = []
+        segments = []
+        settings = []
+        now = time.time_ns()
+        for video_path, data, source in documents:
+            errors = self.validator.validate(data)
+            if errors:
+                rejected[video_path] = [error.message for error in errors]
+                continue
+            key = video_key(video_path)
+            info = data["video_info"]
+            videos.append((key, source, data["version"], info["filename"], info["duration"], now))
+            for position, segment in enumerate(data["time_segments"]):
+                segments.append((
+                    key, position, segment["id"], segment["name"], segment["trigger_time"], segment["jump_to_time"],
+                    time_to_ms(segment["trigger_time"]), time_to_ms(segment["jump_to_time"]), int(segment["enabled"]),
+                ))
+            for name, value in data["settings"].items():
+                settings.append((key, name, json.dumps(value)))
+
+        with self.lock, self.connection:
+            self.connection.executemany("DELETE FROM videos WHERE path = ?", ((video[0],) for video in videos))
+            self.connection.executemany(
+                "INSERT INTO videos (path, source, version, filename, duration, imported_ns) VALUES (?, ?, ?, ?, ?, ?)",
+                videos,
+            )
+            self.connection.executemany(
+                "INSERT INTO segments SELECT id, ?, ?, ?, ?, ?, ?, ?, ? FROM videos WHERE path = ?",
+                (row[1:] + (row[0],) for row in segments),
+            )
+            self.connection.executemany(
+                "INSERT INTO settings SELECT id, ?, ? FROM videos WHERE path = ?",
+                (row[1:] + (row[0],) for row in settings),
+            )
+            for video in videos:
+                self.plans.pop(video[0], None)
+        return rejected
+
+    def video_paths(self):
+        """Returns the paths of all stored videos, in sorted order"""
+        with self.lock:
+            return [row[0] for row in self.connection.execute("SELECT path FROM videos ORDER BY path")]
+
+    def export_documents(self):
+        """Yields (video_path, document, source) for every stored video; source is None if unknown"""
+        for path in self.video_paths():
+            with self.lock:
+                rows = self.connection.execute(LOOKUP_QUERY, {"path": path}).fetchall()
+            if rows:
+                yield path, self.document(rows), rows[0][3]
+
+    def mark_exported(self, video_path, json_path):
+        """Records that a video's segments were just written to json_path
+
+        json_path becomes the video's source, and every video imported from
+        it is taken as current again, so the export does not make them stale.
+        """
+        try:
+            mtime_ns = os.stat(json_path).st_mtime_ns
+        except OSError:
+            return
+        with self.lock, self.connection:
+            self.connection.execute(
+                "UPDATE videos SET source = :source, imported_ns = :mtime_ns WHERE path = :path OR source = :source",
+                {"source": json_path, "mtime_ns": mtime_ns, "path": video_key(video_path)},
+            )
+            self.plans.clear()
+
+    def __len__(self):
+        with self.lock:
+            return self.connection.execute("SELECT COUNT(*) FROM videos").fetchone()[0]
+
+
+def import_library(store, root, patterns=DEFAULT_PATTERNS, batch_size=500):
+    """Imports the JSON file of every video under root; returns (imported, rejected)"""
+    imported = 0
+    rejected = {}
+    batch = []
+
+    def flush():
+        nonlocal imported
+        failed = store.import_documents(batch)
+        rejected.update(failed)
+        imported += len(batch) - len(failed)
+        batch.clear()
+
+    for video_path, json_path, _, _ in scan_library(root, SidecarResolver(patterns)):
+        if json_path is None:
+            continue
+        try:
+            with open(json_path, 'rb') as f:
+                data = json.loads(f.read().decode('utf-8'))
+        except (OSError, ValueError) as e:
+            rejected[video_path] = [f"Cannot read {json_path}: {e}"]
+            continue
+        batch.append((video_path, data, json_path))
+        if len(batch) >= batch_size:
+            flush()
+    if batch:
+        flush()
+    return imported, rejected
+
+
+def export_library(store, output_dir=None, force=False):
+    """Writes every stored document as a JSON file; returns (written, [(skipped path, reason)])
+
+    Files go back to the JSON file they were imported from (which may be
+    e.g. skips/<stem>.json or a shared series.json), or to <stem>.json
+    next to the video if that is unknown; the store then takes them as
+    the videos' current sources. With output_dir, each video gets
+    <stem>.json at its path relative to the folder all stored videos
+    share, mirrored under output_dir. Existing files are left alone
+    unless force is set, a file shared by several videos is written once,
+    and two videos that would be written to the same file are reported.
+    """
+    root = None
+    if output_dir:
+        try:
+            root = os.path.commonpath([os.path.dirname(path) for path in store.video_paths()])
+        except ValueError:
+            # No videos, or videos on several drives: mirror each full path
+            pass
+    written = {}  # json_path -> source it was written for
+    skipped = []
+    for video_path, document, source in store.export_documents():
+        if output_dir:
+            stem_path = os.path.splitext(video_path)[0]
+            relative = os.path.relpath(stem_path, root) if root else os.path.splitdrive(stem_path)[1].lstrip("\\/")
+            json_path = os.path.join(output_dir, relative + ".json")
+        else:
+            json_path = source or os.path.splitext(video_path)[0] + ".json"
+        if json_path in written:
+            if output_dir or written[json_path] != source:
+                skipped.append((json_path, f"already written for another video, {video_path} not exported"))
+            continue
+        if not force and os.path.exists(json_path):
+            skipped.append((json_path, "file exists (use --force to overwrite)"))
+            continue
+        os.makedirs(os.path.dirname(os.path.abspath(json_path)), exist_ok=True)
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(document, f, ensure_ascii=False, indent=2)
+        written[json_path] = source
+        if not output_dir:
+            store.mark_exported(video_path, json_path)
+    return len(written), skipped
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Import segment files into a SQLite segment store or export them back")
+    parser.add_argument("database", help="SQLite database file")
+    commands = parser.add_subparsers(dest="command", required=True)
+    importer = commands.add_parser("import", help="Validate and import the JSON files of a media library")
+    importer.add_argument("root", help="Directory to scan recursively for videos and their JSON files")
+    importer.add_argument("--patterns", default=", ".join(DEFAULT_PATTERNS), help="Comma-separated JSON file naming patterns, in priority order")
+    exporter = commands.add_parser("export", help="Write the stored segments back to JSON files")
+    exporter.add_argument("--output-dir", default=None, help="Directory for the JSON files (default: the files they were imported from)")
+    exporter.add_argument("--force", action="store_true", help="Overwrite JSON files that already exist")
+    args = parser.parse_args()
+
+    store = SegmentStore(args.database)
+    try:
+        if args.command == "import":
+            started = time.perf_counter()
+            imported, rejected = import_library(store, args.root, parse_patterns(args.patterns))
+            for video_path, errors in rejected.items():
+                print(f"Rejected {video_path}:")
+                for error in errors:
+                    print(f"  • {error}")
+            print(f"Imported {imported} videos ({len(rejected)} rejected) in {time.perf_counter() - started:.2f} s")
+            return not rejected
+        written, skipped = export_library(store, args.output_dir, args.force)
+        for json_path, reason in skipped:
+            print(f"Skipped {json_path}: {reason}")
+        print(f"Exported {written} JSON files ({len(skipped)} skipped)")
+        return not skipped
+    finally:
+        store.close()
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main() else 1)
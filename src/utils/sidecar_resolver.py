@@ -0,0 +1,158 @@
+import os
+from typing import Dict, NamedTuple, Optional, Tuple
+from src.utils.json_validator import VALID_EXTENSIONS
+
+# Tried in order; paths are relative to the video's directory and {stem} is
+# the video file name without its extension. A pattern without {stem} names
+# a file shared by every video of the directory, e.g. one per series.
+DEFAULT_PATTERNS = ("{stem}.json", "{stem}.skip.json", "skips/{stem}.json", "series.json")
+
+
+def parse_patterns(text):
+    """Splits a comma-separated pattern list from config.ini"""
+    patterns = tuple(pattern.strip() for pattern in text.split(",") if pattern.strip())
+    return patterns or DEFAULT_PATTERNS
+
+
+class Pattern(NamedTuple):
+    """One naming convention, split into the directory it looks in and the file name around {stem}"""
+    subdir: str
+    prefix: str
+    suffix: str
+    # Whole file name for patterns without {stem}, otherwise None
+    literal: Optional[str]
+
+    @classmethod
+    def parse(cls, pattern):
+        subdir, template = os.path.split(pattern.replace("\\", "/"))
+        template = os.path.normcase(template)
+        if "{stem}" not in template:
+            return cls(subdir, "", "", template)
+        prefix, suffix = template.split("{stem}", 1)
+        return cls(subdir, prefix, suffix, None)
+
+
+class DirectoryListing(NamedTuple):
+    """Entries of one directory as of its mtime; file names are keyed by their normcase form"""
+    mtime_ns: Optional[int]
+    files: Dict[str, str]
+    subdirs: Tuple[str, ...]
+
+
+EMPTY_LISTING = DirectoryListing(None, {}, ())
+
+
+def directory_mtime(path):
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return None
+
+
+class SidecarResolver:
+    """Finds the JSON file of a video by listing directories instead of probing paths
+
+    Each directory involved (the video's own, and e.g. its skips/
+    subdirectory) is read with a single os.scandir. The per-pattern
+    stem→sidecar maps built from those listings are cached per video
+    directory and rebuilt only when the mtime of one of the directories
+    changes, which happens whenever a file is added, removed or renamed in
+    it. Resolving any number of videos of a cached directory costs one
+    stat per directory and no listing.
+    """
+
+    def __init__(self, patterns=DEFAULT_PATTERNS):
+        self.patterns = tuple(Pattern.parse(pattern) for pattern in patterns)
+        self.listings = {}
+        # video directory -> (directory mtimes, one stem map or literal path per pattern)
+        self.tables = {}
+
+    def listing(self, directory, mtime_ns):
+        """Returns the listing of a directory, scanning it again only if its mtime changed"""
+        cached = self.listings.get(directory)
+        if cached is not None and cached.mtime_ns == mtime_ns:
+            return cached
+        if mtime_ns is None:
+            listing = EMPTY_LISTING
+        else:
+            files = {}
+            subdirs = []
+            try:
+                with os.scandir(directory) as it:
+                    for entry in it:
+                        try:
+                            if entry.is_dir(follow_symlinks=False):
+                                subdirs.append(entry.name)
+                            elif entry.is_file():
+                                files[os.path.normcase(entry.name)] = entry.name
+                        except OSError:
+                            continue
+            except OSError:
+                pass
+            listing = DirectoryListing(mtime_ns, files, tuple(subdirs))
+        self.listings[directory] = listing
+        return listing
+
+    def list_directory(self, directory):
+        """Returns the (cached) listing of a directory after checking its mtime"""
+        return self.listing(directory, directory_mtime(directory))
+
+    def table(self, directory):
+        """Returns, per pattern, the stem→path map (or the shared path) for a video directory"""
+        directories = [os.path.normpath(os.path.join(directory, pattern.subdir)) for pattern in self.patterns]
+        mtimes = {path: directory_mtime(path) for path in directories}
+        key = tuple(mtimes[path] for path in directories)
+        cached = self.tables.get(directory)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+
+        table = []
+        for pattern, path in zip(self.patterns, directories):
+            listing = self.listing(path, mtimes[path])
+            if pattern.literal is not None:
+                name = listing.files.get(pattern.literal)
+                table.append(os.path.join(path, name) if name else None)
+                continue
+            stems = {}
+            low, high = len(pattern.prefix), len(pattern.suffix)
+            for folded, name in listing.files.items():
+                if len(folded) > low + high and folded.startswith(pattern.prefix) and folded.endswith(pattern.suffix):
+                    stems[folded[low:len(folded) - high]] = os.path.join(path, name)
+            table.append(stems)
+        table = tuple(table)
+        self.tables[directory] = (key, table)
+        return table
+
+    @staticmethod
+    def lookup(table, stem):
+        stem = os.path.normcase(stem)
+        for entry in table:
+            if isinstance(entry, dict):
+                path = entry.get(stem)
+                if path is not None:
+                    return path
+            elif entry is not None:
+                return entry
+        return None
+
+    def resolve(self, video_path):
+        """Returns the JSON file of a video according to the patterns, or None"""
+        directory, name = os.path.split(os.path.abspath(video_path))
+        return self.lookup(self.table(directory), os.path.splitext(name)[0])
+
+    def resolve_folder(self, directory):
+        """Returns [(video_path, json_path or None)] for every video of a directory, in name order"""
+        directory = os.path.abspath(directory)
+        table = self.table(directory)
+        listing = self.list_directory(directory)
+        results = []
+        for name in sorted(listing.files.values()):
+            stem, extension = os.path.splitext(name)
+            if extension.lower() in VALID_EXTENSIONS:
+                results.append((os.path.join(directory, name), self.lookup(table, stem)))
+        return results
+
+    def invalidate(self):
+        """Forgets all cached listings"""
+        self.listings.clear()
+        self.tables.clear()
@@ -0,0 +1,435 @@
+import argparse
+import asyncio
+import json
+import math
+import multiprocessing
+import os
+import time
+from src.vlc.launcher import load_config
+from src.vlc.playlist import input_to_path
+from src.vlc.rc_session import RC_RECONNECTS, RC_ROUND_TRIP, RCProtocol
+from src.vlc.status import STATUS_COMMANDS, parse_status_snapshot
+from src.vlc.skip_logic import SkipLogic
+from src.utils.file_watcher import SegmentFileReloader
+from src.utils.json_finder import locate_plan
+from src.utils.metrics import registry
+from src.utils.plan_cache import PlanCache
+from src.utils.segment_plan import empty_plan
+
+# Sessions one worker process drives before another process is started
+SESSIONS_PER_WORKER = 200
+
+
+class AsyncRCSession(RCProtocol):
+    """Non-blocking counterpart of RCSession for use on an asyncio event loop"""
+
+    def __init__(self, host, port, password='', timeout=1.0,
+                 min_backoff=0.1, max_backoff=5.0):
+        super().__init__()
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+
+        self.reader = None
+        self.writer = None
+        self.lock = asyncio.Lock()
+
+        self.connections_opened = 0
+        self.backoff = 0.0
+        self.next_attempt = 0.0
+
+    def is_connected(self):
+        """Returns True if the session holds an open connection"""
+        return self.writer is not None
+
+    async def connect(self):
+        """Opens and authenticates the connection, respecting the reconnect backoff"""
+        if self.writer is not None:
+            return True
+        if time.monotonic() < self.next_attempt:
+            return False
+
+        try:
+            self.reader, self.writer = await asyncio.wait_for(
+                asyncio.open_connection(self.host, self.port), self.timeout
+            )
+            self.buffer = b""
+            self.connections_opened += 1
+            if self.connections_opened > 1:
+                RC_RECONNECTS.inc()
+
+            greeting = await self._read_until((self.PROMPT, self.PASSWORD_PROMPT))
+            if self.PASSWORD_PROMPT in greeting or self.password:
+                self.writer.write(f"{self.password}\n".encode())
+                await self._read_until((self.PROMPT,))
+        except (OSError, asyncio.TimeoutError):
+            self._drop()
+            self.backoff = min(max(self.backoff * 2, self.min_backoff), self.max_backoff)
+            self.next_attempt = time.monotonic() + self.backoff
+            return False
+
+        self.backoff = 0.0
+        self.next_attempt = 0.0
+        return True
+
+    def close(self):
+        """Closes the connection"""
+        if self.writer is not None:
+            try:
+                self.writer.write(b"logout\n")
+            except OSError:
+                pass
+        self._drop()
+
+    async def command(self, command):
+        """Sends a single command and returns its response, or None on failure"""
+        responses = await self.commands([command])
+        return responses[0] if responses is not None else None
+
+    async def commands(self, commands):
+        """Sends commands in one write and returns their responses; reconnects once if the link dropped"""
+        async with self.lock:
+            for attempt in range(2):
+                if not await self.connect():
+                    return None
+                try:
+                    started = time.perf_counter()
+                    self.writer.write("".join(f"{command}\n" for command in commands).encode())
+                    responses = []
+                    for _ in commands:
+                        raw = await self._read_until((self.PROMPT,))
+                        responses.append(self._decode_response(raw))
+                    RC_ROUND_TRIP.observe(time.perf_counter() - started)
+                    return responses
+                except (OSError, asyncio.TimeoutError):
+                    self._drop()
+                    self.next_attempt = 0.0
+            return None
+
+    async def wait_for_events(self, timeout):
+        """Waits up to timeout seconds for unsolicited status changes and returns them as events"""
+        if self.pending_events:
+            return self.take_events()
+        if self.writer is None:
+            await asyncio.sleep(timeout)
+            return []
+
+        async with self.lock:
+            try:
+                chunk = await asyncio.wait_for(self.reader.read(4096), timeout)
+                if not chunk:
+                    raise ConnectionResetError("RC connection closed by VLC")
+                self.buffer += chunk
+                self._collect_idle_lines()
+            except asyncio.TimeoutError:
+                pass
+            except OSError:
+                self._drop()
+        return self.take_events()
+
+    async def _read_until(self, markers):
+        """Reads from the stream until the buffer holds one of the markers"""
+        while True:
+            end = self._find_marker(markers)
+            if end is not None:
+                data, self.buffer = self.buffer[:end], self.buffer[end:]
+                return data
+
+            chunk = await asyncio.wait_for(self.reader.read(4096), self.timeout)
+            if not chunk:
+                raise ConnectionResetError("RC connection closed by VLC")
+            self.buffer += chunk
+
+    def _drop(self):
+        """Forgets the current stream without touching the backoff state"""
+        if self.writer is not None:
+            try:
+                self.writer.close()
+            except OSError:
+                pass
+        self.reader = None
+        self.writer = None
+        self.buffer = b""
+
+
+class AsyncVLCSkipController(SkipLogic):
+    """Skip controller for one VLC instance, driven by an asyncio event loop
+
+    Like VLCSkipController it follows VLC through its playlist, switching
+    to the plan of each new input, and picks up edits to the current
+    sidecar file. Finding and loading plans, and checking the sidecar for
+    changes every watch_interval, run on the loop's default executor, so
+    one session's file I/O never holds up the others.
+    """
+
+    def __init__(self, name, host, port, plan, config_data, password='', plan_cache=None, video_path=None):
+        self.name = name
+        self.rc = AsyncRCSession(host, port, password, timeout=config_data.get('rc_timeout', 1.0))
+        self.check_interval = config_data['check_interval']
+        self.timeout_seconds = config_data['timeout_seconds']
+        self.event_driven = config_data.get('event_driven', True)
+        self.watch_segments = config_data.get('watch_segments', True)
+        self.watch_interval = config_data.get('watch_interval', 1.0)
+
+        self.init_skip_logic(config_data)
+        # Shared by the sessions of a worker, so they load a sidecar once
+        self.plan_cache = plan_cache if plan_cache is not None else PlanCache(config_data.get('plan_cache_size', 8))
+        self.json_file_path = os.path.abspath(plan.json_path)
+        self.video_path = video_path
+        self.video_dir = os.path.dirname(os.path.abspath(video_path or plan.json_path))
+        self.current_input = None
+        self.reloader = None
+        self.next_watch = 0.0
+        self.use_plan(plan)
+        self.watch(self.json_file_path)
+        self.running = False
+
+    def use_plan(self, plan):
+        """Makes a SegmentPlan the one skips are taken from"""
+        self.plan = plan
+        self.segment_index = plan.index
+
+    def watch(self, json_file_path):
+        """Moves change detection to another sidecar file"""
+        self.reloader = None
+        if self.watch_segments and json_file_path is not None:
+            # Checked from the loop rather than a watcher thread, so sessions cost no threads
+            self.reloader = SegmentFileReloader(json_file_path, signature=self.plan.signature, video_path=self.video_path)
+
+    async def apply_reloaded_segments(self):
+        """Swaps in the segments of an edited sidecar file, checking it at most every watch_interval"""
+        now = time.monotonic()
+        if self.reloader is None or now < self.next_watch:
+            return
+        self.next_watch = now + self.watch_interval
+        reloader = self.reloader
+        await asyncio.get_running_loop().run_in_executor(None, reloader.reload)
+        plan = reloader.take()
+        if plan is None or reloader is not self.reloader:
+            return
+        self.use_plan(plan)
+        self.plan_cache.put(self.json_file_path, plan)
+        registry.counter("segment_reloads_total", "Sidecar file reloads", {"result": "applied"}).inc()
+        print(f"[{self.name}] Reloaded {len(plan.segments)} active segments ({len(self.segment_index)} skip ranges)")
+
+    async def switch_input(self, input_name):
+        """Switches to the segment plan of the input VLC is now playing"""
+        first_input = self.current_input is None
+        self.current_input = input_name
+        # The first input is the video the session was started for, whatever name VLC reports for it
+        if first_input:
+            return
+        loop = asyncio.get_running_loop()
+        video_path = input_to_path(input_name, self.video_dir)
+        json_path, plan = await loop.run_in_executor(None, locate_plan, video_path)
+        if json_path == self.json_file_path:
+            return
+        if plan is None and json_path is not None:
+            plan = await loop.run_in_executor(None, self.plan_cache.load, json_path)
+        self.json_file_path = json_path
+        self.video_path = video_path
+        if video_path:
+            self.video_dir = os.path.dirname(video_path)
+        if plan is None:
+            self.use_plan(empty_plan(json_path))
+            print(f"[{self.name}] No segments for {input_name}, not skipping")
+        else:
+            self.use_plan(plan)
+            print(f"[{self.name}] Switched to {json_path}: {len(plan.segments)} active segments ({len(self.segment_index)} skip ranges)")
+        self.playback.reset()
+        self.position.reset()
+        self.scheduler.note_event()
+        self.active_range = -1
+        self.watch(json_path)
+
+    async def get_status(self):
+        """Gets time, play state, length and current input in one pipelined round trip"""
+        return parse_status_snapshot(await self.rc.commands(STATUS_COMMANDS))
+
+    async def seek_to_time(self, seconds):
+        """Seeks video to specified time in seconds and sets seeking flag"""
+        self.mark_seeking(seconds)
+        started = time.perf_counter()
+        # RC only takes whole seconds; round up so the player never lands back inside the range
+        await self.rc.command(f"seek {math.ceil(seconds)}")
+        self.record_skip(time.perf_counter() - started)
+        print(f"[{self.name}] Seeking to {seconds:g} seconds, waiting for completion...")
+
+    async def check_segments(self):
+        """Checks if video needs to be skipped"""
+        started = time.perf_counter()
+        status = await self.get_status()
+        if status is not None:
+            self.note_round_trip(time.perf_counter() - started)
+            if status.input and status.input != self.current_input:
+                await self.switch_input(status.input)
+        target = self.evaluate_status(status)
+        if target is not None:
+            await self.seek_to_time(target)
+
+    async def wait_for_events(self, timeout):
+        """Sleeps until the timeout expires or VLC reports an event that needs a check"""
+        if not self.event_driven:
+            await asyncio.sleep(timeout)
+            return
+
+        deadline = time.monotonic() + timeout
+        while self.running:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            events = await self.rc.wait_for_events(remaining)
+            if any([self.handle_event(event) for event in events]):
+                return
+
+    async def run(self):
+        """Monitors playback until stopped or until VLC stays unreachable past the timeout"""
+        self.running = True
+        unreachable_since = None
+        try:
+            while self.running:
+                if not await self.rc.connect():
+                    now = time.monotonic()
+                    if unreachable_since is None:
+                        unreachable_since = now
+                        print(f"[{self.name}] RC interface unavailable ({self.rc.host}:{self.rc.port}), waiting...")
+                    if now - unreachable_since >= self.timeout_seconds:
+                        print(f"[{self.name}] Failed to connect to VLC RC interface within {self.timeout_seconds} seconds")
+                        return False
+                    await asyncio.sleep(self.check_interval)
+                    continue
+
+                if unreachable_since is not None:
+                    print(f"[{self.name}] Connection to VLC RC interface restored!")
+                    unreachable_since = None
+
+                await self.apply_reloaded_segments()
+                await self.check_segments()
+                await self.wait_for_events(self.next_poll_delay())
+        finally:
+            self.running = False
+            self.rc.close()
+        return True
+
+    def stop(self):
+        """Stops monitoring after the current wait"""
+        self.running = False
+
+
+class SessionManager:
+    """Runs any number of AsyncVLCSkipControllers on one event loop"""
+
+    def __init__(self):
+        self.controllers = []
+
+    def add_session(self, controller):
+        """Registers a controller to be run"""
+        self.controllers.append(controller)
+
+    async def run(self):
+        """Runs all sessions concurrently and returns {name: finished cleanly}"""
+        results = await asyncio.gather(
+            *(controller.run() for controller in self.controllers),
+            return_exceptions=True
+        )
+        outcome = {}
+        for controller, result in zip(self.controllers, results):
+            if isinstance(result, Exception):
+                print(f"[{controller.name}] Error: {result}")
+                result = False
+            outcome[controller.name] = result
+        return outcome
+
+    def stop(self):
+        """Stops every session"""
+        for controller in self.controllers:
+            controller.stop()
+
+
+def build_manager(session_specs, config_data):
+    """Creates a SessionManager from session specs (name, host, port, password, json_file_path, video_path)"""
+    manager = SessionManager()
+    # Sessions playing the same video share one loaded plan
+    plans = PlanCache(max(len(session_specs), config_data.get('plan_cache_size', 8)))
+    for spec in session_specs:
+        plan = plans.load(os.path.abspath(spec['json_file_path']))
+        if plan is None:
+            continue
+        manager.add_session(AsyncVLCSkipController(
+            spec.get('name', f"{spec['host']}:{spec['port']}"),
+            spec['host'],
+            spec['port'],
+            plan,
+            config_data,
+            password=spec.get('password', ''),
+            plan_cache=plans,
+            video_path=spec.get('video_path')
+        ))
+    return manager
+
+
+def run_sessions(session_specs, config_data):
+    """Runs the given sessions on a new event loop in this process"""
+    loop = asyncio.new_event_loop()
+    # Sessions create their locks at construction, so the loop must be current first
+    asyncio.set_event_loop(loop)
+    manager = build_manager(session_specs, config_data)
+    try:
+        return loop.run_until_complete(manager.run())
+    except KeyboardInterrupt:
+        manager.stop()
+        return {}
+    finally:
+        loop.close()
+
+
+def run_sharded(session_specs, config_data, workers=None):
+    """Spreads sessions across worker processes, each with its own event loop
+
+    Returns {name: finished cleanly} for every session, as run_sessions
+    does, gathered from all workers; empty if interrupted.
+    """
+    if workers is None:
+        needed = math.ceil(len(session_specs) / SESSIONS_PER_WORKER)
+        workers = max(1, min(os.cpu_count() or 1, needed))
+
+    if workers <= 1:
+        return run_sessions(session_specs, config_data)
+
+    shards = [shard for shard in (session_specs[i::workers] for i in range(workers)) if shard]
+    outcome = {}
+    with multiprocessing.Pool(len(shards)) as pool:
+        pending = pool.starmap_async(run_sessions, [(shard, config_data) for shard in shards])
+        try:
+            results = pending.get()
+        except KeyboardInterrupt:
+            # Leaving the block terminates the workers
+            return outcome
+    for result in results:
+        outcome.update(result)
+    return outcome
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run skip controllers for many VLC instances")
+    parser.add_argument("sessions", help="JSON file with a list of {name, host, port, password, json_file_path}")
+    parser.add_argument("--workers", type=int, default=None, help="Number of worker processes")
+    args = parser.parse_args()
+
+    config_data = load_config()
+    if config_data is None:
+        return False
+
+    with open(args.sessions, 'r', encoding='utf-8') as f:
+        session_specs = json.load(f)
+
+    print(f"Starting {len(session_specs)} sessions...")
+    run_sharded(session_specs, config_data, args.workers)
+    return True
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,23 @@
-import json
-import socket
+import os
+import threading
 import time
-from src.vlc.launcher import load_config, test_rc_connection
+from src.vlc.launcher import load_config
+from src.vlc.playlist import input_to_path, next_item
+from src.vlc.transport import create_transport
+from src.vlc.skip_logic import SkipLogic
+from src.utils.file_watcher import SegmentFileReloader
+from src.utils.json_finder import find_stored_plan, locate_plan, set_fingerprint_index, set_segment_store, set_sidecar_patterns, sidecar_path
+from src.utils.plan_cache import MISSING, PlanCache
+from src.utils.segment_index import time_to_seconds
+from src.utils.segment_plan import empty_plan, load_plan
+from src.utils.metrics import registry
 
-class VLCSkipController:
-    def __init__(self, json_file_path, config_data=None):
+class VLCSkipController(SkipLogic):
+    def __init__(self, json_file_path=None, config_data=None, rc_session=None, transport=None, plan=None,
+                 stop_event=None, stop_when_finished=False, video_path=None):
+        # A plan loaded earlier (by the GUI or launcher) is used as is instead of reading the file again
+        if plan is not None:
+            json_file_path = plan.json_path
         self.json_file_path = json_file_path
         
         # Load configuration
@@ -13,177 +26,269 @@ class VLCSkipController:
             if config_data is None:
                 raise Exception("Failed to load configuration")
         
-        self.vlc_host = config_data['rc_host']
-        self.vlc_port = config_data['rc_port']
-        self.rc_password = config_data.get('rc_password', '')
         self.check_interval = config_data['check_interval']
         self.timeout_seconds = config_data['timeout_seconds']
         
-        self.running = False
-        self.segments = []
-        self.load_segments_config()
-        self.last_time = None
+        # Reuse the launcher's connection when given, so one connection serves the whole run
+        if transport is None:
+            transport = create_transport(config_data, rc_session=rc_session)
+        self.transport = transport
+        
+        self.init_skip_logic(config_data)
+        self.event_driven = config_data.get('event_driven', True)
+        
+        self.metrics_host = config_data.get('metrics_host', '127.0.0.1')
+        self.metrics_port = config_data.get('metrics_port', 0)
+        self.metrics_dump_path = config_data.get('metrics_dump_path', '')
         
-        self.is_seeking = False
-        self.seek_target_time = -1
+        self.watch_segments = config_data.get('watch_segments', True)
+        self.watch_interval = config_data.get('watch_interval', 1.0)
+        self.reloader = None
+        
+        # Plans of the inputs VLC plays, so switching playlist items needs no file I/O
+        self.plan_cache = PlanCache(config_data.get('plan_cache_size', 8))
+        self.prefetch_next = config_data.get('prefetch_next', True)
+        if 'sidecar_patterns' in config_data:
+            set_sidecar_patterns(config_data['sidecar_patterns'])
+        if 'segment_store' in config_data:
+            set_segment_store(config_data['segment_store'])
+        if 'fingerprint_index' in config_data:
+            set_fingerprint_index(config_data['fingerprint_index'])
+        self.current_input = None
+        # The video being played, for the duration checks of reloaded plans
+        self.video_path = video_path
+        self.video_dir = os.path.dirname(os.path.abspath(video_path or json_file_path))
+        
+        self.running = False
+        # A stop_event handed in lets its owner (the player pool) end monitoring
+        self.owns_stop_event = stop_event is None
+        self.stop_event = threading.Event() if stop_event is None else stop_event
+        # End monitoring once the video stops or reaches its end instead of waiting for VLC to close
+        self.stop_when_finished = stop_when_finished
+        self.seen_playing = False
+        if plan is not None:
+            self.use_plan(plan)
+            self.plan_cache.put(os.path.abspath(plan.json_path), plan)
+        else:
+            self.load_segments_config()
         
     def load_segments_config(self):
         """Loads segment configuration from JSON file"""
-        try:
-            with open(self.json_file_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-                self.segments = [seg for seg in config['time_segments'] if seg['enabled']]
-                print(f"Loaded {len(self.segments)} active segments")
-        except Exception as e:
-            print(f"Error loading segment configuration: {e}")
+        plan, result = load_plan(self.json_file_path, video_path=self.video_path)
+        if plan is None:
+            print("Error loading segment configuration:")
+            for error in result["errors"]:
+                print(f"  • {error}")
+            self.use_plan(empty_plan(self.json_file_path))
+            return
+        self.use_plan(plan)
+        self.plan_cache.put(os.path.abspath(self.json_file_path), plan)
+        print(f"Loaded {len(self.segments)} active segments ({len(self.segment_index)} skip ranges)")
+    
+    def use_plan(self, plan):
+        """Makes a SegmentPlan the one skips are taken from"""
+        self.plan = plan
+        self.segments = plan.segments
+        self.segment_index = plan.index
+    
+    def apply_reloaded_segments(self):
+        """Swaps in the segments of an edited JSON file between ticks"""
+        plan = self.reloader.take()
+        if plan is None:
+            return
+        self.use_plan(plan)
+        self.plan_cache.put(os.path.abspath(plan.json_path), plan)
+        registry.counter("segment_reloads_total", "Sidecar file reloads", {"result": "applied"}).inc()
+        print(f"Reloaded {len(self.segments)} active segments ({len(self.segment_index)} skip ranges)")
+    
+    def watch(self, json_file_path):
+        """Moves the hot-reload watcher to another JSON file"""
+        if not self.watch_segments:
+            return
+        if self.reloader is not None:
+            self.reloader.stop()
+            self.reloader = None
+        if json_file_path is not None and os.path.exists(json_file_path):
+            # Edits made since the current plan was read count as changes
+            self.reloader = SegmentFileReloader(json_file_path, interval=self.watch_interval, signature=self.plan.signature,
+                                                video_path=self.video_path)
+            self.reloader.start()
+    
+    def switch_input(self, input_name):
+        """Switches to the segment plan of the input VLC is now playing"""
+        first_input = self.current_input is None
+        self.current_input = input_name
+        video_path = input_to_path(input_name, self.video_dir)
+        json_path, stored = locate_plan(video_path)
+        
+        # The first input is the video VLC was launched with, whatever name it reports for it
+        if not first_input and json_path != os.path.abspath(self.json_file_path or ""):
+            if stored is not None:
+                plan = stored
+            else:
+                plan = self.plan_cache.load(json_path) if json_path else None
+            self.json_file_path = json_path
+            if plan is None:
+                self.use_plan(empty_plan(json_path))
+                print(f"No segments for {input_name}, not skipping")
+            else:
+                self.use_plan(plan)
+                print(f"Switched to {json_path}: {len(self.segments)} active segments ({len(self.segment_index)} skip ranges)")
+            self.video_path = video_path
+            self.video_dir = os.path.dirname(video_path) if video_path else self.video_dir
+            self.playback.reset()
+            self.position.reset()
+            self.scheduler.note_event()
+            self.active_range = -1
+            self.watch(json_path)
+        
+        if self.prefetch_next:
+            self.prefetch_next_item()
+    
+    def prefetch_next_item(self):
+        """Loads the plan of the next playlist item on a background thread"""
+        item = next_item(self.transport.get_playlist())
+        if item is None:
+            return
+        video_path = input_to_path(item.uri or item.name, self.video_dir)
+        if video_path is None or find_stored_plan(video_path) is not None:
+            return
+        json_path = os.path.abspath(sidecar_path(video_path))
+        if self.plan_cache.get(json_path) is MISSING:
+            threading.Thread(target=self.plan_cache.load, args=(json_path,), daemon=True).start()
     
     def time_to_seconds(self, time_str):
-        """Converts time in HH:MM:SS format to seconds"""
-        parts = time_str.split(':')
-        return int(parts[0]) * 3600 + int(parts[1]) * 60 + int(parts[2])
+        """Converts time in HH:MM:SS or HH:MM:SS.mmm format to seconds"""
+        return time_to_seconds(time_str)
     
     def send_vlc_command(self, command):
-        """Sends command to VLC through RC interface"""
-        try:
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(1.0)
-            sock.connect((self.vlc_host, self.vlc_port))
-            
-            # If password is specified, send it first
-            if self.rc_password:
-                sock.send(f"{self.rc_password}\n".encode())
-                # Get response after password input
-                sock.recv(1024)
-            
-            sock.send(f"{command}\n".encode())
-            response = sock.recv(1024).decode().strip()
-            sock.close()
-            return response
-        except Exception as e:
-            print(f"Error connecting to VLC: {e}")
-            return None
+        """Sends command to VLC through the player transport"""
+        response = self.transport.command(command)
+        if response is None:
+            print(f"Error connecting to VLC: {self.transport.describe()} unavailable")
+        return response
     
     def get_current_time(self):
         """Gets current playback time in seconds"""
-        response = self.send_vlc_command("get_time")
-        if response and response.isdigit():
-            return int(response)
-        return None
+        status = self.get_status()
+        return status.time if status is not None else None
     
     def seek_to_time(self, seconds):
         """Seeks video to specified time in seconds and sets seeking flag"""
-        self.is_seeking = True
-        self.seek_target_time = seconds
-        self.send_vlc_command(f"seek {seconds}")
-        print(f"Seeking to {seconds} seconds, waiting for completion...")
+        self.mark_seeking(seconds)
+        started = time.perf_counter()
+        if not self.transport.seek(seconds):
+            print(f"Error connecting to VLC: {self.transport.describe()} unavailable")
+        self.record_skip(time.perf_counter() - started)
+        print(f"Seeking to {seconds:g} seconds, waiting for completion...")
     
-    def check_vlc_pause(self):
-        """Simple function to check if VLC is paused"""
-        try:
-            # Connect to VLC
-            sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-            sock.settimeout(5)
-            sock.connect((self.vlc_host, self.vlc_port))
-
-            # If password is specified, send it first
-            if self.rc_password:
-                sock.send(f"{self.rc_password}\n".encode())
-                # Get response after password input
-                sock.recv(1024)
-            
-            # Get current time
-            sock.send(b"get_time\n")
-            response = sock.recv(1024).decode().strip()
-            sock.close()
-        
-            if response.isdigit():
-                current_time = int(response)
-            
-                if hasattr(self, 'last_time') and self.last_time is not None:
-                    if current_time == self.last_time:
-                        return True  # Video is paused
-            
-                self.last_time = current_time
-                return False  # Video is playing
-            
-        except Exception as e:
-            print(f"Error checking pause status: {e}")
-            return False
+    def get_status(self):
+        """Gets time, play state, length and current input in one round trip"""
+        return self.transport.get_status()
     
     def check_segments(self):
         """Checks if video needs to be skipped"""
-        # Check if video is paused
-        if self.check_vlc_pause():
-            return  # If paused, don't skip
-        current_time = self.get_current_time()
-        if current_time is None:
-            return
-
-        if self.is_seeking:
-            if current_time >= (self.seek_target_time + 2):
-                print(f"Seek to {self.seek_target_time}s complete. Resuming monitoring.")
-                self.is_seeking = False
-                self.seek_target_time = -1
-            return
-
-        for segment in self.segments:
-            trigger_seconds = self.time_to_seconds(segment['trigger_time'])
-            jump_seconds = self.time_to_seconds(segment['jump_to_time'])
+        started = time.perf_counter()
+        status = self.get_status()
+        if status is not None:
+            self.note_round_trip(time.perf_counter() - started)
+            if status.input and status.input != self.current_input:
+                self.switch_input(status.input)
+            if self.stop_when_finished:
+                self.check_finished(status)
+        target = self.evaluate_status(status)
+        if target is not None:
+            self.seek_to_time(target)
+    
+    def check_finished(self, status):
+        """Stops monitoring when a video that was playing is now stopped"""
+        if status.state in ("playing", "paused"):
+            self.seen_playing = True
+        elif status.state == "stopped" and self.seen_playing:
+            print("Playback stopped, monitoring finished")
+            self.running = False
     
-            # Check if we are in the range between trigger_time and jump_to_time
-            if trigger_seconds <= current_time < jump_seconds:
-                print(f"Segment activated: {segment['name']}")
-                self.seek_to_time(jump_seconds)
-                break
+    def wait_for_events(self, timeout):
+        """Sleeps until the timeout expires or VLC reports an event that needs a check"""
+        deadline = time.monotonic() + timeout
+        while self.running and not self.stop_event.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return
+            # Wake up at least once a second so stop_monitoring takes effect
+            events = self.transport.wait_for_events(min(remaining, 1.0))
+            if any([self.handle_event(event) for event in events]):
+                return
     
     def start_monitoring(self):
         """Starts monitoring playback time"""
-        self.running = True
+        if self.owns_stop_event:
+            self.stop_event.clear()
+        # The owner of a handed-in event may have asked to stop before monitoring began
+        self.running = not self.stop_event.is_set()
         print("Starting VLC monitoring...")
         print("Press Ctrl+C to stop")
+        if self.metrics_port:
+            registry.start_server(self.metrics_host, self.metrics_port)
+        self.watch(self.json_file_path)
 
         failed_attempts = 0  # Failed attempts counter
         max_attempts = int(self.timeout_seconds / self.check_interval)  # Maximum attempts
         try:
-            while self.running:
+            while self.running and not self.stop_event.is_set():
                 # Check connection to RC interface
-                if not test_rc_connection(self.vlc_host, self.vlc_port, 0.1, self.rc_password):
+                if not self.transport.connect():
                     failed_attempts += 1
                 
                     if failed_attempts == 1:
-                        print(f"RC interface unavailable ({self.vlc_host}:{self.vlc_port}), waiting...")
+                        print(f"Player interface unavailable ({self.transport.describe()}), waiting...")
                 
                     # Check if maximum attempts exceeded
                     if failed_attempts >= max_attempts:
-                        print(f"Failed to connect to VLC RC interface after {failed_attempts} attempts ({self.timeout_seconds} seconds)")
+                        print(f"Failed to connect to VLC interface after {failed_attempts} attempts ({self.timeout_seconds} seconds)")
                         print("Shutting down...")
                         self.running = False
                         return False
                 
-                    time.sleep(self.check_interval)
+                    self.stop_event.wait(self.check_interval)
                     continue
             
                 # If connection is successful, reset attempt counter
                 if failed_attempts > 0:
-                    print("Connection to VLC RC interface restored!")
+                    print("Connection to VLC interface restored!")
                     failed_attempts = 0
             
+                if self.reloader is not None:
+                    self.apply_reloaded_segments()
                 self.check_segments()
-                time.sleep(0.1)  # Check every 0.1 seconds
+                # Sleep long while far from the next trigger, briefly when close to it
+                if self.event_driven:
+                    self.wait_for_events(self.next_poll_delay())
+                else:
+                    self.stop_event.wait(self.next_poll_delay())
         except KeyboardInterrupt:
             print("\nStopping monitoring...")
             self.running = False
+        finally:
+            if self.reloader is not None:
+                self.reloader.stop()
+            self.transport.close()
+            if self.metrics_dump_path:
+                registry.dump(self.metrics_dump_path)
     
         return True
     
     def stop_monitoring(self):
         """Stops monitoring"""
         self.running = False
+        self.stop_event.set()
 
-def main(json_file_path):
+def main(json_file_path=None, rc_session=None, transport=None, plan=None, config_data=None,
+         stop_event=None, stop_when_finished=False, video_path=None):
     try:
         # Create controller
-        controller = VLCSkipController(json_file_path)
+        controller = VLCSkipController(json_file_path, config_data=config_data, rc_session=rc_session, transport=transport, plan=plan,
+                                       stop_event=stop_event, stop_when_finished=stop_when_finished, video_path=video_path)
         
         # Start monitoring
         if not controller.start_monitoring():
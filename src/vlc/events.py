@@ -0,0 +1,89 @@
+import re
+import time
+from typing import NamedTuple, Optional, Union
+
+STATUS_CHANGE_PREFIX = "status change:"
+
+# VLC input states as reported in "( play state: N )" notifications
+STATE_CODES = {2: "play", 3: "pause", 4: "stop", 5: "stop"}
+
+STATE_PATTERN = re.compile(r"\(\s*(\w+) state:\s*(\d+)\s*\)(?::\s*(\w+))?")
+INPUT_PATTERN = re.compile(r"\(\s*new input:\s*(.*?)\s*\)$")
+TIME_PATTERN = re.compile(r"\(\s*time:\s*(\d+)s?\s*\)")
+RATE_PATTERN = re.compile(r"\(\s*new rate:\s*([\d.]+)\s*\)")
+
+
+class PlayerEvent(NamedTuple):
+    """Playback notification pushed by the player"""
+    kind: str  # play, pause, stop, new_input, seek, time or rate
+    value: Optional[Union[str, int, float]] = None
+
+
+def is_status_change(line):
+    """Returns True if the line is an unsolicited RC status notification"""
+    # A notification may follow a prompt that VLC printed on the same line
+    return line.lstrip("> \t").startswith(STATUS_CHANGE_PREFIX)
+
+
+class EventParser:
+    """Turns RC 'status change' lines into PlayerEvents
+
+    VLC reports the position as "( time: Ns )" about once a second while
+    playing; a time that jumps away from the expected position is reported
+    as a seek event instead.
+    """
+
+    def __init__(self, seek_tolerance=1.5):
+        self.seek_tolerance = seek_tolerance
+        self.last_time = None
+        self.last_time_at = None
+
+    def parse(self, line, now=None):
+        """Parses one status change line, returning a PlayerEvent or None"""
+        if now is None:
+            now = time.monotonic()
+        body = line.split(STATUS_CHANGE_PREFIX, 1)[-1].strip()
+
+        match = INPUT_PATTERN.search(body)
+        if match:
+            self.last_time = None
+            return PlayerEvent("new_input", match.group(1))
+
+        match = STATE_PATTERN.search(body)
+        if match:
+            kind = self._state_kind(match.group(1), int(match.group(2)), match.group(3))
+            if kind is None:
+                return None
+            if kind != "play":
+                self.last_time = None
+            return PlayerEvent(kind, int(match.group(2)))
+
+        match = TIME_PATTERN.search(body)
+        if match:
+            position = int(match.group(1))
+            kind = "time"
+            if self.last_time is not None:
+                expected = self.last_time + (now - self.last_time_at)
+                if abs(position - expected) > self.seek_tolerance:
+                    kind = "seek"
+            self.last_time = position
+            self.last_time_at = now
+            return PlayerEvent(kind, position)
+
+        match = RATE_PATTERN.search(body)
+        if match:
+            return PlayerEvent("rate", float(match.group(1)))
+
+        return None
+
+    def _state_kind(self, name, code, label):
+        """Maps the state notification to play, pause or stop"""
+        for word in (label, name):
+            word = (word or "").lower()
+            if word in ("play", "playing"):
+                return "play"
+            if word in ("pause", "paused"):
+                return "pause"
+            if word in ("stop", "stopped", "end"):
+                return "stop"
+        return STATE_CODES.get(code)
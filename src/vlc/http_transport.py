@@ -0,0 +1,148 @@
+import base64
+import http.client
+import json
+import math
+import queue
+import time
+from urllib.parse import urlencode
+from src.vlc.playlist import parse_http_playlist
+from src.vlc.status import parse_http_status
+from src.vlc.transport import PlayerTransport
+from src.utils.metrics import registry
+
+HTTP_ROUND_TRIP = registry.histogram("http_round_trip_seconds", "Time for one request to the VLC HTTP interface")
+HTTP_RECONNECTS = registry.counter("http_reconnects_total", "HTTP connections opened after the first one")
+
+
+class HTTPTransport(PlayerTransport):
+    """Player transport over VLC's HTTP interface with pooled keep-alive connections"""
+
+    name = "http"
+    STATUS_PATH = "/requests/status.json"
+    PLAYLIST_PATH = "/requests/playlist.json"
+
+    # RC-style commands and their HTTP interface equivalents
+    COMMANDS = {
+        "pause": "pl_pause",
+        "play": "pl_play",
+        "stop": "pl_stop",
+        "next": "pl_next",
+        "prev": "pl_previous",
+        "clear": "pl_empty",
+    }
+
+    def __init__(self, host, port, password='', timeout=1.0, pool_size=2):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self.pool = queue.LifoQueue(maxsize=pool_size)
+
+        # VLC uses basic auth with an empty user name
+        token = base64.b64encode(f":{password}".encode()).decode()
+        self.headers = {
+            "Authorization": f"Basic {token}",
+            "Connection": "keep-alive",
+        }
+
+        self.connections_opened = 0
+        self.healthy = False
+
+    def connect(self):
+        if self.healthy:
+            return True
+        return self.get_status() is not None
+
+    def close(self):
+        while True:
+            try:
+                self.pool.get_nowait().close()
+            except queue.Empty:
+                break
+        self.healthy = False
+
+    def get_status(self):
+        return parse_http_status(self.request(self.STATUS_PATH))
+
+    def seek(self, seconds):
+        # Whole seconds, rounded up so the player never lands back inside the range
+        return self.request(self._status_command("seek", math.ceil(seconds))) is not None
+
+    def command(self, command):
+        parts = command.split(None, 1)
+        if not parts:
+            return None
+        if parts[0] == "seek" and len(parts) == 2:
+            path = self._status_command("seek", parts[1])
+        elif parts[0] == "add" and len(parts) == 2:
+            # Like RC's add: queue the file and start playing it
+            path = f"{self.STATUS_PATH}?{urlencode({'command': 'in_play', 'input': parts[1]})}"
+        elif parts[0] in self.COMMANDS:
+            path = self._status_command(self.COMMANDS[parts[0]])
+        else:
+            return None
+
+        data = self.request(path)
+        return json.dumps(data) if data is not None else None
+
+    def get_playlist(self):
+        return parse_http_playlist(self.request(self.PLAYLIST_PATH))
+
+    def describe(self):
+        return f"HTTP {self.host}:{self.port}"
+
+    def request(self, path):
+        """GETs a JSON document, retrying once on a connection the server has closed"""
+        for attempt in range(2):
+            conn = self._acquire()
+            try:
+                started = time.perf_counter()
+                conn.request("GET", path, headers=self.headers)
+                response = conn.getresponse()
+                body = response.read()
+                HTTP_ROUND_TRIP.observe(time.perf_counter() - started)
+            except (OSError, http.client.HTTPException):
+                conn.close()
+                continue
+
+            if response.will_close:
+                conn.close()
+            else:
+                self._release(conn)
+
+            if response.status != 200:
+                print(f"VLC HTTP interface returned {response.status} for {path}")
+                self.healthy = False
+                return None
+
+            self.healthy = True
+            try:
+                return json.loads(body.decode('utf-8', errors='replace'))
+            except ValueError:
+                return None
+
+        self.healthy = False
+        return None
+
+    def _status_command(self, command, value=None):
+        """Builds a status.json URL that runs a command"""
+        params = {"command": command}
+        if value is not None:
+            params["val"] = value
+        return f"{self.STATUS_PATH}?{urlencode(params)}"
+
+    def _acquire(self):
+        """Takes an idle keep-alive connection from the pool, or opens a new one"""
+        try:
+            return self.pool.get_nowait()
+        except queue.Empty:
+            self.connections_opened += 1
+            if self.connections_opened > 1:
+                HTTP_RECONNECTS.inc()
+            return http.client.HTTPConnection(self.host, self.port, timeout=self.timeout)
+
+    def _release(self, conn):
+        """Returns a connection to the pool, closing it if the pool is full"""
+        try:
+            self.pool.put_nowait(conn)
+        except queue.Full:
+            conn.close()
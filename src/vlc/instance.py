@@ -0,0 +1,115 @@
+import os
+import secrets
+import socket
+import time
+
+# First pause between readiness probes; it doubles up to the configured check interval
+READY_MIN_INTERVAL = 0.01
+# How long a single probe waits for the TCP handshake
+PROBE_TIMEOUT = 0.2
+
+
+def free_port(host, preferred=0, exclude=()):
+    """Returns preferred if nothing listens on it yet, otherwise a port the OS reports free
+
+    Lets several VLC instances run side by side: the first one gets the
+    configured port and every further one an unused ephemeral port. The
+    port is only tested, not held, so a caller starting several instances
+    at once passes the ports it already handed out as exclude.
+    """
+    family, _, _, _, address = socket.getaddrinfo(host, 0, type=socket.SOCK_STREAM)[0]
+    candidates = [preferred] if preferred and preferred not in exclude else []
+    for port in candidates + [0] * 8:
+        with socket.socket(family, socket.SOCK_STREAM) as sock:
+            if os.name != 'nt':
+                # VLC binds with SO_REUSEADDR, so a port in TIME_WAIT is still usable for it
+                sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            try:
+                sock.bind((address[0], port))
+            except OSError:
+                continue
+            port = sock.getsockname()[1]
+            if port not in exclude:
+                return port
+    return preferred
+
+
+def control_endpoint(config_data):
+    """Returns the (host, port) of the control interface the configured backend talks to"""
+    if config_data.get('backend', 'rc') == 'http':
+        return config_data['http_host'], config_data['http_port']
+    return config_data['rc_host'], config_data['rc_port']
+
+
+def interface_arguments(config_data):
+    """Returns the VLC command-line options that open the control interface of the configured backend"""
+    host, port = control_endpoint(config_data)
+    if config_data.get('backend', 'rc') == 'http':
+        return ['--extraintf', 'http', '--http-host', host, '--http-port', str(port),
+                '--http-password', config_data['http_password']]
+    if config_data.get('rc_password'):
+        # The RC interface itself has no password; the telnet interface speaks the same protocol behind one
+        return ['--extraintf', 'telnet', '--telnet-host', host, '--telnet-port', str(port),
+                '--telnet-password', config_data['rc_password']]
+    arguments = ['--extraintf', 'rc', '--rc-host', f"{host}:{port}"]
+    if os.name == 'nt':
+        # Without it VLC opens an extra console window for the RC interface on Windows
+        arguments.append('--rc-quiet')
+    return arguments
+
+
+def configure_instance(config_data, exclude=(), private=False):
+    """Picks the port (and HTTP password) for a new VLC instance
+
+    Returns (config_data, arguments): a copy of the configuration pointing
+    at the chosen endpoint, for create_transport, and the VLC options that
+    open the control interface there. Ports in exclude are never chosen.
+    VLC refuses every HTTP request while no password is set, so an empty
+    http_password gets a random one. With private=True the instance always
+    gets a password of its own (over the telnet interface for the rc
+    backend), so only the process started with it accepts the connection
+    even if another VLC ends up on the same port.
+    """
+    config_data = dict(config_data)
+    if config_data.get('backend', 'rc') == 'http':
+        config_data['http_port'] = free_port(config_data['http_host'], config_data['http_port'], exclude)
+        if private or not config_data.get('http_password'):
+            config_data['http_password'] = secrets.token_urlsafe(16)
+    else:
+        config_data['rc_port'] = free_port(config_data['rc_host'], config_data['rc_port'], exclude)
+        if private:
+            config_data['rc_password'] = secrets.token_urlsafe(16)
+    return config_data, interface_arguments(config_data)
+
+
+def port_open(host, port, timeout=PROBE_TIMEOUT):
+    """Returns True if something accepts TCP connections on host:port"""
+    try:
+        with socket.create_connection((host, port), timeout=timeout):
+            return True
+    except OSError:
+        return False
+
+
+def wait_until_ready(probe, timeout, process=None, min_interval=READY_MIN_INTERVAL, max_interval=1.0):
+    """Calls probe until it returns True; returns the number of attempts, or 0 on failure
+
+    The pause between attempts starts at min_interval and doubles up to
+    max_interval, so a player that comes up quickly is noticed within a
+    few milliseconds while a slow start costs few probes. Gives up after
+    timeout seconds or as soon as the given process has exited.
+    """
+    deadline = time.monotonic() + timeout
+    interval = min_interval
+    attempts = 0
+    while True:
+        attempts += 1
+        if probe():
+            return attempts
+        if process is not None and process.poll() is not None:
+            return 0
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            return 0
+        time.sleep(min(interval, remaining))
+        interval = min(interval * 2, max_interval)
@@ -0,0 +1,24 @@
+class RollingLatency:
+    """Exponentially weighted moving average of a latency, as TCP smooths its RTT
+
+    Each sample moves the estimate by alpha of the difference, so a single
+    slow reply nudges it instead of dominating it.
+    """
+
+    def __init__(self, alpha=0.125):
+        self.alpha = alpha
+        self.value = None
+        self.samples = 0
+
+    def update(self, seconds):
+        """Folds one measured latency into the estimate and returns it"""
+        if self.value is None:
+            self.value = seconds
+        else:
+            self.value += self.alpha * (seconds - self.value)
+        self.samples += 1
+        return self.value
+
+    def get(self, default=0.0):
+        """Returns the current estimate, or default before the first sample"""
+        return default if self.value is None else self.value
@@ -1,8 +1,23 @@
 import subprocess
-import socket
 import time
 import os
+import sys
 import configparser
+from src.vlc.instance import configure_instance, control_endpoint, port_open, wait_until_ready
+from src.vlc.transport import create_transport
+from src.utils.json_finder import find_stored_plan, set_fingerprint_index, set_segment_store, set_sidecar_patterns, sidecar_path
+from src.utils.json_validator import print_report
+from src.utils.segment_plan import load_plan
+from src.utils.sidecar_resolver import DEFAULT_PATTERNS, parse_patterns
+from src.utils.metrics import registry
+
+def user_data_dir():
+    """Returns the per-user directory for state the utility keeps between runs"""
+    if os.name == 'nt':
+        return os.path.join(os.environ.get('LOCALAPPDATA') or os.path.expanduser('~'), 'JustSkipIt')
+    if sys.platform == 'darwin':
+        return os.path.expanduser('~/Library/Application Support/JustSkipIt')
+    return os.path.join(os.environ.get('XDG_DATA_HOME') or os.path.expanduser('~/.local/share'), 'just-skip-it')
 
 def load_config():
     """Loads configuration from config.ini"""
@@ -21,24 +36,84 @@ def load_config():
         rc_host = config.get('VLC', 'rc_host')
         rc_port = config.getint('VLC', 'rc_port')
         rc_password = config.get('VLC', 'rc_password', fallback='')
+        backend = config.get('VLC', 'backend', fallback='rc').strip().lower()
+        http_host = config.get('VLC', 'http_host', fallback='localhost')
+        http_port = config.getint('VLC', 'http_port', fallback=8080)
+        http_password = config.get('VLC', 'http_password', fallback='')
+        configure_interface = config.getboolean('VLC', 'configure_interface', fallback=True)
         check_interval = config.getfloat('TIMEOUTS', 'rc_check_interval')
         timeout_seconds = config.getint('TIMEOUTS', 'rc_connection_timeout')
+        poll_min_interval = config.getfloat('MONITORING', 'poll_min_interval', fallback=0.1)
+        poll_max_interval = config.getfloat('MONITORING', 'poll_max_interval', fallback=5.0)
+        trigger_window = config.getfloat('MONITORING', 'trigger_window', fallback=2.0)
+        event_driven = config.getboolean('MONITORING', 'event_driven', fallback=True)
+        seek_timeout = config.getfloat('MONITORING', 'seek_timeout', fallback=1.5)
+        seek_retries = config.getint('MONITORING', 'seek_retries', fallback=2)
+        early_trigger_guard = config.getfloat('MONITORING', 'early_trigger_guard', fallback=0.5)
+        watch_segments = config.getboolean('MONITORING', 'watch_segments', fallback=True)
+        watch_interval = config.getfloat('MONITORING', 'watch_interval', fallback=1.0)
+        plan_cache_size = config.getint('MONITORING', 'plan_cache_size', fallback=8)
+        prefetch_next = config.getboolean('MONITORING', 'prefetch_next', fallback=True)
+        sidecar_patterns = parse_patterns(config.get('SIDECARS', 'patterns', fallback=", ".join(DEFAULT_PATTERNS)))
+        segment_store = config.get('SIDECARS', 'store_path', fallback='').strip()
+        fingerprint_index = config.get('SIDECARS', 'fingerprint_index', fallback='').strip()
+        if fingerprint_index:
+            # User state, so a relative name goes to the per-user data directory rather than next to the program
+            fingerprint_index = os.path.join(user_data_dir(), os.path.expanduser(fingerprint_index))
+        pool_size = config.getint('POOL', 'size', fallback=0)
+        pool_max_uses = config.getint('POOL', 'max_uses', fallback=10)
+        pool_max_memory_mb = config.getint('POOL', 'max_memory_mb', fallback=1024)
+        pool_health_interval = config.getfloat('POOL', 'health_interval', fallback=5.0)
+        metrics_host = config.get('METRICS', 'endpoint_host', fallback='127.0.0.1')
+        metrics_port = config.getint('METRICS', 'endpoint_port', fallback=0)
+        metrics_dump_path = config.get('METRICS', 'dump_path', fallback='')
         
         return {
             'vlc_path': vlc_path,
             'rc_host': rc_host,
             'rc_port': rc_port,
             'rc_password': rc_password,
+            'backend': backend,
+            'http_host': http_host,
+            'http_port': http_port,
+            'http_password': http_password,
+            'configure_interface': configure_interface,
             'check_interval': check_interval,
-            'timeout_seconds': timeout_seconds
+            'timeout_seconds': timeout_seconds,
+            'poll_min_interval': poll_min_interval,
+            'poll_max_interval': poll_max_interval,
+            'trigger_window': trigger_window,
+            'event_driven': event_driven,
+            'seek_timeout': seek_timeout,
+            'seek_retries': seek_retries,
+            'early_trigger_guard': early_trigger_guard,
+            'watch_segments': watch_segments,
+            'watch_interval': watch_interval,
+            'plan_cache_size': plan_cache_size,
+            'prefetch_next': prefetch_next,
+            'sidecar_patterns': sidecar_patterns,
+            'segment_store': segment_store,
+            'fingerprint_index': fingerprint_index,
+            'pool_size': pool_size,
+            'pool_max_uses': pool_max_uses,
+            'pool_max_memory_mb': pool_max_memory_mb,
+            'pool_health_interval': pool_health_interval,
+            'metrics_host': metrics_host,
+            'metrics_port': metrics_port,
+            'metrics_dump_path': metrics_dump_path
         }
         
     except Exception as e:
         print(f"Error reading configuration: {e}")
         return None
 
-def start_vlc(vlc_path, video_path):
-    """Launches VLC with the video file"""
+def start_vlc(vlc_path, video_path, arguments=()):
+    """Launches VLC with the video file
+
+    arguments are extra VLC options, e.g. the ones that open the control
+    interface; they go before the file so VLC does not take them for
+    options of that playlist item.
+    """
     try:
         # Check if files exist
         if not os.path.exists(vlc_path):
@@ -50,7 +125,7 @@ def start_vlc(vlc_path, video_path):
             return None
         
         # Command to launch VLC with video file
-        cmd = [vlc_path, video_path]
+        cmd = [vlc_path, *arguments, video_path]
         
         print("Launching VLC...")
         process = subprocess.Popen(cmd)
@@ -60,35 +135,27 @@ def start_vlc(vlc_path, video_path):
         print(f"Error launching VLC: {e}")
         return None
 
-def test_rc_connection(host, port, timeout, password=''):
-    """Tests connection to the RC interface"""
-    try:
-        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        sock.settimeout(timeout)
-        result = sock.connect_ex((host, port))
-        
-        if result == 0:
-            # If password is specified, send it first
-            if password:
-                sock.send(f"{password}\n".encode())
-                # Get response after entering password
-                response = sock.recv(1024)
-                
-            # Send test command
-            sock.send(b"help\n")
-            response = sock.recv(1024)
-            sock.close()
-            return len(response) > 0
-        else:
-            sock.close()
-            return False
-            
-    except Exception:
-        return False
+def run_skip_controller(transport, plan, config, **options):
+    """Monitors playback over an already connected transport
+
+    Runs until VLC goes away, unless options for the skip controller (the
+    stop_event and stop_when_finished a pooled player is monitored with)
+    end it earlier. The video_path option lets reloaded plans be checked
+    against the video's duration.
+    """
+    from src.vlc.controller import main as skip_controller_main
+    
+    print("Starting skip controller...")
+    skip_controller_main(transport=transport, plan=plan, config_data=config, **options)
 
+def main(video_path, plan=None, pool=None):
+    """Main function
 
-def main(video_path):
-    """Main function"""
+    plan is the SegmentPlan the GUI already loaded for this video; without
+    one the sidecar JSON is loaded and validated here. With a PlayerPool
+    the video is opened in one of its running VLC instances, and a new
+    VLC is only launched if none is available.
+    """
     print("Starting script...")
 
     # Load configuration
@@ -99,40 +166,82 @@ def main(video_path):
     print(f"Configuration loaded:")
     print(f"  VLC: {config['vlc_path']}")
     print(f"  Video: {video_path}")
-    print(f"  RC: {config['rc_host']}:{config['rc_port']}")
+    print(f"  Backend: {config['backend']}")
     print(f"  Check interval: {config['check_interval']} sec")
     print(f"  Timeout: {config['timeout_seconds']} sec")
     
+    set_sidecar_patterns(config['sidecar_patterns'])
+    set_segment_store(config['segment_store'])
+    set_fingerprint_index(config['fingerprint_index'])
+    if plan is None:
+        plan = find_stored_plan(video_path)
+    if plan is None:
+        json_file_path = sidecar_path(video_path)
+        plan, result = load_plan(json_file_path, video_path=video_path)
+        if plan is None:
+            print_report(json_file_path, result)
+            return
+    print(f"  Segments: {plan.json_path} ({len(plan.segments)} active)")
+    
+    if config['metrics_port']:
+        registry.start_server(config['metrics_host'], config['metrics_port'])
+    
+    if pool is not None:
+        started = time.monotonic()
+        instance = pool.acquire(video_path)
+        if instance is not None:
+            print(f"Opened in {instance.describe()} after {time.monotonic() - started:.3f} sec")
+            try:
+                # The player goes back to the pool once its video stops or ends, or when the next drop claims it
+                run_skip_controller(instance.transport, plan, config, video_path=video_path,
+                                    stop_event=instance.stop_event, stop_when_finished=True)
+            finally:
+                pool.release(instance)
+            return
+        print("No pooled VLC instance available, launching a new one...")
+
+    # VLC is told where to open its control interface, so it need not be configured by hand
+    interface_arguments = []
+    if config['configure_interface']:
+        config, interface_arguments = configure_instance(config)
+    host, port = control_endpoint(config)
+    print(f"  Control interface: {config['backend']} on {host}:{port}")
+
+    # One connection is opened here and handed over to the skip controller
+    try:
+        transport = create_transport(config)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return
+
     # Launch VLC
-    vlc_process = start_vlc(config['vlc_path'], video_path)
+    launched_at = time.monotonic()
+    vlc_process = start_vlc(config['vlc_path'], video_path, interface_arguments)
     if vlc_process is None:
         print("Failed to launch VLC")
         return
     
-    print("VLC launched, checking RC interface availability...")
+    print("VLC launched, waiting for the control interface...")
 
-    # Calculate number of attempts
-    max_attempts = int(config['timeout_seconds'] / config['check_interval'])
-    
-    # Wait and check RC interface
-    for attempt in range(max_attempts):
-        elapsed_time = attempt * config['check_interval']
-        print(f"Attempt {attempt + 1}/{max_attempts} (elapsed {elapsed_time:.1f} sec)...")
-        
-        if test_rc_connection(config['rc_host'], config['rc_port'], 1, config.get('rc_password', '')):
-            print("RC interface available!")
+    # A bare TCP connect is cheap enough to repeat every few milliseconds;
+    # the protocol handshake is only tried once the port accepts connections
+    attempts = wait_until_ready(
+        lambda: port_open(host, port) and transport.connect(),
+        config['timeout_seconds'],
+        process=vlc_process,
+        max_interval=config['check_interval'],
+    )
+    if not attempts:
+        if vlc_process.poll() is not None:
+            print(f"VLC exited (code {vlc_process.returncode}) before its control interface came up")
+        else:
+            print(f"Timeout: control interface not available for {config['timeout_seconds']} seconds")
+        print("Terminating script")
+        return
 
-            # Get path to JSON file from video path
-            json_file_path = video_path.rsplit(".", 1)[0] + ".json"
-            
-            from src.vlc.controller import main as skip_controller_main
-            
-            print("Starting skip controller...")
-            skip_controller_main(json_file_path)
-            return
-        
-        time.sleep(config['check_interval'])
-    
-    # If connection couldn't be established within the timeout period
-    print(f"Timeout: RC interface not available for {config['timeout_seconds']} seconds")
-    print("Terminating script")
+    ready_seconds = time.monotonic() - launched_at
+    registry.gauge("rc_ready_seconds", "Time from launching VLC until its control interface answered").set(ready_seconds)
+    registry.gauge("rc_ready_probes", "Readiness probes sent before the control interface answered").set(attempts)
+    print(f"Control interface available ({transport.describe()}) after {ready_seconds:.2f} sec ({attempts} probes)!")
+
+    run_skip_controller(transport, plan, config, video_path=video_path)
@@ -0,0 +1,365 @@
+import ctypes
+import os
+import subprocess
+import sys
+import threading
+import time
+from src.utils.metrics import registry
+from src.vlc.instance import configure_instance, control_endpoint, port_open, wait_until_ready
+from src.vlc.transport import create_transport
+
+POOL_OPEN = registry.histogram("player_pool_open_seconds", "Time to hand a video to an idle pooled VLC instance (clear + add)")
+POOL_START = registry.histogram("player_pool_start_seconds", "Time from starting a pooled VLC instance until its control interface answered")
+POOL_IDLE = registry.gauge("player_pool_idle", "Pooled VLC instances ready for the next video")
+
+# Give a terminated VLC this long to exit before it is killed
+TERMINATE_TIMEOUT = 2.0
+
+
+def process_rss_bytes(pid):
+    """Returns the resident memory of a process in bytes, or None where it cannot be measured"""
+    if sys.platform.startswith('linux'):
+        try:
+            with open(f"/proc/{pid}/statm", 'r') as f:
+                return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+        except (OSError, ValueError, IndexError):
+            return None
+    if os.name == 'nt':
+        return windows_working_set(pid)
+    return None
+
+
+def windows_working_set(pid):
+    from ctypes import wintypes
+
+    class PROCESS_MEMORY_COUNTERS(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t),
+        ]
+
+    PROCESS_QUERY_LIMITED_INFORMATION = 0x1000
+    kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+    kernel32.OpenProcess.restype = wintypes.HANDLE
+    kernel32.OpenProcess.argtypes = (wintypes.DWORD, wintypes.BOOL, wintypes.DWORD)
+    kernel32.CloseHandle.argtypes = (wintypes.HANDLE,)
+    kernel32.K32GetProcessMemoryInfo.argtypes = (wintypes.HANDLE, ctypes.c_void_p, wintypes.DWORD)
+
+    handle = kernel32.OpenProcess(PROCESS_QUERY_LIMITED_INFORMATION, False, pid)
+    if not handle:
+        return None
+    try:
+        counters = PROCESS_MEMORY_COUNTERS()
+        counters.cb = ctypes.sizeof(counters)
+        if not kernel32.K32GetProcessMemoryInfo(handle, ctypes.byref(counters), counters.cb):
+            return None
+        return counters.WorkingSetSize
+    finally:
+        kernel32.CloseHandle(handle)
+
+
+class PlayerInstance:
+    """One VLC process started by the pool, together with the transport that controls it"""
+
+    def __init__(self, process, config_data, transport):
+        self.process = process
+        self.config_data = config_data
+        self.transport = transport
+        self.port = control_endpoint(config_data)[1]
+        # Videos opened in this process so far
+        self.uses = 0
+        # Set to end the monitoring of the current video; a new one per video
+        self.stop_event = threading.Event()
+
+    def alive(self):
+        return self.process.poll() is None
+
+    def open_media(self, video_path):
+        """Replaces the playlist with one video over the control protocol; returns True if VLC took it"""
+        if not self.transport.connect():
+            return False
+        return self.transport.command("clear") is not None and self.transport.command(f"add {video_path}") is not None
+
+    def terminate(self):
+        """Closes the connection and stops the process"""
+        self.transport.close()
+        if not self.alive():
+            return
+        self.process.terminate()
+        try:
+            self.process.wait(TERMINATE_TIMEOUT)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+
+    def describe(self):
+        return f"VLC pid {self.process.pid} ({self.transport.describe()})"
+
+
+class PlayerPool:
+    """Keeps pre-started VLC instances with their control interface up, ready for new videos
+
+    size instances are started in the background, each on a port no other
+    pooled instance holds and with a password of its own, so a connection
+    can only reach the process it was made for (see configure_instance).
+    acquire() hands a video to an idle instance with clear/add over the
+    control protocol, so opening it costs a round trip instead of a VLC
+    start-up. Its caller monitors the video until the instance's
+    stop_event is set or playback stops or ends, then gives the instance
+    back with release(), after which it waits for the next video. When
+    every instance is busy, the next acquire() claims the one that was
+    handed out longest ago: it sets that instance's stop_event and takes
+    the instance over once it is released.
+
+    Instances that exited (e.g. their window was closed), stopped
+    answering, use more than max_memory_mb of memory or have opened
+    max_uses videos are replaced when they are released, and idle ones
+    are checked every health_interval seconds.
+    """
+
+    def __init__(self, config_data, size=1, max_uses=10, max_memory_mb=1024, health_interval=5.0):
+        self.config_data = config_data
+        self.size = size
+        self.max_uses = max_uses
+        self.max_memory = max_memory_mb * 1024 * 1024
+        self.health_interval = health_interval
+        self.idle = []
+        # In the order they were handed out, so a claim takes the oldest
+        self.busy = []
+        self.starting = 0
+        # Control ports of the instances started and not yet stopped by the pool
+        self.ports = set()
+        # Launch failures in a row; automatic refilling pauses after a few, e.g. for a wrong executable_path
+        self.failed_starts = 0
+        self.lock = threading.Condition()
+        self.closed = False
+        self.stop_event = threading.Event()
+        self.health_thread = None
+
+    def start(self):
+        """Starts the idle instances and the health checks without waiting for them"""
+        self.fill()
+        self.health_thread = threading.Thread(target=self.health_loop, daemon=True)
+        self.health_thread.start()
+
+    def close(self):
+        """Stops the idle instances; players showing a video are left to the user"""
+        with self.lock:
+            self.closed = True
+            idle = self.idle
+            self.idle = []
+            self.lock.notify_all()
+        self.stop_event.set()
+        for instance in idle:
+            self.stop(instance)
+        POOL_IDLE.set(0)
+
+    def stop(self, instance):
+        """Terminates an instance and frees its port for the next one"""
+        instance.terminate()
+        with self.lock:
+            self.ports.discard(instance.port)
+
+    def fill(self, retry=False):
+        """Starts enough instances to get back to size of them, idle or busy"""
+        with self.lock:
+            if self.closed or (self.failed_starts >= 3 and not retry):
+                return
+            missing = self.size - len(self.idle) - len(self.busy) - self.starting
+            self.starting += max(missing, 0)
+        for _ in range(missing):
+            threading.Thread(target=self.spawn, daemon=True).start()
+
+    def spawn(self):
+        instance = None
+        try:
+            instance = self.launch()
+        finally:
+            with self.lock:
+                self.starting -= 1
+                self.failed_starts = 0 if instance is not None else self.failed_starts + 1
+                keep = instance is not None and not self.closed
+                if keep:
+                    self.idle.append(instance)
+                    POOL_IDLE.set(len(self.idle))
+                self.lock.notify_all()
+            if instance is not None and not keep:
+                self.stop(instance)
+
+    def launch(self):
+        """Starts one VLC without media and waits for its control interface; returns None on failure"""
+        vlc_path = self.config_data['vlc_path']
+        if not os.path.exists(vlc_path):
+            print(f"Error: VLC not found at path {vlc_path}")
+            return None
+        # Spawn threads run side by side: the port is chosen and reserved in one step
+        with self.lock:
+            config_data, arguments = configure_instance(self.config_data, exclude=self.ports, private=True)
+            host, port = control_endpoint(config_data)
+            self.ports.add(port)
+        # Every pooled player must be a process of its own, whatever VLC's single-instance setting says
+        cmd = [vlc_path, '--no-one-instance', *arguments]
+        try:
+            launched_at = time.monotonic()
+            process = subprocess.Popen(cmd)
+        except OSError as e:
+            print(f"Error launching VLC: {e}")
+            with self.lock:
+                self.ports.discard(port)
+            return None
+
+        transport = create_transport(config_data)
+        # The instance's own password makes the handshake fail against any other process on the port
+        attempts = wait_until_ready(
+            lambda: process.poll() is None and port_open(host, port) and transport.connect(),
+            config_data['timeout_seconds'],
+            process=process,
+            max_interval=config_data['check_interval'],
+        )
+        instance = PlayerInstance(process, config_data, transport)
+        if not attempts:
+            print(f"Pooled VLC instance on {host}:{port} did not come up")
+            self.stop(instance)
+            return None
+        POOL_START.observe(time.monotonic() - launched_at)
+        print(f"Pooled {instance.describe()} ready after {time.monotonic() - launched_at:.2f} sec")
+        return instance
+
+    def acquire(self, video_path, timeout=None):
+        """Opens a video in an idle instance and returns it, or None if no instance became ready
+
+        Waits up to timeout seconds (rc_connection_timeout by default) for
+        an instance that is still starting or being claimed. The caller owns
+        the returned instance until it hands it back with release(), and
+        should stop monitoring its video once instance.stop_event is set.
+        """
+        deadline = time.monotonic() + (self.config_data['timeout_seconds'] if timeout is None else timeout)
+        while True:
+            instance = self.take_idle(deadline)
+            if instance is None:
+                registry.counter("player_pool_acquires_total", "Videos handed to the player pool", {"result": "unavailable"}).inc()
+                return None
+            started = time.perf_counter()
+            if instance.alive() and instance.open_media(video_path):
+                POOL_OPEN.observe(time.perf_counter() - started)
+                registry.counter("player_pool_acquires_total", "Videos handed to the player pool", {"result": "opened"}).inc()
+                instance.uses += 1
+                instance.stop_event = threading.Event()
+                with self.lock:
+                    self.busy.append(instance)
+                return instance
+            self.discard(instance, "exited" if not instance.alive() else "unresponsive")
+
+    def take_idle(self, deadline):
+        with self.lock:
+            retried = False
+            claimed = False
+            while not self.idle:
+                if self.closed:
+                    return None
+                if self.starting == 0 and self.busy and not claimed:
+                    # Every player shows a video: take over the one handed out longest ago
+                    victim = next((instance for instance in self.busy if not instance.stop_event.is_set()), self.busy[0])
+                    print(f"Claiming {victim.describe()} for the next video")
+                    victim.stop_event.set()
+                    claimed = True
+                elif self.starting == 0 and not self.busy:
+                    # Nothing on the way: start one now, but only once per request
+                    if retried:
+                        return None
+                    retried = True
+                    self.fill(retry=True)
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return None
+                self.lock.wait(remaining)
+            instance = self.idle.pop()
+            POOL_IDLE.set(len(self.idle))
+            return instance
+
+    def release(self, instance):
+        """Takes back an instance whose video is no longer monitored"""
+        with self.lock:
+            if instance in self.busy:
+                self.busy.remove(instance)
+            if self.closed:
+                return
+        reason = self.recycle_reason(instance)
+        if reason is None and instance.transport.command("clear") is None:
+            reason = "unresponsive"
+        if reason is not None:
+            self.discard(instance, reason)
+            self.fill(retry=True)
+            return
+        with self.lock:
+            self.idle.append(instance)
+            POOL_IDLE.set(len(self.idle))
+            self.lock.notify_all()
+
+    def recycle_reason(self, instance):
+        """Returns why an instance should be replaced, or None if it is fit for another video"""
+        if not instance.alive():
+            return "exited"
+        if self.max_uses and instance.uses >= self.max_uses:
+            return "uses"
+        rss = process_rss_bytes(instance.process.pid)
+        if self.max_memory and rss is not None and rss > self.max_memory:
+            return "memory"
+        if not instance.transport.connect() or instance.transport.get_status() is None:
+            return "unresponsive"
+        return None
+
+    def discard(self, instance, reason):
+        registry.counter("player_pool_recycled_total", "Pooled VLC instances stopped and replaced", {"reason": reason}).inc()
+        print(f"Recycling {instance.describe()}: {reason}")
+        self.stop(instance)
+
+    def check_health(self):
+        """Recycles idle instances that fail recycle_reason and tops the pool up
+
+        A busy instance whose process exited gets its stop_event set, so its
+        monitoring ends and release() replaces it without waiting for the
+        skip controller's connection timeout.
+        """
+        with self.lock:
+            instances = list(self.idle)
+            busy = list(self.busy)
+        for instance in busy:
+            if not instance.alive():
+                instance.stop_event.set()
+        for instance in instances:
+            reason = self.recycle_reason(instance)
+            if reason is None:
+                continue
+            with self.lock:
+                # Skip it if acquire() took it meanwhile
+                if instance not in self.idle:
+                    continue
+                self.idle.remove(instance)
+                POOL_IDLE.set(len(self.idle))
+            self.discard(instance, reason)
+        self.fill()
+
+    def health_loop(self):
+        while not self.stop_event.wait(self.health_interval):
+            self.check_health()
+
+
+def create_pool(config_data):
+    """Builds the player pool described by the [POOL] settings, or None if it is disabled"""
+    if config_data.get('pool_size', 0) <= 0:
+        return None
+    return PlayerPool(
+        config_data,
+        size=config_data['pool_size'],
+        max_uses=config_data.get('pool_max_uses', 10),
+        max_memory_mb=config_data.get('pool_max_memory_mb', 1024),
+        health_interval=config_data.get('pool_health_interval', 5.0),
+    )
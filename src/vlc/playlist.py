@@ -0,0 +1,79 @@
+import os
+import re
+from typing import NamedTuple, Optional
+from urllib.parse import unquote, urlparse
+from urllib.request import url2pathname
+
+# "|   *3 - movie.mp4 (00:42:00) [played 1 time]" in RC 'playlist' output
+RC_ITEM_PATTERN = re.compile(
+    r"^\|(?P<indent>\s*)(?P<current>\*?)(?P<id>\d+) - (?P<name>.*?)"
+    r"(?: \((?:\d+:\d\d:\d\d|--:--:--)\))?(?: \[played \d+ times?\])?\s*$"
+)
+
+
+class PlaylistItem(NamedTuple):
+    """One entry of the player's playlist"""
+    name: str
+    uri: Optional[str]
+    current: bool
+
+
+def parse_rc_playlist(response):
+    """Extracts the playlist items from RC 'playlist' output
+
+    The top-level "Playlist" and "Media Library" nodes are skipped. RC only
+    shows item titles, which are the file names unless the media has a
+    title tag.
+    """
+    items = []
+    for line in (response or "").splitlines():
+        match = RC_ITEM_PATTERN.match(line.rstrip())
+        if match is None or len(match.group("indent")) <= 1:
+            continue
+        items.append(PlaylistItem(match.group("name"), None, bool(match.group("current"))))
+    return items
+
+
+def parse_http_playlist(data):
+    """Extracts the playlist items from VLC's /requests/playlist.json document"""
+    items = []
+
+    def walk(node):
+        for child in node.get("children", []):
+            if child.get("type") == "leaf" or "uri" in child:
+                items.append(PlaylistItem(child.get("name", ""), child.get("uri"), child.get("current") == "current"))
+            else:
+                walk(child)
+
+    # The first top-level node is the playlist, the second the media library
+    if isinstance(data, dict) and data.get("children"):
+        walk(data["children"][0])
+    return items
+
+
+def next_item(items):
+    """Returns the item after the current one, or None"""
+    for i, item in enumerate(items):
+        if item.current:
+            return items[i + 1] if i + 1 < len(items) else None
+    return None
+
+
+def input_to_path(input_name, base_dir=None):
+    """Turns a VLC input (file:// URI, path or bare file name) into a local path, or None for streams"""
+    if not input_name:
+        return None
+    if input_name.startswith("file://"):
+        url = urlparse(input_name)
+        path = url2pathname(url.path)
+        if url.netloc and url.netloc != "localhost":
+            # UNC share: file://server/share/movie.mp4
+            path = f"\\\\{url.netloc}{path}" if os.name == "nt" else f"//{url.netloc}{unquote(url.path)}"
+        return path
+    if "://" in input_name:
+        return None
+    if os.path.isabs(input_name):
+        return input_name
+    if base_dir:
+        return os.path.join(base_dir, input_name)
+    return None
@@ -0,0 +1,86 @@
+import time
+
+
+class PositionEstimator:
+    """Estimates the playback position in milliseconds between coarse player samples
+
+    RC's get_time only has one-second resolution. Whenever the reported
+    second changes, the real boundary was crossed somewhere between the
+    previous sample and this one; the midpoint becomes an anchor and the
+    position is extrapolated from it with the monotonic clock and the
+    playback rate, clamped to the reported second. When the player reports
+    a fractional position (HTTP position x length) that is used instead.
+    """
+
+    def __init__(self, jump_tolerance=1.5):
+        self.jump_tolerance = jump_tolerance
+        self.last_seconds = None
+        self.last_sample_at = None
+        self.anchor_ms = None
+        self.anchor_at = None
+        self.anchor_window = None
+
+    def reset(self):
+        """Forgets the anchor after a pause, seek or new input"""
+        self.last_seconds = None
+        self.last_sample_at = None
+        self.anchor_ms = None
+        self.anchor_at = None
+        self.anchor_window = None
+
+    def observe_boundary(self, seconds, now=None):
+        """Anchors on a pushed notification that playback just reached a whole second"""
+        if now is None:
+            now = time.monotonic()
+        self.anchor_ms = seconds * 1000
+        self.anchor_at = now
+        self.anchor_window = 0.0
+        self.last_seconds = seconds
+        self.last_sample_at = now
+
+    def estimate(self, status, rate=1.0, now=None):
+        """Returns the estimated position in milliseconds for a status snapshot, or None"""
+        if status is None or status.time is None:
+            return None
+        if now is None:
+            now = time.monotonic()
+
+        seconds = status.time
+        low = seconds * 1000
+        high = low + 999
+
+        if status.position is not None and status.length:
+            # The fraction is precise, but length is rounded: keep it inside the reported second
+            self.reset()
+            return min(max(int(status.position * status.length * 1000), low), high)
+
+        if status.paused:
+            self.reset()
+            return low
+
+        previous, previous_at = self.last_seconds, self.last_sample_at
+        self.last_seconds = seconds
+        self.last_sample_at = now
+
+        if previous is None or abs(seconds - previous) > self.jump_tolerance + (now - previous_at) * rate:
+            # First sample or a jump: no usable anchor yet
+            self.anchor_ms = None
+            return low
+
+        if self.anchor_ms is not None:
+            estimate = self.anchor_ms + int((now - self.anchor_at) * rate * 1000)
+        else:
+            estimate = None
+
+        if seconds != previous:
+            window = now - previous_at
+            # Re-anchor when the boundary is pinned down tighter than before, or the old anchor drifted
+            if estimate is None or window < self.anchor_window or not low <= estimate <= high:
+                self.anchor_ms = low
+                self.anchor_at = previous_at + window / 2
+                self.anchor_window = window
+                estimate = low + int((now - self.anchor_at) * rate * 1000)
+
+        if estimate is None:
+            return low
+        return min(max(estimate, low), high)
@@ -0,0 +1,224 @@
+import select
+import socket
+import threading
+import time
+from src.vlc.events import EventParser, is_status_change
+from src.utils.metrics import registry
+
+RC_ROUND_TRIP = registry.histogram("rc_round_trip_seconds", "Time for one pipelined RC request/response exchange")
+RC_RECONNECTS = registry.counter("rc_reconnects_total", "RC connections opened after the first one")
+
+
+class RCProtocol:
+    """Framing of the VLC RC protocol shared by the blocking and asyncio sessions
+
+    Replies are terminated by a '> ' prompt at the start of a line; unsolicited
+    'status change:' lines are split off and queued as events.
+    """
+
+    PROMPT = b"> "
+    PASSWORD_PROMPT = b"Password:"
+
+    def __init__(self):
+        self.buffer = b""
+        
+        # Status change lines seen while reading command replies, delivered by wait_for_events
+        self.event_parser = EventParser()
+        self.pending_events = []
+
+    def take_events(self):
+        """Returns and clears the queued events"""
+        events = self.pending_events
+        self.pending_events = []
+        return events
+
+    def _find_marker(self, markers):
+        """Returns the index just past the earliest marker in the buffer, or None"""
+        best = None
+        for marker in markers:
+            if self.buffer.startswith(marker):
+                end = len(marker)
+            else:
+                # Markers only count at the start of a line
+                position = self.buffer.find(b"\n" + marker)
+                if position == -1:
+                    continue
+                end = position + 1 + len(marker)
+            if best is None or end < best:
+                best = end
+        return best
+
+    def _decode_response(self, raw):
+        """Strips the trailing prompt and returns the response text"""
+        text = raw.decode('utf-8', errors='replace').replace('\r\n', '\n')
+        if text.endswith(self.PROMPT.decode()):
+            text = text[:-len(self.PROMPT)]
+        
+        # Notifications can arrive interleaved with replies; keep them for wait_for_events
+        lines = []
+        for line in text.split('\n'):
+            if is_status_change(line):
+                self._queue_event(line)
+            else:
+                lines.append(line)
+        return '\n'.join(lines).strip()
+
+    def _collect_idle_lines(self):
+        """Moves complete lines received while no command is pending out of the buffer"""
+        lines = self.buffer.split(b"\n")
+        self.buffer = lines.pop()
+        for line in lines:
+            self._queue_event(line.decode('utf-8', errors='replace'))
+        # Nothing is awaiting a reply, so a bare prompt here would desynchronize the next command
+        if self.buffer.startswith(self.PROMPT):
+            self.buffer = self.buffer[len(self.PROMPT):]
+
+    def _queue_event(self, line):
+        """Parses a status change line and queues the resulting event"""
+        if is_status_change(line):
+            event = self.event_parser.parse(line)
+            if event is not None:
+                self.pending_events.append(event)
+
+
+class RCSession(RCProtocol):
+    """Persistent, authenticated connection to the VLC RC interface"""
+
+    def __init__(self, host, port, password='', timeout=1.0,
+                 min_backoff=0.1, max_backoff=5.0):
+        self.host = host
+        self.port = port
+        self.password = password
+        self.timeout = timeout
+        self.min_backoff = min_backoff
+        self.max_backoff = max_backoff
+        super().__init__()
+
+        self.sock = None
+        self.lock = threading.RLock()
+
+        self.connections_opened = 0
+        self.backoff = 0.0
+        self.next_attempt = 0.0
+
+    def is_connected(self):
+        """Returns True if the session holds an open connection"""
+        return self.sock is not None
+
+    def connect(self):
+        """Opens and authenticates the connection, respecting the reconnect backoff"""
+        with self.lock:
+            if self.sock is not None:
+                return True
+
+            now = time.monotonic()
+            if now < self.next_attempt:
+                return False
+
+            try:
+                sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                sock.settimeout(self.timeout)
+                self.sock = sock
+                self.buffer = b""
+                self.connections_opened += 1
+                if self.connections_opened > 1:
+                    RC_RECONNECTS.inc()
+
+                # Consume the greeting (or password prompt) up to the first prompt
+                greeting = self._read_until((self.PROMPT, self.PASSWORD_PROMPT))
+                if self.PASSWORD_PROMPT in greeting or self.password:
+                    self.sock.sendall(f"{self.password}\n".encode())
+                    self._read_until((self.PROMPT,))
+            except OSError:
+                self._drop()
+                self.backoff = min(max(self.backoff * 2, self.min_backoff), self.max_backoff)
+                self.next_attempt = time.monotonic() + self.backoff
+                return False
+
+            self.backoff = 0.0
+            self.next_attempt = 0.0
+            return True
+
+    def close(self):
+        """Closes the connection"""
+        with self.lock:
+            if self.sock is not None:
+                try:
+                    self.sock.sendall(b"logout\n")
+                except OSError:
+                    pass
+            self._drop()
+
+    def command(self, command):
+        """Sends a single command and returns its response, or None on failure"""
+        responses = self.commands([command])
+        return responses[0] if responses is not None else None
+
+    def commands(self, commands):
+        """Sends commands and returns their responses; reconnects once if the link dropped"""
+        with self.lock:
+            for attempt in range(2):
+                if not self.connect():
+                    return None
+                try:
+                    started = time.perf_counter()
+                    responses = self._exchange(commands)
+                    RC_ROUND_TRIP.observe(time.perf_counter() - started)
+                    return responses
+                except OSError:
+                    self._drop()
+                    # A stale connection is retried immediately, a refused one backs off
+                    self.next_attempt = 0.0
+            return None
+
+    def wait_for_events(self, timeout):
+        """Waits up to timeout seconds for unsolicited status changes and returns them as events"""
+        with self.lock:
+            if not self.pending_events and self.sock is not None:
+                try:
+                    readable, _, _ = select.select([self.sock], [], [], timeout)
+                    if readable:
+                        chunk = self.sock.recv(4096)
+                        if not chunk:
+                            raise ConnectionResetError("RC connection closed by VLC")
+                        self.buffer += chunk
+                        self._collect_idle_lines()
+                except (OSError, ValueError):
+                    self._drop()
+            elif not self.pending_events:
+                time.sleep(timeout)
+
+            return self.take_events()
+
+    def _exchange(self, commands):
+        """Writes all commands in one send, then reads one prompt-terminated response per command"""
+        self.sock.sendall("".join(f"{command}\n" for command in commands).encode())
+        responses = []
+        for _ in commands:
+            raw = self._read_until((self.PROMPT,))
+            responses.append(self._decode_response(raw))
+        return responses
+
+    def _read_until(self, markers):
+        """Reads from the socket until the buffer holds one of the markers"""
+        while True:
+            end = self._find_marker(markers)
+            if end is not None:
+                data, self.buffer = self.buffer[:end], self.buffer[end:]
+                return data
+
+            chunk = self.sock.recv(4096)
+            if not chunk:
+                raise ConnectionResetError("RC connection closed by VLC")
+            self.buffer += chunk
+
+    def _drop(self):
+        """Forgets the current socket without touching the backoff state"""
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+        self.buffer = b""
@@ -0,0 +1,100 @@
+import time
+
+
+class PollScheduler:
+    """Decides how long the monitor loop may sleep before the next status poll
+
+    Far from the next trigger the loop polls every max_interval seconds; in
+    the trigger_window before a trigger, and for fast_period seconds after a
+    pause, resume or seek, it polls every min_interval seconds.
+    """
+
+    # Seconds of playback a rate estimate is taken over
+    RATE_WINDOW = 5.0
+    # Fastest playback rate assumed before the real rate is known
+    MAX_RATE = 4.0
+
+    def __init__(self, min_interval=0.1, max_interval=5.0, trigger_window=2.0,
+                 fast_period=3.0, paused_interval=0.5, seek_tolerance=1.5):
+        self.min_interval = min_interval
+        self.max_interval = max_interval
+        self.trigger_window = trigger_window
+        self.fast_period = fast_period
+        self.paused_interval = paused_interval
+        self.seek_tolerance = seek_tolerance
+
+        self.rate = 1.0
+        self.rate_measured = False
+        self.paused = False
+        self.fast_until = 0.0
+        self.last_position = None
+        self.last_sample = None
+
+    def set_rate(self, rate):
+        """Uses a playback rate reported by the player instead of the estimate"""
+        if rate > 0:
+            self.rate = rate
+            self.rate_measured = True
+
+    def note_event(self, now=None):
+        """Switches to fast polling after a pause, resume, seek or new input"""
+        if now is None:
+            now = time.monotonic()
+        self.fast_until = now + self.fast_period
+
+    def observe(self, position, paused, now=None):
+        """Records a position sample, updating the rate estimate and detecting jumps"""
+        if now is None:
+            now = time.monotonic()
+
+        if paused != self.paused:
+            self.paused = paused
+            self.note_event(now)
+
+        if position is None or paused:
+            self.last_position = None
+            self.last_sample = None
+            return
+
+        if self.last_position is not None:
+            elapsed = now - self.last_sample
+            if self.rate_measured:
+                expected = self.last_position + elapsed * self.rate
+                jumped = abs(position - expected) > self.seek_tolerance + elapsed * 0.1
+            else:
+                # Until the rate is known, any advance playback at up to MAX_RATE explains is not a seek
+                advance = position - self.last_position
+                jumped = advance < -self.seek_tolerance or advance > elapsed * self.MAX_RATE + self.seek_tolerance
+            if jumped:
+                # Position moved further than playback explains: a seek happened
+                self.note_event(now)
+            elif elapsed < self.RATE_WINDOW:
+                # Keep the anchor until the window is long enough for one-second samples
+                return
+            else:
+                observed = (position - self.last_position) / elapsed
+                if self.rate_measured:
+                    observed = 0.5 * self.rate + 0.5 * observed
+                self.rate = min(max(observed, 0.25), self.MAX_RATE)
+                self.rate_measured = True
+
+        self.last_position = position
+        self.last_sample = now
+
+    def next_delay(self, position, next_trigger, now=None):
+        """Returns the number of seconds to sleep before polling again"""
+        if now is None:
+            now = time.monotonic()
+
+        if now < self.fast_until or position is None:
+            return self.min_interval
+        if self.paused:
+            return self.paused_interval
+        if next_trigger is None:
+            return self.max_interval
+
+        # Until the rate is known, assume the fastest one so a trigger is never slept through
+        rate = self.rate if self.rate_measured else self.MAX_RATE
+        # Playback time until the trigger enters the dense polling window
+        eta = (next_trigger - position) / rate - self.trigger_window
+        return min(max(eta, self.min_interval), self.max_interval)
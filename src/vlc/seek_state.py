@@ -0,0 +1,102 @@
+import time
+
+PLAYING = "playing"
+SEEK_ISSUED = "seek_issued"
+SEEK_CONFIRMED = "seek_confirmed"
+PAUSED = "paused"
+ENDED = "ended"
+
+# Outcomes of a pending seek reported by PlaybackState.observe
+CONFIRMED = "confirmed"
+RETRY = "retry"
+ABANDONED = "abandoned"
+FAILED = "failed"
+
+
+class PlaybackState:
+    """Per-session state machine: playing, seek issued, seek confirmed, paused or ended
+
+    A seek is confirmed as soon as a poll or a pushed event reports the
+    position at (or just past) the target, and monitoring resumes on that
+    same tick. Without confirmation within seek_timeout seconds the seek is
+    retried, up to seek_retries times, before the session gives up and goes
+    back to playing. A position before the seek origin or well past the
+    target means the user moved playback in the meantime, and the seek is
+    abandoned instead of waited for.
+    """
+
+    def __init__(self, seek_timeout=1.5, seek_retries=2, landing_window=1.0):
+        self.seek_timeout = seek_timeout
+        self.seek_retries = seek_retries
+        self.landing_window = landing_window
+
+        self.state = PLAYING
+        self.target = None
+        self.origin = None
+        self.attempts = 0
+        self.issued_at = None
+        self.first_issued_at = None
+
+    @property
+    def seeking(self):
+        return self.state == SEEK_ISSUED
+
+    def reset(self):
+        """Drops any pending seek, e.g. when a new input starts"""
+        self.state = PLAYING
+        self.target = None
+        self.origin = None
+        self.attempts = 0
+
+    def seek_issued(self, target, origin, now=None):
+        """Records a seek to target (seconds) sent while playback was at origin"""
+        if now is None:
+            now = time.monotonic()
+        if self.state == SEEK_ISSUED and target == self.target:
+            self.attempts += 1
+        else:
+            self.attempts = 1
+            self.origin = origin
+            self.first_issued_at = now
+        self.state = SEEK_ISSUED
+        self.target = target
+        self.issued_at = now
+
+    def observe(self, position, player_state=None, rate=1.0, now=None):
+        """Advances the state from a position sample in seconds
+
+        Returns CONFIRMED, RETRY, ABANDONED or FAILED when a pending seek
+        is resolved or needs to be re-sent, otherwise None.
+        """
+        if now is None:
+            now = time.monotonic()
+
+        if self.state != SEEK_ISSUED:
+            if player_state in ("stopped", "ended"):
+                self.state = ENDED
+            elif player_state is not None and player_state != "playing":
+                self.state = PAUSED
+            elif position is not None:
+                self.state = PLAYING
+            return None
+
+        if player_state in ("stopped", "ended"):
+            self.state = ENDED
+            return ABANDONED
+
+        if position is not None:
+            elapsed = now - self.issued_at
+            if self.target <= position <= self.target + self.landing_window + elapsed * rate:
+                self.state = SEEK_CONFIRMED
+                return CONFIRMED
+            if position < self.origin - self.landing_window or position > self.target:
+                # Playback is somewhere the seek cannot have put it: the user moved it
+                self.state = PLAYING
+                return ABANDONED
+
+        if now - self.issued_at < self.seek_timeout:
+            return None
+        if self.attempts <= self.seek_retries:
+            return RETRY
+        self.state = PLAYING
+        return FAILED
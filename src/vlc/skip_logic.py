@@ -0,0 +1,212 @@
+import time
+from src.vlc.latency import RollingLatency
+from src.vlc.position import PositionEstimator
+from src.vlc.scheduler import PollScheduler
+from src.vlc.seek_state import ABANDONED, CONFIRMED, FAILED, RETRY, PlaybackState
+from src.utils.segment_index import SegmentIndex
+from src.utils.metrics import registry
+
+POLLS = registry.counter("polls_total", "Status snapshots taken by the monitor loop")
+POLL_RATE = registry.gauge("polls_per_second", "Status polls per second over the last rate window")
+SEEK_COMPLETION = registry.histogram("seek_completion_seconds", "Time from issuing a seek until the player reports the target position")
+SEEK_RETRIES = registry.counter("seek_retries_total", "Seeks re-sent because the player did not confirm them in time")
+SEEK_FAILURES = registry.counter("seek_failures_total", "Seeks given up on after all retries")
+SEEK_ABANDONED = registry.counter("seek_abandoned_total", "Pending seeks dropped because playback moved elsewhere or ended")
+
+# Seconds over which polls_per_second is averaged
+POLL_RATE_WINDOW = 10.0
+
+# Overshoot can be negative once triggers fire early, so the buckets straddle zero
+OVERSHOOT_BUCKETS = (-1.0, -0.5, -0.25, -0.1, -0.05, 0.0, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+class SkipLogic:
+    """Skip decisions shared by the threaded and the asyncio controllers
+
+    Subclasses do the I/O: they fetch status snapshots, wait for events and
+    issue the seeks that evaluate_status asks for.
+    """
+
+    def init_skip_logic(self, config_data):
+        """Sets up the scheduler and seek state from the configuration"""
+        self.scheduler = PollScheduler(
+            min_interval=config_data.get('poll_min_interval', 0.1),
+            max_interval=config_data.get('poll_max_interval', 5.0),
+            trigger_window=config_data.get('trigger_window', 2.0)
+        )
+        self.position = PositionEstimator()
+        self.last_status = None
+        self.last_position_ms = None
+        self.segment_index = SegmentIndex.from_segments([])
+
+        self.playback = PlaybackState(
+            seek_timeout=config_data.get('seek_timeout', 1.5),
+            seek_retries=config_data.get('seek_retries', 2)
+        )
+
+        # Rolling estimates used to fire a skip early enough to land on trigger_time
+        self.status_rtt = RollingLatency()
+        self.seek_latency = RollingLatency()
+        self.early_trigger_guard = config_data.get('early_trigger_guard', 0.5)
+
+        self.active_range = -1
+        self.trigger_overshoot = 0.0
+        self.poll_window_start = time.monotonic()
+        self.poll_window_count = 0
+
+    def check_vlc_pause(self, status):
+        """Checks if VLC is paused according to a status snapshot"""
+        return status.paused
+
+    def evaluate_status(self, status):
+        """Updates state from a status snapshot; returns the time to seek to, or None"""
+        self.last_status = status
+        self.count_poll()
+        if status is None:
+            return None
+        if status.rate is not None:
+            # Transports that report the rate spare the scheduler its estimate
+            self.scheduler.set_rate(status.rate)
+        position_ms = self.position.estimate(status, self.scheduler.rate)
+        self.last_position_ms = position_ms
+        current_time = None if position_ms is None else position_ms / 1000
+        self.scheduler.observe(current_time, status.paused)
+
+        player_state = status.state
+        if player_state is None:
+            player_state = "paused" if status.paused else "playing"
+        if self.settle_seek(self.playback.observe(current_time, player_state, self.scheduler.rate)) == RETRY:
+            return self.playback.target
+
+        # Check if video is paused
+        if self.check_vlc_pause(status):
+            return None  # If paused, don't skip
+        if position_ms is None or self.playback.seeking:
+            return None
+
+        # Find the range between trigger_time and jump_to_time that contains the current time,
+        # or the one playback will have reached by the time a seek sent now takes effect
+        i = self.segment_index.find(position_ms)
+        if i < 0:
+            i = self.segment_index.find(position_ms + self.trigger_lead_ms())
+        if i >= 0:
+            print(f"Segment activated: {', '.join(self.segment_index.names(i))}")
+            self.active_range = i
+            self.trigger_overshoot = (position_ms - self.segment_index.start(i)) / 1000
+            return self.segment_index.end(i) / 1000
+        return None
+
+    def mark_seeking(self, seconds):
+        """Records that a seek to the given time was issued"""
+        origin = seconds if self.last_position_ms is None else self.last_position_ms / 1000
+        self.playback.seek_issued(seconds, origin)
+        # The player lands somewhere near the target; interpolate afresh from there
+        self.position.reset()
+
+    def settle_seek(self, outcome):
+        """Reports how a pending seek was resolved; returns the outcome"""
+        playback = self.playback
+        if outcome == CONFIRMED:
+            SEEK_COMPLETION.observe(time.monotonic() - playback.first_issued_at)
+            print(f"Seek to {playback.target:g}s complete. Resuming monitoring.")
+        elif outcome == RETRY:
+            SEEK_RETRIES.inc()
+            print(f"Seek to {playback.target:g}s not confirmed, retrying ({playback.attempts}/{playback.seek_retries})")
+        elif outcome == FAILED:
+            SEEK_FAILURES.inc()
+            print(f"Seek to {playback.target:g}s failed after {playback.attempts} attempts. Resuming monitoring.")
+        elif outcome == ABANDONED:
+            SEEK_ABANDONED.inc()
+            print(f"Playback moved away from the seek to {playback.target:g}s. Resuming monitoring.")
+        return outcome
+
+    def note_round_trip(self, seconds):
+        """Folds the duration of one status round trip into the rolling RTT estimate"""
+        self.status_rtt.update(seconds)
+
+    def trigger_lead_ms(self):
+        """Returns how many milliseconds of playback before trigger_time a skip may fire
+
+        A status reply describes the player half a round trip ago, and a seek
+        sent now takes seek_latency to apply; firing that much playback early
+        lands the jump on trigger_time. The lead never exceeds the guard.
+        """
+        if self.early_trigger_guard <= 0:
+            return 0
+        delay = self.status_rtt.get() / 2 + self.seek_latency.get()
+        return int(min(delay * self.scheduler.rate, self.early_trigger_guard) * 1000)
+
+    def record_skip(self, issue_seconds):
+        """Records overshoot and trigger-to-seek latency for the range that was just skipped"""
+        self.seek_latency.update(issue_seconds)
+        if self.active_range < 0:
+            return
+        labels = {"segment": ", ".join(self.segment_index.names(self.active_range))}
+        overshoot = self.trigger_overshoot
+        rate = self.scheduler.rate
+        registry.histogram("skip_overshoot_seconds", "Playback seconds past trigger_time when the skip was detected", labels, buckets=OVERSHOOT_BUCKETS).observe(overshoot)
+        # Playback seconds past the trigger become wall time at the current rate
+        latency = overshoot / rate + issue_seconds
+        registry.histogram("trigger_to_seek_seconds", "Wall time from trigger_time until the seek was sent", labels).observe(latency)
+        # Where playback really was when the seek took effect: the stale half of the status
+        # round trip plus the time the seek itself took
+        effective = overshoot + (self.status_rtt.get() / 2 + issue_seconds) * rate
+        registry.histogram("skip_effective_overshoot_seconds", "Estimated playback seconds past trigger_time when the seek took effect", labels, buckets=OVERSHOOT_BUCKETS).observe(effective)
+        self.active_range = -1
+
+    def count_poll(self):
+        """Counts one poll and refreshes the polls-per-second gauge once per window"""
+        POLLS.inc()
+        self.poll_window_count += 1
+        now = time.monotonic()
+        elapsed = now - self.poll_window_start
+        if elapsed >= POLL_RATE_WINDOW:
+            POLL_RATE.set(self.poll_window_count / elapsed)
+            self.poll_window_start = now
+            self.poll_window_count = 0
+
+    def handle_event(self, event):
+        """Reacts to an event pushed by VLC; returns True if segments should be checked right away"""
+        if event.kind in ("time", "seek") and self.playback.seeking:
+            # A pushed position confirms (or contradicts) the pending seek without a round trip
+            outcome = self.playback.observe(event.value, rate=self.scheduler.rate)
+            if outcome == RETRY:
+                # Let the next poll re-send it
+                return True
+            self.settle_seek(outcome)
+
+        if event.kind == "time":
+            # VLC announces each whole second as it is reached, which pins the position exactly
+            self.position.observe_boundary(event.value)
+            # Position updates only need a round trip when they fall inside a skip range
+            if self.playback.seeking:
+                return False
+            position_ms = event.value * 1000
+            return self.segment_index.find(position_ms) >= 0 or self.segment_index.find(position_ms + self.trigger_lead_ms()) >= 0
+
+        if event.kind == "rate":
+            self.scheduler.set_rate(event.value)
+            return False
+
+        if event.kind == "new_input":
+            print(f"New input: {event.value}")
+            self.playback.reset()
+
+        self.position.reset()
+        # Pause, play, stop, seek and new input all change where playback will be next
+        self.scheduler.note_event()
+        return True
+
+    def next_poll_delay(self):
+        """Returns how long to wait before the next check, based on the distance to the next trigger"""
+        status = self.last_status
+        if status is None or self.playback.seeking:
+            return self.scheduler.min_interval
+
+        position_ms = self.last_position_ms
+        if position_ms is None:
+            return self.scheduler.next_delay(None, None)
+        next_trigger = self.segment_index.next_start(position_ms)
+        if next_trigger is not None:
+            next_trigger = (next_trigger - self.trigger_lead_ms()) / 1000
+        return self.scheduler.next_delay(position_ms / 1000, next_trigger)
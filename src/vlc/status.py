@@ -0,0 +1,84 @@
+from typing import NamedTuple, Optional
+
+# Commands written in one batch to build a status snapshot; order matters for parsing
+STATUS_COMMANDS = ("get_time", "is_playing", "get_length", "status")
+
+
+class PlayerStatus(NamedTuple):
+    """Playback state gathered in a single round trip"""
+    time: Optional[int]
+    playing: bool
+    length: Optional[int]
+    state: Optional[str]
+    input: Optional[str]
+    rate: Optional[float] = None
+    position: Optional[float] = None
+
+    @property
+    def paused(self):
+        """True when the player is not advancing (paused, stopped or idle)"""
+        if self.state is not None:
+            return self.state != "playing"
+        return not self.playing
+
+
+def parse_int(response):
+    """Returns the response as an integer, or None if it is not one"""
+    if response is None:
+        return None
+    response = response.strip()
+    return int(response) if response.isdigit() else None
+
+
+def parse_status_lines(response):
+    """Extracts the current input and play state from RC 'status' output"""
+    current_input = None
+    state = None
+    for line in (response or "").splitlines():
+        line = line.strip().strip("()").strip()
+        if line.startswith("new input:"):
+            current_input = line[len("new input:"):].strip()
+        elif line.startswith("state "):
+            state = line[len("state "):].strip()
+    return current_input, state
+
+
+def parse_status_snapshot(responses):
+    """Builds a PlayerStatus from the replies to STATUS_COMMANDS"""
+    if responses is None or len(responses) != len(STATUS_COMMANDS):
+        return None
+
+    time_response, playing_response, length_response, status_response = responses
+    current_input, state = parse_status_lines(status_response)
+
+    return PlayerStatus(
+        time=parse_int(time_response),
+        playing=playing_response.strip() == "1",
+        length=parse_int(length_response),
+        state=state,
+        input=current_input
+    )
+
+
+def parse_http_status(data):
+    """Builds a PlayerStatus from VLC's /requests/status.json document"""
+    if not isinstance(data, dict):
+        return None
+
+    state = data.get("state")
+    information = data.get("information")
+    meta = {}
+    if isinstance(information, dict):
+        meta = information.get("category", {}).get("meta", {})
+    length = data.get("length")
+    position = data.get("position")
+
+    return PlayerStatus(
+        time=int(data["time"]) if isinstance(data.get("time"), (int, float)) else None,
+        playing=state == "playing",
+        length=int(length) if isinstance(length, (int, float)) and length > 0 else None,
+        state=state,
+        input=meta.get("filename"),
+        rate=float(data["rate"]) if isinstance(data.get("rate"), (int, float)) else None,
+        position=float(position) if isinstance(position, (int, float)) else None
+    )
@@ -0,0 +1,103 @@
+import math
+import time
+from src.vlc.playlist import parse_rc_playlist
+from src.vlc.rc_session import RCSession
+from src.vlc.status import STATUS_COMMANDS, parse_status_snapshot
+
+
+class PlayerTransport:
+    """Interface between the skip controller and a player control protocol"""
+
+    name = "base"
+
+    def connect(self):
+        """Opens the connection if needed; returns True when the player is reachable"""
+        raise NotImplementedError
+
+    def close(self):
+        """Releases the connection"""
+        raise NotImplementedError
+
+    def get_status(self):
+        """Returns a PlayerStatus snapshot, or None if the player did not answer"""
+        raise NotImplementedError
+
+    def seek(self, seconds):
+        """Seeks to the given playback time; returns True if the player accepted it"""
+        raise NotImplementedError
+
+    def command(self, command):
+        """Sends an RC-style command line; returns the response text or None"""
+        raise NotImplementedError
+
+    def get_playlist(self):
+        """Returns the playlist as PlaylistItems, or an empty list if it is unavailable"""
+        return []
+
+    def wait_for_events(self, timeout):
+        """Waits for pushed playback events; transports without a push channel just sleep"""
+        time.sleep(timeout)
+        return []
+
+    def describe(self):
+        """Returns the endpoint for log messages"""
+        return self.name
+
+
+class RCTransport(PlayerTransport):
+    """Player transport over the telnet-style RC interface"""
+
+    name = "rc"
+
+    def __init__(self, session):
+        self.session = session
+
+    @property
+    def connections_opened(self):
+        return self.session.connections_opened
+
+    def connect(self):
+        return self.session.connect()
+
+    def close(self):
+        self.session.close()
+
+    def get_status(self):
+        return parse_status_snapshot(self.session.commands(STATUS_COMMANDS))
+
+    def seek(self, seconds):
+        # RC only takes whole seconds; round up so the player never lands back inside the range
+        return self.session.command(f"seek {math.ceil(seconds)}") is not None
+
+    def command(self, command):
+        return self.session.command(command)
+
+    def get_playlist(self):
+        return parse_rc_playlist(self.session.command("playlist"))
+
+    def wait_for_events(self, timeout):
+        return self.session.wait_for_events(timeout)
+
+    def describe(self):
+        return f"RC {self.session.host}:{self.session.port}"
+
+
+def create_transport(config_data, rc_session=None):
+    """Builds the transport selected by the 'backend' setting"""
+    backend = config_data.get('backend', 'rc')
+
+    if backend == 'http':
+        from src.vlc.http_transport import HTTPTransport
+        return HTTPTransport(
+            config_data['http_host'],
+            config_data['http_port'],
+            config_data.get('http_password', ''),
+            pool_size=config_data.get('http_pool_size', 2)
+        )
+
+    if backend != 'rc':
+        raise ValueError(f"Unknown player backend: {backend}")
+
+    if rc_session is None:
+        rc_session = RCSession(config_data['rc_host'], config_data['rc_port'], config_data.get('rc_password', ''))
+    return RCTransport(rc_session)
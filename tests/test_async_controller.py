@@ -0,0 +1,99 @@
+import asyncio
+import json
+import os
+import pathlib
+import tempfile
+import threading
+import time
+import unittest
+from benchmarks.fake_vlc import FakePlayer, FakeRCServer, serve_in_background
+from src.utils.plan_cache import PlanCache
+from src.vlc.async_controller import AsyncVLCSkipController
+
+CONFIG = {
+    "check_interval": 0.05,
+    "timeout_seconds": 2,
+    "rc_timeout": 1.0,
+    "poll_min_interval": 0.02,
+    "poll_max_interval": 0.1,
+    "watch_interval": 0.05,
+}
+
+
+def document(trigger, jump):
+    return {
+        "version": "1.0",
+        "video_info": {"filename": "movie.mp4", "duration": "01:00:00"},
+        "time_segments": [{"id": 1, "name": "Intro", "trigger_time": trigger, "jump_to_time": jump, "enabled": True}],
+        "settings": {"loop_segments": False, "show_notifications": True},
+    }
+
+
+def wait_until(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.01)
+    return False
+
+
+class AsyncControllerTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.videos = {}
+        for name, segment in (("movie", ("00:00:05", "00:00:20")), ("other", ("00:00:30", "00:00:40"))):
+            video_path = os.path.join(self.directory.name, name + ".mp4")
+            open(video_path, 'wb').close()
+            self.write(name, document(*segment))
+            self.videos[name] = video_path
+        self.player = FakePlayer(input_name=pathlib.Path(self.videos["movie"]).as_uri())
+        self.player.set_position(100)
+        self.server = serve_in_background(FakeRCServer(self.player))
+        self.plans = PlanCache()
+        plan = self.plans.load(os.path.join(self.directory.name, "movie.json"))
+        self.controller = AsyncVLCSkipController("test", *self.server.server_address, plan, CONFIG,
+                                                 plan_cache=self.plans, video_path=self.videos["movie"])
+        self.loop = asyncio.new_event_loop()
+        self.thread = threading.Thread(target=self.loop.run_until_complete, args=(self.controller.run(),))
+        self.thread.start()
+        self.assertTrue(wait_until(lambda: self.controller.current_input is not None))
+
+    def tearDown(self):
+        self.loop.call_soon_threadsafe(self.controller.stop)
+        self.thread.join(5)
+        self.loop.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def write(self, name, data):
+        json_path = os.path.join(self.directory.name, name + ".json")
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        # A new mtime even on file systems with coarse timestamps
+        os.utime(json_path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+
+    def seek_targets(self):
+        return [target for _, _, target in self.player.seeks]
+
+    def test_skips_with_the_first_plan(self):
+        self.player.set_position(6)
+        self.assertTrue(wait_until(lambda: self.seek_targets() == [20.0]))
+
+    def test_switches_plan_on_new_input(self):
+        self.player.set_input(pathlib.Path(self.videos["other"]).as_uri())
+        self.assertTrue(wait_until(lambda: self.controller.json_file_path.endswith("other.json")))
+        self.player.set_position(31)
+        self.assertTrue(wait_until(lambda: self.seek_targets() == [40.0]))
+        self.assertEqual(self.controller.video_path, self.videos["other"])
+
+    def test_reloads_edited_sidecar(self):
+        self.write("movie", document("00:00:50", "00:01:00"))
+        self.assertTrue(wait_until(lambda: self.controller.segment_index.start(0) == 50000))
+        self.player.set_position(51)
+        self.assertTrue(wait_until(lambda: self.seek_targets() == [60.0]))
+
+
+if __name__ == '__main__':
+    unittest.main()
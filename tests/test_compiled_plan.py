@@ -0,0 +1,169 @@
+import json
+import os
+import tempfile
+import unittest
+from src.utils.compiled_plan import HEADER, compiled_path, content_digest, read_compiled, refresh_compiled, write_compiled
+from src.utils.json_validator import ValidationError, VideoConfigValidator
+from src.utils.segment_index import SegmentIndex
+from src.utils.segment_plan import load_plan
+
+SEGMENTS = [
+    (1, "Intro", 0, 90000),
+    (2, "Recap ✓", 60000, 120000),
+    (7, "", 300000, 310500),
+]
+META = {"video_info": {"filename": "movie.mp4", "duration": "01:00:00"}, "settings": {"loop_segments": False}, "warnings": ["w"]}
+
+DOCUMENT = {
+    "version": "1.0",
+    "video_info": {"filename": "movie.mp4", "duration": "01:00:00"},
+    "time_segments": [
+        {"id": 1, "name": "Intro", "trigger_time": "00:00:00", "jump_to_time": "00:01:30", "enabled": True},
+        {"id": 2, "name": "Credits", "trigger_time": "00:58:00", "jump_to_time": "01:00:00", "enabled": True},
+    ],
+    "settings": {"loop_segments": False, "show_notifications": True},
+}
+
+
+RULES = "tests.Validator:1"
+
+
+class CompiledPlanTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.directory.name, "movie.json")
+        self.index = SegmentIndex.from_ranges((start, end, name) for _, name, start, end in SEGMENTS)
+        self.digest = content_digest(b"{}")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, size=2, mtime_ns=1000, digest=None):
+        write_compiled(self.json_path, size, mtime_ns, digest or self.digest, RULES, SEGMENTS, self.index, META)
+
+    def read(self, size=2, mtime_ns=1000, digest=None, rules=RULES):
+        return read_compiled(self.json_path, size, mtime_ns, digest or self.digest, rules)
+
+    def test_round_trip(self):
+        self.write()
+        compiled = self.read()
+        self.assertIsNotNone(compiled)
+        self.assertEqual(list(compiled.ids), [1, 2, 7])
+        self.assertEqual(list(compiled.starts), [0, 60000, 300000])
+        self.assertEqual(list(compiled.ends), [90000, 120000, 310500])
+        self.assertEqual(list(compiled.names), ["Intro", "Recap ✓", ""])
+        self.assertEqual(compiled.names[-1], "")
+        self.assertEqual(compiled.meta, META)
+        self.assertTrue(compiled.mtime_matches)
+        self.assertEqual(len(compiled.index), len(self.index))
+        for i in range(len(self.index)):
+            self.assertEqual(compiled.index.start(i), self.index.start(i))
+            self.assertEqual(compiled.index.end(i), self.index.end(i))
+            self.assertEqual(tuple(compiled.index.names(i)), tuple(self.index.names(i)))
+
+    def test_empty_plan(self):
+        empty = SegmentIndex.from_ranges(())
+        write_compiled(self.json_path, 2, 1000, self.digest, RULES, [], empty, {})
+        compiled = self.read()
+        self.assertEqual(len(compiled.ids), 0)
+        self.assertEqual(len(compiled.names), 0)
+        self.assertEqual(len(compiled.index), 0)
+
+    def test_stale_source(self):
+        self.write()
+        self.assertIsNone(self.read(size=3))
+        self.assertIsNone(self.read(digest=content_digest(b"[]")))
+        self.assertIsNone(self.read(rules="tests.Validator:2"))
+
+    def test_new_mtime_and_refresh(self):
+        self.write()
+        compiled = self.read(mtime_ns=2000)
+        self.assertIsNotNone(compiled)
+        self.assertFalse(compiled.mtime_matches)
+        del compiled
+        refresh_compiled(self.json_path, self.digest, RULES, 2000)
+        self.assertTrue(self.read(mtime_ns=2000).mtime_matches)
+
+    def test_new_content_gets_new_file(self):
+        self.write()
+        old_path = compiled_path(self.json_path, self.digest, RULES)
+        mapped = self.read()
+        new_digest = content_digest(b"[]")
+        self.write(digest=new_digest)
+        new_path = compiled_path(self.json_path, new_digest, RULES)
+        self.assertNotEqual(new_path, old_path)
+        self.assertEqual(list(mapped.ids), [1, 2, 7])
+        self.assertIsNotNone(self.read(digest=new_digest))
+        self.assertEqual(os.listdir(self.directory.name), [os.path.basename(new_path)])
+
+    def test_other_sidecars_are_kept(self):
+        other = os.path.join(self.directory.name, "movie.json.backup.json")
+        write_compiled(other, 2, 1000, self.digest, RULES, SEGMENTS, self.index, META)
+        self.write()
+        self.write(digest=content_digest(b"[]"))
+        self.assertIsNotNone(read_compiled(other, 2, 1000, self.digest, RULES))
+
+    def test_damaged_file(self):
+        self.write()
+        path = compiled_path(self.json_path, self.digest, RULES)
+        with open(path, 'rb') as f:
+            data = f.read()
+        for damaged in (data[:HEADER.size - 1], data[:-1], b"XXXX" + data[4:]):
+            with open(path, 'wb') as f:
+                f.write(damaged)
+            self.assertIsNone(self.read())
+
+    def test_missing_file(self):
+        self.assertIsNone(self.read())
+
+
+class StrictValidator(VideoConfigValidator):
+    """Reports one extra warning for every document"""
+
+    def check_business_rules(self, data, errors, warnings=None):
+        super().check_business_rules(data, errors, warnings)
+        if warnings is not None:
+            warnings.append(ValidationError("", "strict"))
+
+
+class LoadPlanCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.directory.name, "movie.json")
+        with open(self.json_path, 'w', encoding='utf-8') as f:
+            json.dump(DOCUMENT, f)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_cached_plan_matches_parsed_plan(self):
+        parsed, result = load_plan(self.json_path)
+        self.assertTrue(result["valid"])
+        self.assertEqual(len([name for name in os.listdir(self.directory.name) if name.endswith(".segc")]), 1)
+        cached, cached_result = load_plan(self.json_path)
+        self.assertEqual(cached_result, result)
+        self.assertEqual(list(cached.segments), list(parsed.segments))
+        self.assertEqual(cached.video_info, parsed.video_info)
+        self.assertEqual(cached.settings, parsed.settings)
+
+    def test_edit_keeping_size_and_mtime(self):
+        load_plan(self.json_path)
+        st = os.stat(self.json_path)
+        with open(self.json_path, 'r+', encoding='utf-8') as f:
+            edited = f.read().replace("Intro", "Outro")
+            f.seek(0)
+            f.write(edited)
+        os.utime(self.json_path, ns=(st.st_atime_ns, st.st_mtime_ns))
+        plan, _ = load_plan(self.json_path)
+        self.assertEqual(plan.segments[0].name, "Outro")
+
+    def test_other_validator_rebuilds_cache(self):
+        load_plan(self.json_path)
+        _, result = load_plan(self.json_path, StrictValidator())
+        self.assertEqual(result["warnings"], ["strict"])
+        _, result = load_plan(self.json_path)
+        self.assertEqual(result["warnings"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import json
+import os
+import tempfile
+import time
+import unittest
+from src.utils.file_watcher import SegmentFileReloader, StatWatcher
+from tests.test_media_probe import box, mvhd
+
+
+def document(jump_to_time):
+    return {
+        "version": "1.0",
+        "video_info": {"filename": "movie.mp4", "duration": "00:01:00"},
+        "time_segments": [{"id": 1, "name": "Intro", "trigger_time": "00:00:10", "jump_to_time": jump_to_time, "enabled": True}],
+        "settings": {"loop_segments": False, "show_notifications": True},
+    }
+
+
+class SegmentFileReloaderTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.json_path = os.path.join(self.directory.name, "movie.json")
+        self.video_path = os.path.join(self.directory.name, "movie.mp4")
+        with open(self.video_path, 'wb') as f:
+            f.write(box(b"ftyp", b"isom") + box(b"moov", mvhd(1000, 60000)))
+        self.write(document("00:00:20"))
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, data):
+        with open(self.json_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        # A new mtime even on file systems with coarse timestamps
+        os.utime(self.json_path, ns=(time.time_ns(), time.time_ns() + 10 ** 9))
+
+    def test_valid_edit_is_taken_once(self):
+        reloader = SegmentFileReloader(self.json_path, video_path=self.video_path)
+        self.assertFalse(reloader.reload())
+        self.write(document("00:00:30"))
+        self.assertTrue(reloader.reload())
+        plan = reloader.take()
+        self.assertEqual(plan.segments[0].end_ms, 30000)
+        self.assertIsNone(reloader.take())
+
+    def test_invalid_edit_is_rejected(self):
+        reloader = SegmentFileReloader(self.json_path, video_path=self.video_path)
+        self.write({"version": "1.0"})
+        self.assertFalse(reloader.reload())
+        self.assertIsNone(reloader.take())
+
+    def test_reload_checks_the_video_duration(self):
+        reloader = SegmentFileReloader(self.json_path, video_path=self.video_path)
+        self.write(document("00:01:30"))
+        self.assertTrue(reloader.reload())
+        warnings = reloader.take().warnings
+        self.assertTrue(any("end of the video file" in warning for warning in warnings), warnings)
+
+
+class StatWatcherTest(unittest.TestCase):
+    def test_detects_change(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "movie.json")
+            open(path, 'w').close()
+            watcher = StatWatcher(path)
+            self.assertFalse(watcher.wait(0))
+            with open(path, 'w') as f:
+                f.write("{}")
+            self.assertTrue(watcher.wait(0))
+            self.assertFalse(watcher.wait(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
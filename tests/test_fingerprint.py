@@ -0,0 +1,87 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+from src.utils import fingerprint
+from src.utils.fingerprint import CHUNK_SIZE, FingerprintIndex, fingerprint_file
+
+
+class FingerprintIndexTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.index_path = os.path.join(self.directory.name, "data", "fingerprints.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def video(self, name, content):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'wb') as f:
+            f.write(content)
+        json_path = os.path.splitext(path)[0] + ".json"
+        open(json_path, 'w').close()
+        return path, json_path
+
+    def test_large_file_is_sampled(self):
+        path, _ = self.video("big.mp4", bytes(CHUNK_SIZE * 10))
+        before = fingerprint_file(path)
+        with open(path, 'r+b') as f:
+            f.seek(CHUNK_SIZE)
+            f.write(b"x")
+        # The second chunk is not among the sampled ones
+        self.assertEqual(fingerprint_file(path), before)
+        with open(path, 'r+b') as f:
+            f.seek(0)
+            f.write(b"x")
+        self.assertNotEqual(fingerprint_file(path), before)
+
+    def test_moved_video_finds_its_json_file(self):
+        video_path, json_path = self.video("movie.mp4", b"movie")
+        index = FingerprintIndex(self.index_path)
+        index.register(video_path, json_path)
+        index.flush()
+        moved = os.path.join(self.directory.name, "renamed.mkv")
+        shutil.copy(video_path, moved)
+        self.assertEqual(index.find(moved), json_path)
+        self.assertEqual(FingerprintIndex(self.index_path).find(moved), json_path)
+
+    def test_register_does_not_read_on_the_caller(self):
+        video_path, json_path = self.video("movie.mp4", b"movie")
+        index = FingerprintIndex(self.index_path)
+        with mock.patch.object(index, "record") as record:
+            record.side_effect = lambda *args: self.assertFalse(os.path.exists(self.index_path))
+            index.register(video_path, json_path)
+            index.flush()
+        record.assert_called_once_with(video_path, os.path.abspath(json_path))
+
+    def test_load_drops_missing_json_files(self):
+        video_path, json_path = self.video("movie.mp4", b"movie")
+        other_path, other_json = self.video("other.mp4", b"other")
+        index = FingerprintIndex(self.index_path)
+        index.register(video_path, json_path)
+        index.register(other_path, other_json)
+        index.flush()
+        os.remove(other_json)
+        reloaded = FingerprintIndex(self.index_path)
+        self.assertEqual(list(reloaded.plans.values()), [json_path])
+        with open(self.index_path, encoding='utf-8') as f:
+            self.assertEqual(len(json.load(f)["fingerprints"]), 2)
+        self.assertEqual(len(reloaded.fingerprints), 1)
+
+    def test_entries_are_capped(self):
+        index = FingerprintIndex()
+        with mock.patch.object(fingerprint, "MAX_FINGERPRINTS", 2):
+            paths = [self.video(f"v{i}.mp4", bytes([i])) for i in range(3)]
+            for video_path, json_path in paths:
+                index.register(video_path, json_path)
+            index.flush()
+        self.assertEqual(len(index.plans), 2)
+        self.assertEqual(len(index.fingerprints), 2)
+        self.assertIsNone(index.find(paths[0][0]))
+        self.assertEqual(index.find(paths[2][0]), paths[2][1])
+
+
+if __name__ == '__main__':
+    unittest.main()
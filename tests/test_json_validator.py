@@ -0,0 +1,54 @@
+import unittest
+from src.utils.json_validator import VideoConfigValidator
+
+DOCUMENT = {
+    "version": "1.0",
+    "video_info": {"filename": "movie.avi", "duration": "00:10:00"},
+    "time_segments": [
+        {"id": 1, "name": "Intro", "trigger_time": "00:00:01", "jump_to_time": "0:0", "enabled": True},
+        {"id": 1, "name": "Recap", "trigger_time": "00:00:10", "jump_to_time": "00:00:20", "enabled": True},
+    ],
+    "settings": {"loop_segments": False, "show_notifications": True},
+}
+
+
+class BusinessRulesTest(unittest.TestCase):
+    def setUp(self):
+        self.validator = VideoConfigValidator()
+
+    def test_empty_document(self):
+        self.assertEqual(self.validator.validate_business_rules({}), [])
+
+    def test_incomplete_document(self):
+        data = {"video_info": {"duration": "10 minutes"}, "time_segments": [{"id": 2, "trigger_time": "1:2"}]}
+        self.assertEqual(self.validator.validate_business_rules(data), [])
+
+    def test_matches_full_validation(self):
+        self.assertEqual(self.validator.validate_business_rules(DOCUMENT), self.validator.validate_data(DOCUMENT))
+
+
+
+class FailFastTest(unittest.TestCase):
+    def setUp(self):
+        self.validator = VideoConfigValidator()
+
+    def test_valid_document(self):
+        document = {**DOCUMENT, "video_info": {"filename": "movie.mp4", "duration": "00:10:00"}}
+        document["time_segments"] = [{**DOCUMENT["time_segments"][0], "jump_to_time": "00:00:05"}]
+        self.assertTrue(self.validator.is_valid(document))
+        self.assertEqual(self.validator.validate(document, fail_fast=True), [])
+
+    def test_stops_at_first_error(self):
+        self.assertGreater(len(self.validator.validate(DOCUMENT)), 1)
+        errors = self.validator.validate(DOCUMENT, fail_fast=True)
+        self.assertEqual(errors, self.validator.validate(DOCUMENT)[:1])
+        self.assertFalse(self.validator.is_valid(DOCUMENT))
+
+    def test_structure_error(self):
+        errors = self.validator.validate({"version": "1.0"}, fail_fast=True)
+        self.assertEqual([error.pointer for error in errors], ["/video_info"])
+        self.assertFalse(self.validator.is_valid([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
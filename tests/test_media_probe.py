@@ -0,0 +1,114 @@
+import os
+import struct
+import tempfile
+import unittest
+from src.utils.media_probe import probe_duration_ms
+
+
+def box(box_type, payload=b""):
+    return struct.pack(">I4s", 8 + len(payload), box_type) + payload
+
+
+def mvhd(timescale, duration, version=0):
+    if version == 1:
+        return box(b"mvhd", struct.pack(">B3xQQIQ", 1, 0, 0, timescale, duration) + bytes(80))
+    return box(b"mvhd", struct.pack(">B3xIIII", 0, 0, 0, timescale, duration) + bytes(80))
+
+
+def element(element_id, payload=b"", unknown_size=False):
+    size = b"\x01\xff\xff\xff\xff\xff\xff\xff" if unknown_size else b"\x01" + len(payload).to_bytes(7, 'big')
+    return element_id.to_bytes((element_id.bit_length() + 7) // 8, 'big') + size + payload
+
+
+def ebml_header():
+    return element(0x1A45DFA3, element(0x4282, b"matroska"))
+
+
+def info(duration, timecode_scale=None, single=False):
+    children = b""
+    if timecode_scale is not None:
+        children += element(0x2AD7B1, timecode_scale.to_bytes(4, 'big'))
+    children += element(0x4489, struct.pack(">f" if single else ">d", duration))
+    return element(0x1549A966, children)
+
+
+class ProbeTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def probe(self, data):
+        path = os.path.join(self.directory.name, "video")
+        with open(path, 'wb') as f:
+            f.write(data)
+        return probe_duration_ms(path)
+
+
+class MP4Test(ProbeTest):
+    def test_mvhd_version_0(self):
+        self.assertEqual(self.probe(box(b"ftyp", b"isom") + box(b"moov", mvhd(1000, 5025000))), 5025000)
+
+    def test_mvhd_version_1(self):
+        self.assertEqual(self.probe(box(b"ftyp", b"isom") + box(b"moov", mvhd(90000, 90000 * 3600, version=1))), 3600000)
+
+    def test_moov_after_media_data(self):
+        data = box(b"ftyp", b"isom") + box(b"mdat", bytes(100000)) + box(b"moov", mvhd(600, 600 * 42))
+        self.assertEqual(self.probe(data), 42000)
+
+    def test_fragmented_duration_from_mehd(self):
+        mvex = box(b"mvex", box(b"mehd", struct.pack(">B3xI", 0, 1000 * 75)))
+        data = box(b"ftyp", b"iso6") + box(b"moov", mvhd(1000, 0) + mvex)
+        self.assertEqual(self.probe(data), 75000)
+
+    def test_no_duration(self):
+        self.assertIsNone(self.probe(box(b"ftyp", b"isom") + box(b"moov", mvhd(1000, 0))))
+        self.assertIsNone(self.probe(box(b"ftyp", b"isom") + box(b"mdat", b"x")))
+
+    def test_truncated(self):
+        data = box(b"ftyp", b"isom") + box(b"moov", mvhd(1000, 5000))
+        self.assertIsNone(self.probe(data[:-90]))
+
+
+class MatroskaTest(ProbeTest):
+    def test_info_in_segment(self):
+        data = ebml_header() + element(0x18538067, info(5025.5, 1000000))
+        self.assertEqual(self.probe(data), 5025)
+
+    def test_timecode_scale_and_single_precision(self):
+        data = ebml_header() + element(0x18538067, info(120.0, 1000000000, single=True))
+        self.assertEqual(self.probe(data), 120000)
+
+    def test_unknown_segment_size(self):
+        data = ebml_header() + element(0x18538067, info(2000.0), unknown_size=True)
+        self.assertEqual(self.probe(data), 2000)
+
+    def test_info_found_through_seek_head(self):
+        cluster = element(0x1F43B675, bytes(1000))
+        seek_head_size = len(element(0x114D9B74, element(0x4DBB, element(0x53AB, b"\x15\x49\xa9\x66") + element(0x53AC, bytes(8)))))
+        position = seek_head_size + len(cluster)
+        seek_head = element(0x114D9B74, element(0x4DBB, element(0x53AB, b"\x15\x49\xa9\x66") + element(0x53AC, position.to_bytes(8, 'big'))))
+        data = ebml_header() + element(0x18538067, seek_head + cluster + info(4200.0))
+        self.assertEqual(self.probe(data), 4200)
+
+    def test_no_duration(self):
+        data = ebml_header() + element(0x18538067, element(0x1549A966, element(0x2AD7B1, b"\x0f\x42\x40")))
+        self.assertIsNone(self.probe(data))
+
+    def test_truncated(self):
+        data = ebml_header() + element(0x18538067, info(5000.0))
+        self.assertIsNone(self.probe(data[:-4]))
+
+
+class OtherFormatTest(ProbeTest):
+    def test_unknown_format(self):
+        self.assertIsNone(self.probe(b"RIFF\x00\x00\x00\x00AVI LIST"))
+        self.assertIsNone(self.probe(b""))
+
+    def test_missing_file(self):
+        self.assertIsNone(probe_duration_ms(os.path.join(self.directory.name, "missing.mp4")))
+
+
+if __name__ == '__main__':
+    unittest.main()
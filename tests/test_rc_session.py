@@ -0,0 +1,151 @@
+import socket
+import threading
+import unittest
+from benchmarks.fake_vlc import FakePlayer, FakeRCServer, serve_in_background
+from src.vlc.rc_session import RCProtocol, RCSession
+
+
+def paired_session():
+    """Returns an RCSession already connected to the other end of a socket pair"""
+    session = RCSession("localhost", 0, timeout=1.0)
+    session.sock, player_end = socket.socketpair()
+    session.sock.settimeout(1.0)
+    return session, player_end
+
+
+def protocol(data):
+    """Returns an RCProtocol whose buffer holds the given bytes"""
+    framing = RCProtocol()
+    framing.buffer = data
+    return framing
+
+
+class FramingTest(unittest.TestCase):
+    def test_prompt_only_counts_at_the_start_of_a_line(self):
+        framing = protocol(b"a > b\r\n> rest")
+        self.assertEqual(framing._find_marker((RCProtocol.PROMPT,)), len(b"a > b\r\n> "))
+
+    def test_prompt_at_the_start_of_the_buffer(self):
+        self.assertEqual(protocol(b"> ")._find_marker((RCProtocol.PROMPT,)), 2)
+
+    def test_no_marker(self):
+        self.assertIsNone(protocol(b"partial reply\r\n>")._find_marker((RCProtocol.PROMPT,)))
+
+    def test_earliest_marker_wins(self):
+        framing = protocol(b"Password: \r\n> ")
+        self.assertEqual(framing._find_marker((RCProtocol.PROMPT, RCProtocol.PASSWORD_PROMPT)),
+                         len(RCProtocol.PASSWORD_PROMPT))
+
+    def test_decode_strips_the_prompt_and_line_endings(self):
+        self.assertEqual(RCProtocol()._decode_response(b"1234\r\n> "), "1234")
+        self.assertEqual(RCProtocol()._decode_response(b"> "), "")
+
+    def test_decode_splits_off_status_changes(self):
+        framing = RCProtocol()
+        text = framing._decode_response(b"status change: ( pause state: 3 ): Pause\r\n0\r\n> ")
+        self.assertEqual(text, "0")
+        self.assertEqual([event.kind for event in framing.take_events()], ["pause"])
+        self.assertEqual(framing.take_events(), [])
+
+    def test_idle_lines_become_events_and_a_stray_prompt_is_dropped(self):
+        framing = protocol(b"status change: ( new input: file:///b.mp4 )\r\n> status chan")
+        framing._collect_idle_lines()
+        self.assertEqual(framing.buffer, b"status chan")
+        self.assertEqual([(event.kind, event.value) for event in framing.take_events()],
+                         [("new_input", "file:///b.mp4")])
+
+
+class SessionTest(unittest.TestCase):
+    def setUp(self):
+        self.session, self.player_end = paired_session()
+
+    def tearDown(self):
+        self.session.close()
+        self.player_end.close()
+
+    def reply(self, *chunks):
+        """Sends the chunks from the player side as separate writes"""
+        def send():
+            for chunk in chunks:
+                self.player_end.sendall(chunk)
+        thread = threading.Thread(target=send)
+        thread.start()
+        return thread
+
+    def test_reply_split_across_reads(self):
+        self.reply(b"12", b"34\r", b"\n", b">", b" ")
+        self.assertEqual(self.session.command("get_time"), "1234")
+        self.assertEqual(self.player_end.recv(100), b"get_time\n")
+
+    def test_pipelined_replies_in_one_read(self):
+        self.reply(b"1\r\n> 0\r\n> ")
+        self.assertEqual(self.session.commands(["is_playing", "get_length"]), ["1", "0"])
+        self.assertEqual(self.player_end.recv(100), b"is_playing\nget_length\n")
+
+    def test_prompt_inside_a_reply_line_does_not_end_it(self):
+        self.reply(b"| 3 - a > b.mp4\r\n> ")
+        self.assertEqual(self.session.command("playlist"), "| 3 - a > b.mp4")
+
+    def test_wait_for_events_reads_pushed_lines(self):
+        self.reply(b"status change: ( play state: 2 ): Play\r\nstatus change: ( time: 5s )\r\n")
+        events = []
+        for _ in range(10):
+            events += self.session.wait_for_events(0.2)
+            if len(events) == 2:
+                break
+        self.assertEqual([event.kind for event in events], ["play", "time"])
+
+    def test_closed_connection_is_dropped(self):
+        self.player_end.close()
+        self.session.next_attempt = float("inf")
+        self.assertIsNone(self.session.command("get_time"))
+        self.assertFalse(self.session.is_connected())
+
+
+class LoginTest(unittest.TestCase):
+    def setUp(self):
+        self.player = FakePlayer()
+        self.servers = []
+
+    def tearDown(self):
+        for server in self.servers:
+            server.shutdown()
+            server.server_close()
+
+    def serve(self, **options):
+        server = serve_in_background(FakeRCServer(self.player, **options))
+        self.servers.append(server)
+        return server.server_address
+
+    def test_greeting_is_consumed(self):
+        session = RCSession(*self.serve())
+        self.assertTrue(session.connect())
+        self.assertEqual(session.command("get_length"), "3600")
+        session.close()
+
+    def test_password(self):
+        session = RCSession(*self.serve(password="secret"), password="secret")
+        self.assertTrue(session.connect())
+        self.assertEqual(session.command("get_length"), "3600")
+        self.assertEqual(session.connections_opened, 1)
+        session.close()
+
+    def test_refused_connection_backs_off(self):
+        with socket.socket() as unused:
+            unused.bind(("127.0.0.1", 0))
+            host, port = unused.getsockname()
+        session = RCSession(host, port, min_backoff=10, max_backoff=15)
+        self.assertFalse(session.connect())
+        self.assertEqual(session.backoff, 10)
+        # Until the backoff expires the session does not dial again
+        self.assertFalse(session.connect())
+        self.assertEqual(session.backoff, 10)
+
+        session.next_attempt = 0.0
+        self.assertFalse(session.connect())
+        self.assertEqual(session.backoff, 15)
+        self.assertEqual(session.connections_opened, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import unittest
+from src.vlc.scheduler import PollScheduler
+
+
+def scheduler(**options):
+    """Returns a scheduler at rate 1 with the fast period after start-up over"""
+    poll = PollScheduler(**options)
+    poll.set_rate(1.0)
+    return poll
+
+
+class DelayTest(unittest.TestCase):
+    def test_far_from_a_trigger_polls_at_max_interval(self):
+        self.assertEqual(scheduler().next_delay(100, 1000, now=10.0), 5.0)
+
+    def test_no_trigger_ahead(self):
+        self.assertEqual(scheduler().next_delay(100, None, now=10.0), 5.0)
+
+    def test_sleeps_until_the_trigger_window(self):
+        self.assertAlmostEqual(scheduler().next_delay(100, 104, now=10.0), 2.0)
+
+    def test_inside_the_trigger_window_polls_at_min_interval(self):
+        poll = scheduler()
+        self.assertEqual(poll.next_delay(100, 101.5, now=10.0), 0.1)
+        self.assertEqual(poll.next_delay(100, 100, now=10.0), 0.1)
+
+    def test_faster_playback_shortens_the_delay(self):
+        poll = scheduler()
+        poll.set_rate(2.0)
+        self.assertAlmostEqual(poll.next_delay(100, 108, now=10.0), 2.0)
+
+    def test_unknown_rate_assumes_the_fastest(self):
+        poll = PollScheduler()
+        self.assertAlmostEqual(poll.next_delay(100, 116, now=10.0), 16 / PollScheduler.MAX_RATE - 2.0)
+
+    def test_unknown_position_polls_at_min_interval(self):
+        self.assertEqual(scheduler().next_delay(None, 1000, now=10.0), 0.1)
+
+    def test_ignores_non_positive_rates(self):
+        poll = scheduler()
+        poll.set_rate(0)
+        self.assertEqual(poll.rate, 1.0)
+
+
+class EventTest(unittest.TestCase):
+    def test_event_forces_fast_polling_for_the_fast_period(self):
+        poll = scheduler(fast_period=3.0)
+        poll.note_event(now=10.0)
+        self.assertEqual(poll.next_delay(100, 1000, now=12.9), 0.1)
+        self.assertEqual(poll.next_delay(100, 1000, now=13.0), 5.0)
+
+    def test_pause_polls_at_paused_interval_after_the_fast_period(self):
+        poll = scheduler(paused_interval=0.5)
+        poll.observe(100, True, now=10.0)
+        self.assertEqual(poll.next_delay(100, 101, now=11.0), 0.1)
+        self.assertEqual(poll.next_delay(100, 101, now=13.5), 0.5)
+
+    def test_resume_is_an_event(self):
+        poll = scheduler()
+        poll.observe(100, True, now=10.0)
+        poll.observe(100, False, now=20.0)
+        self.assertEqual(poll.next_delay(100, 1000, now=21.0), 0.1)
+        self.assertEqual(poll.next_delay(100, 1000, now=23.0), 5.0)
+
+    def test_seek_is_detected_as_a_jump(self):
+        poll = scheduler()
+        poll.observe(100, False, now=10.0)
+        poll.observe(101, False, now=11.0)
+        self.assertEqual(poll.next_delay(101, 1000, now=11.0), 5.0)
+        poll.observe(500, False, now=12.0)
+        self.assertEqual(poll.next_delay(500, 1000, now=12.0), 0.1)
+
+    def test_backward_seek_with_unknown_rate(self):
+        poll = PollScheduler()
+        poll.observe(100, False, now=10.0)
+        poll.observe(400, False, now=10.5)
+        self.assertEqual(poll.fast_until, 13.5)
+        poll.observe(50, False, now=20.0)
+        self.assertEqual(poll.fast_until, 23.0)
+
+
+class RateTest(unittest.TestCase):
+    def test_rate_is_estimated_over_the_window(self):
+        poll = PollScheduler()
+        poll.observe(100, False, now=10.0)
+        poll.observe(102, False, now=11.0)
+        self.assertFalse(poll.rate_measured)
+        poll.observe(110, False, now=15.0)
+        self.assertTrue(poll.rate_measured)
+        self.assertAlmostEqual(poll.rate, 2.0)
+
+    def test_estimate_is_clamped(self):
+        poll = PollScheduler()
+        poll.observe(100, False, now=10.0)
+        poll.observe(100.5, False, now=20.0)
+        self.assertEqual(poll.rate, 0.25)
+
+    def test_reported_rate_is_smoothed_with_observations(self):
+        poll = scheduler()
+        poll.observe(100, False, now=10.0)
+        poll.observe(106.5, False, now=15.0)
+        # Half the reported rate 1.0, half the observed 1.3
+        self.assertAlmostEqual(poll.rate, 1.15)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+from src.vlc.seek_state import (ABANDONED, CONFIRMED, ENDED, FAILED, PAUSED, PLAYING, RETRY, SEEK_CONFIRMED,
+                                SEEK_ISSUED, PlaybackState)
+
+
+class TransitionTest(unittest.TestCase):
+    def test_starts_playing(self):
+        state = PlaybackState()
+        self.assertEqual(state.state, PLAYING)
+        self.assertFalse(state.seeking)
+
+    def test_pause_resume_and_end(self):
+        state = PlaybackState()
+        self.assertIsNone(state.observe(10, "paused", now=1.0))
+        self.assertEqual(state.state, PAUSED)
+        self.assertIsNone(state.observe(10, "playing", now=2.0))
+        self.assertEqual(state.state, PLAYING)
+        self.assertIsNone(state.observe(None, "stopped", now=3.0))
+        self.assertEqual(state.state, ENDED)
+
+    def test_position_without_a_state_means_playing(self):
+        state = PlaybackState()
+        state.observe(10, "paused", now=1.0)
+        state.observe(11, now=2.0)
+        self.assertEqual(state.state, PLAYING)
+
+    def test_reset_drops_the_pending_seek(self):
+        state = PlaybackState()
+        state.seek_issued(120, 60, now=1.0)
+        state.reset()
+        self.assertEqual(state.state, PLAYING)
+        self.assertIsNone(state.target)
+        self.assertIsNone(state.observe(500, now=10.0))
+
+
+class ConfirmTest(unittest.TestCase):
+    def setUp(self):
+        self.state = PlaybackState(seek_timeout=1.5, seek_retries=2, landing_window=1.0)
+        self.state.seek_issued(120, 60, now=10.0)
+
+    def test_issued(self):
+        self.assertEqual(self.state.state, SEEK_ISSUED)
+        self.assertTrue(self.state.seeking)
+        self.assertEqual(self.state.attempts, 1)
+
+    def test_position_at_the_target_confirms(self):
+        self.assertEqual(self.state.observe(120, now=10.1), CONFIRMED)
+        self.assertEqual(self.state.state, SEEK_CONFIRMED)
+        self.assertFalse(self.state.seeking)
+
+    def test_landing_window_grows_with_elapsed_time(self):
+        self.assertEqual(self.state.observe(121, now=10.0), CONFIRMED)
+        state = PlaybackState(landing_window=1.0)
+        state.seek_issued(120, 60, now=10.0)
+        self.assertEqual(state.observe(122.5, rate=2.0, now=10.75), CONFIRMED)
+
+    def test_position_still_at_the_origin_waits(self):
+        self.assertIsNone(self.state.observe(60, now=10.5))
+        self.assertIsNone(self.state.observe(59.5, now=11.0))
+        self.assertEqual(self.state.state, SEEK_ISSUED)
+
+    def test_no_sample_waits(self):
+        self.assertIsNone(self.state.observe(None, now=10.5))
+
+
+class AbandonTest(unittest.TestCase):
+    def setUp(self):
+        self.state = PlaybackState(landing_window=1.0)
+        self.state.seek_issued(120, 60, now=10.0)
+
+    def test_moved_before_the_origin(self):
+        self.assertEqual(self.state.observe(30, now=10.5), ABANDONED)
+        self.assertEqual(self.state.state, PLAYING)
+
+    def test_moved_well_past_the_target(self):
+        self.assertEqual(self.state.observe(300, now=10.5), ABANDONED)
+
+    def test_playback_stopped(self):
+        self.assertEqual(self.state.observe(None, "stopped", now=10.5), ABANDONED)
+        self.assertEqual(self.state.state, ENDED)
+
+
+class RetryTest(unittest.TestCase):
+    def setUp(self):
+        self.state = PlaybackState(seek_timeout=1.5, seek_retries=2)
+        self.state.seek_issued(120, 60, now=10.0)
+
+    def test_retries_after_the_timeout(self):
+        self.assertIsNone(self.state.observe(61, now=11.4))
+        self.assertEqual(self.state.observe(61, now=11.5), RETRY)
+
+    def test_resending_the_same_target_counts_attempts(self):
+        self.state.seek_issued(120, 61, now=11.5)
+        self.assertEqual(self.state.attempts, 2)
+        # The origin and first issue time stay those of the first attempt
+        self.assertEqual(self.state.origin, 60)
+        self.assertEqual(self.state.first_issued_at, 10.0)
+        self.assertIsNone(self.state.observe(61, now=12.0))
+
+    def test_gives_up_after_the_retries(self):
+        self.state.seek_issued(120, 61, now=11.5)
+        self.assertEqual(self.state.observe(61, now=13.0), RETRY)
+        self.state.seek_issued(120, 62, now=13.0)
+        self.assertEqual(self.state.attempts, 3)
+        self.assertEqual(self.state.observe(62, now=14.5), FAILED)
+        self.assertEqual(self.state.state, PLAYING)
+        self.assertIsNone(self.state.observe(63, now=15.0))
+
+    def test_late_confirmation_after_a_retry(self):
+        self.state.seek_issued(120, 61, now=11.5)
+        self.assertEqual(self.state.observe(120, now=11.6), CONFIRMED)
+
+    def test_new_target_starts_over(self):
+        self.state.seek_issued(120, 61, now=11.5)
+        self.state.seek_issued(300, 200, now=12.0)
+        self.assertEqual(self.state.attempts, 1)
+        self.assertEqual(self.state.origin, 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
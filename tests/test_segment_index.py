@@ -0,0 +1,89 @@
+import unittest
+from src.utils.segment_index import SegmentIndex, time_to_ms, time_to_seconds
+
+
+def ranges(index):
+    return [(index.start(i), index.end(i), index.names(i)) for i in range(len(index))]
+
+
+class TimeTest(unittest.TestCase):
+    def test_whole_seconds(self):
+        self.assertEqual(time_to_ms("01:02:03"), 3723000)
+        self.assertEqual(time_to_ms("00:00:00"), 0)
+
+    def test_fractions_are_milliseconds(self):
+        self.assertEqual(time_to_ms("00:00:01.5"), 1500)
+        self.assertEqual(time_to_ms("00:00:01.05"), 1050)
+        self.assertEqual(time_to_ms("00:00:01.2345"), 1234)
+        self.assertEqual(time_to_seconds("00:01:00.250"), 60.25)
+
+
+class MergeTest(unittest.TestCase):
+    def test_sorted_and_disjoint(self):
+        index = SegmentIndex.from_ranges([(50, 60, "b"), (10, 20, "a")])
+        self.assertEqual(ranges(index), [(10, 20, ("a",)), (50, 60, ("b",))])
+
+    def test_overlapping_ranges_merge(self):
+        index = SegmentIndex.from_ranges([(10, 30, "a"), (20, 40, "b")])
+        self.assertEqual(ranges(index), [(10, 40, ("a", "b"))])
+
+    def test_contained_range_keeps_the_outer_end(self):
+        index = SegmentIndex.from_ranges([(10, 50, "a"), (20, 30, "b")])
+        self.assertEqual(ranges(index), [(10, 50, ("a", "b"))])
+
+    def test_jump_landing_on_the_next_trigger_chains(self):
+        index = SegmentIndex.from_ranges([(10, 20, "a"), (20, 30, "b"), (30, 40, "c")])
+        self.assertEqual(ranges(index), [(10, 40, ("a", "b", "c"))])
+
+    def test_gap_of_one_millisecond_does_not_merge(self):
+        index = SegmentIndex.from_ranges([(10, 20, "a"), (21, 30, "b")])
+        self.assertEqual(len(index), 2)
+
+    def test_backward_and_empty_jumps_are_dropped(self):
+        index = SegmentIndex.from_ranges([(30, 10, "back"), (15, 15, "empty"), (40, 50, "ok")])
+        self.assertEqual(ranges(index), [(40, 50, ("ok",))])
+
+    def test_from_segments(self):
+        index = SegmentIndex.from_segments([
+            {"name": "Recap", "trigger_time": "00:01:00", "jump_to_time": "00:02:00.5"},
+            {"name": "Intro", "trigger_time": "00:00:00", "jump_to_time": "00:00:30"},
+        ])
+        self.assertEqual(ranges(index), [(0, 30000, ("Intro",)), (60000, 120500, ("Recap",))])
+
+
+class LookupTest(unittest.TestCase):
+    def setUp(self):
+        self.index = SegmentIndex.from_ranges([(1000, 2000, "a"), (5000, 6000, "b")])
+
+    def test_start_is_inside(self):
+        self.assertEqual(self.index.find(1000), 0)
+        self.assertEqual(self.index.find(5000), 1)
+
+    def test_end_is_outside(self):
+        self.assertEqual(self.index.find(1999), 0)
+        self.assertEqual(self.index.find(2000), -1)
+        self.assertEqual(self.index.find(6000), -1)
+
+    def test_before_between_and_after(self):
+        self.assertEqual(self.index.find(0), -1)
+        self.assertEqual(self.index.find(999), -1)
+        self.assertEqual(self.index.find(3000), -1)
+        self.assertEqual(self.index.find(10 ** 9), -1)
+
+    def test_next_start(self):
+        self.assertEqual(self.index.next_start(0), 1000)
+        self.assertEqual(self.index.next_start(999), 1000)
+        # A trigger at the current position is not ahead of it
+        self.assertEqual(self.index.next_start(1000), 5000)
+        self.assertEqual(self.index.next_start(4999), 5000)
+        self.assertIsNone(self.index.next_start(5000))
+
+    def test_empty_index(self):
+        empty = SegmentIndex.from_ranges(())
+        self.assertEqual(len(empty), 0)
+        self.assertEqual(empty.find(0), -1)
+        self.assertIsNone(empty.next_start(0))
+
+
+if __name__ == '__main__':
+    unittest.main()
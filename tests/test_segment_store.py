@@ -0,0 +1,105 @@
+import json
+import os
+import tempfile
+import unittest
+from src.utils.segment_store import SegmentStore, export_library, import_library
+
+
+def document(filename, trigger="00:00:10", jump="00:00:20"):
+    return {
+        "version": "1.0",
+        "video_info": {"filename": filename, "duration": "00:10:00"},
+        "time_segments": [{"id": 1, "name": "Intro", "trigger_time": trigger, "jump_to_time": jump, "enabled": True}],
+        "settings": {"loop_segments": False, "show_notifications": True},
+    }
+
+
+class SegmentStoreTest(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.root = os.path.join(self.directory.name, "library")
+        self.store = SegmentStore(os.path.join(self.directory.name, "segments.db"))
+
+    def tearDown(self):
+        self.store.close()
+        self.directory.cleanup()
+
+    def add_video(self, relative, data=None):
+        video_path = os.path.join(self.root, relative)
+        os.makedirs(os.path.dirname(video_path), exist_ok=True)
+        open(video_path, 'wb').close()
+        json_path = os.path.splitext(video_path)[0] + ".json"
+        if data is None:
+            data = document(os.path.basename(video_path))
+        with open(json_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        return video_path, json_path
+
+    def age(self, path, seconds=60):
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns - seconds * 10 ** 9))
+
+    def test_import_and_lookup(self):
+        video_path, _ = self.add_video("a.mp4")
+        self.add_video("bad.mp4", {"version": "1.0"})
+        imported, rejected = import_library(self.store, self.root)
+        self.assertEqual(imported, 1)
+        self.assertEqual(list(rejected), [os.path.join(self.root, "bad.mp4")])
+        plan = self.store.lookup(video_path)
+        self.assertEqual([(segment.start_ms, segment.end_ms) for segment in plan.segments], [(10000, 20000)])
+        self.assertIs(self.store.lookup(video_path), plan)
+
+    def test_miss_is_not_cached(self):
+        video_path, _ = self.add_video("a.mp4")
+        self.assertIsNone(self.store.lookup(video_path))
+        import_library(self.store, self.root)
+        self.assertIsNotNone(self.store.lookup(video_path))
+
+    def test_edited_source_is_stale(self):
+        video_path, json_path = self.add_video("a.mp4")
+        self.age(json_path)
+        import_library(self.store, self.root)
+        self.assertIsNotNone(self.store.lookup(video_path))
+        os.utime(json_path)
+        self.assertIsNone(self.store.lookup(video_path))
+        import_library(self.store, self.root)
+        self.assertIsNotNone(self.store.lookup(video_path))
+
+    def test_export_in_place_keeps_plans_fresh(self):
+        video_path, json_path = self.add_video("a.mp4")
+        import_library(self.store, self.root)
+        written, skipped = export_library(self.store)
+        self.assertEqual((written, [path for path, _ in skipped]), (0, [json_path]))
+        written, skipped = export_library(self.store, force=True)
+        self.assertEqual((written, skipped), (1, []))
+        with open(json_path, encoding='utf-8') as f:
+            self.assertEqual(json.load(f), document("a.mp4"))
+        self.assertIsNotNone(self.store.lookup(video_path))
+
+    def test_export_round_trip_to_output_dir(self):
+        self.add_video(os.path.join("s1", "e1.mp4"), document("e1.mp4", "00:01:00", "00:01:30"))
+        self.add_video(os.path.join("s2", "e1.mp4"), document("e1.mp4", "00:02:00", "00:02:30"))
+        import_library(self.store, self.root)
+        output_dir = os.path.join(self.directory.name, "exported")
+        written, skipped = export_library(self.store, output_dir)
+        self.assertEqual((written, skipped), (2, []))
+        for folder in ("s1", "s2"):
+            with open(os.path.join(self.root, folder, "e1.json"), encoding='utf-8') as f:
+                original = json.load(f)
+            with open(os.path.join(output_dir, folder, "e1.json"), encoding='utf-8') as f:
+                self.assertEqual(json.load(f), original)
+
+    def test_export_reports_collisions(self):
+        self.add_video("a.mp4")
+        os.remove(self.add_video("a.mkv")[1])
+        with open(os.path.join(self.root, "a.json"), 'w', encoding='utf-8') as f:
+            json.dump(document("a.mkv"), f)
+        import_library(self.store, self.root)
+        self.assertEqual(len(self.store), 2)
+        written, skipped = export_library(self.store, os.path.join(self.directory.name, "exported"))
+        self.assertEqual(written, 1)
+        self.assertEqual(len(skipped), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+import threading
+import unittest
+from src.vlc.status import STATUS_COMMANDS, PlayerStatus, parse_http_status, parse_status_lines, parse_status_snapshot
+from tests.test_rc_session import paired_session
+
+STATUS_REPLY = (b"( new input: file:///videos/movie.mp4 )\r\n"
+                b"( audio volume: 256 )\r\n"
+                b"( state playing )\r\n> ")
+
+
+class SnapshotTest(unittest.TestCase):
+    def test_snapshot(self):
+        status = parse_status_snapshot(["125", "1", "3600", "( new input: file:///a.mp4 )\n( state playing )"])
+        self.assertEqual(status, PlayerStatus(125, True, 3600, "playing", "file:///a.mp4"))
+        self.assertFalse(status.paused)
+
+    def test_state_decides_pause_over_is_playing(self):
+        status = parse_status_snapshot(["125", "1", "3600", "( state paused )"])
+        self.assertTrue(status.playing)
+        self.assertTrue(status.paused)
+
+    def test_is_playing_is_the_fallback(self):
+        self.assertTrue(parse_status_snapshot(["0", "0", "0", ""]).paused)
+        self.assertFalse(parse_status_snapshot(["0", "1", "0", ""]).paused)
+
+    def test_missing_or_partial_replies(self):
+        self.assertIsNone(parse_status_snapshot(None))
+        self.assertIsNone(parse_status_snapshot(["125", "1"]))
+
+    def test_non_numeric_time(self):
+        status = parse_status_snapshot(["", "0", "unknown", ""])
+        self.assertIsNone(status.time)
+        self.assertIsNone(status.length)
+
+    def test_status_lines(self):
+        self.assertEqual(parse_status_lines("( new input: file:///a b.mp4 )\r\n( audio volume: 256 )\r\n( state stopped )"),
+                         ("file:///a b.mp4", "stopped"))
+        self.assertEqual(parse_status_lines(None), (None, None))
+
+
+class InterleavedSnapshotTest(unittest.TestCase):
+    """The player pushes status changes between the pipelined replies"""
+
+    def setUp(self):
+        self.session, self.player_end = paired_session()
+
+    def tearDown(self):
+        self.session.close()
+        self.player_end.close()
+
+    def snapshot(self, *chunks):
+        thread = threading.Thread(target=lambda: [self.player_end.sendall(chunk) for chunk in chunks])
+        thread.start()
+        responses = self.session.commands(STATUS_COMMANDS)
+        thread.join()
+        return parse_status_snapshot(responses)
+
+    def test_status_changes_between_replies(self):
+        status = self.snapshot(
+            b"status change: ( time: 124s )\r\n",
+            b"125\r\n> ",
+            b"status change: ( pause state: 3 ): Pause\r\n1\r\n> ",
+            b"3600\r\nstatus change: ( audio volume: 256 )\r\n> ",
+            STATUS_REPLY,
+        )
+        self.assertEqual(status, PlayerStatus(125, True, 3600, "playing", "file:///videos/movie.mp4"))
+        self.assertEqual([event.kind for event in self.session.take_events()], ["time", "pause"])
+
+    def test_status_change_after_a_prompt_on_the_same_line(self):
+        status = self.snapshot(b"125\r\n> status change: ( play state: 2 ): Play\r\n", b"1\r\n> 3600\r\n> ", STATUS_REPLY)
+        self.assertEqual(status.time, 125)
+        self.assertTrue(status.playing)
+        self.assertEqual(status.length, 3600)
+        self.assertEqual(status.state, "playing")
+        self.assertEqual([event.kind for event in self.session.take_events()], ["play"])
+
+    def test_new_input_notification_is_not_the_status_reply(self):
+        status = self.snapshot(
+            b"125\r\n> 1\r\n> 3600\r\n> ",
+            b"status change: ( new input: file:///videos/other.mp4 )\r\n",
+            STATUS_REPLY,
+        )
+        self.assertEqual(status.input, "file:///videos/movie.mp4")
+        events = self.session.take_events()
+        self.assertEqual([(event.kind, event.value) for event in events], [("new_input", "file:///videos/other.mp4")])
+
+
+class HTTPStatusTest(unittest.TestCase):
+    def test_status_document(self):
+        status = parse_http_status({
+            "time": 125, "length": 3600, "position": 0.0347, "state": "paused", "rate": 1.5,
+            "information": {"category": {"meta": {"filename": "movie.mp4"}}},
+        })
+        self.assertEqual(status, PlayerStatus(125, False, 3600, "paused", "movie.mp4", 1.5, 0.0347))
+        self.assertTrue(status.paused)
+
+    def test_idle_player(self):
+        status = parse_http_status({"time": 0, "length": -1, "state": "stopped"})
+        self.assertIsNone(status.length)
+        self.assertIsNone(status.input)
+        self.assertIsNone(status.rate)
+
+    def test_not_a_document(self):
+        self.assertIsNone(parse_http_status(None))
+        self.assertIsNone(parse_http_status([]))
+
+
+if __name__ == '__main__':
+    unittest.main()
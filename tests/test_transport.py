@@ -0,0 +1,140 @@
+import pathlib
+import unittest
+from benchmarks.fake_vlc import FakeHTTPServer, FakePlayer, FakeRCServer, serve_in_background
+from src.vlc.http_transport import HTTPTransport
+from src.vlc.transport import RCTransport, create_transport
+
+MOVIE = pathlib.PurePosixPath("/videos/movie.mp4").as_uri()
+OTHER = pathlib.PurePosixPath("/videos/other.mp4").as_uri()
+
+
+class TransportContract:
+    """Checks shared by every transport; subclasses start a fake server and build the transport"""
+
+    # The name the transport reports for the fake player's input
+    expected_input = None
+
+    def setUp(self):
+        self.player = FakePlayer(input_name=MOVIE)
+        self.player.set_position(100)
+        self.server = serve_in_background(self.make_server())
+        self.transport = self.make_transport()
+
+    def tearDown(self):
+        self.transport.close()
+        self.server.shutdown()
+        self.server.server_close()
+
+    def test_status(self):
+        self.assertTrue(self.transport.connect())
+        status = self.transport.get_status()
+        self.assertIn(status.time, (100, 101))
+        self.assertTrue(status.playing)
+        self.assertFalse(status.paused)
+        self.assertEqual(status.length, 3600)
+        self.assertEqual(status.input, self.expected_input)
+
+    def test_status_paused(self):
+        self.player.set_state("paused")
+        status = self.transport.get_status()
+        self.assertFalse(status.playing)
+        self.assertTrue(status.paused)
+        self.assertEqual(status.time, 100)
+
+    def test_seek_rounds_up_to_whole_seconds(self):
+        self.assertTrue(self.transport.seek(42.2))
+        self.assertEqual([target for _, _, target in self.player.seeks], [43.0])
+        self.assertIn(self.transport.get_status().time, (43, 44))
+
+    def test_add_and_clear(self):
+        self.assertIsNotNone(self.transport.command(f"add {OTHER}"))
+        self.assertEqual(self.player.input, OTHER)
+        self.assertEqual(self.player.playlist, [MOVIE, OTHER])
+        self.assertEqual([item.current for item in self.transport.get_playlist()], [False, True])
+
+        self.assertIsNotNone(self.transport.command("clear"))
+        self.assertEqual(self.player.playlist, [])
+        self.assertEqual(self.transport.get_playlist(), [])
+
+    def test_reconnects_after_the_player_drops_the_connection(self):
+        self.assertIsNotNone(self.transport.get_status())
+        self.assertEqual(self.server.connections_opened, 1)
+
+        self.drop_connections()
+        self.assertIsNotNone(self.transport.get_status())
+        self.assertGreaterEqual(self.server.connections_opened, 2)
+        self.assertTrue(self.transport.seek(10))
+        self.assertEqual(self.player.seeks[-1][2], 10.0)
+
+
+class RCTransportTest(TransportContract, unittest.TestCase):
+    expected_input = MOVIE
+
+    def make_server(self):
+        return FakeRCServer(self.player)
+
+    def make_transport(self):
+        host, port = self.server.server_address
+        return create_transport({"rc_host": host, "rc_port": port})
+
+    def drop_connections(self):
+        self.server.drop_connections()
+
+    def test_is_the_default_backend(self):
+        self.assertIsInstance(self.transport, RCTransport)
+
+    def test_password(self):
+        server = serve_in_background(FakeRCServer(self.player, password="secret"))
+        try:
+            host, port = server.server_address
+            transport = create_transport({"rc_host": host, "rc_port": port, "rc_password": "secret"})
+            self.assertTrue(transport.connect())
+            self.assertEqual(transport.get_status().length, 3600)
+            transport.close()
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def test_unreachable_player(self):
+        host, port = self.server.server_address
+        self.server.shutdown()
+        self.server.server_close()
+        self.server = serve_in_background(FakeRCServer(self.player))
+        transport = create_transport({"rc_host": host, "rc_port": port})
+        self.assertFalse(transport.connect())
+        self.assertIsNone(transport.get_status())
+
+
+class HTTPTransportTest(TransportContract, unittest.TestCase):
+    expected_input = "movie.mp4"
+
+    def make_server(self):
+        return FakeHTTPServer(self.player)
+
+    def make_transport(self):
+        host, port = self.server.server_address
+        return create_transport({"backend": "http", "http_host": host, "http_port": port})
+
+    def drop_connections(self):
+        # The fake closes the socket without answering, as a restarting VLC would
+        self.server.drop_rate = 1.0
+        self.assertIsNone(self.transport.get_status())
+        self.assertFalse(self.transport.healthy)
+        self.server.drop_rate = 0.0
+
+    def test_selected_by_backend(self):
+        self.assertIsInstance(self.transport, HTTPTransport)
+
+    def test_reuses_keep_alive_connections(self):
+        for _ in range(5):
+            self.assertIsNotNone(self.transport.get_status())
+        self.assertEqual(self.transport.connections_opened, 1)
+        self.assertEqual(self.server.connections_opened, 1)
+
+    def test_unknown_command(self):
+        self.assertIsNone(self.transport.command("frobnicate"))
+        self.assertEqual(self.server.commands, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()